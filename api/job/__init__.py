@@ -1,39 +1,324 @@
+import re
 import uuid
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Any, Awaitable, Callable
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.params import Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, ValidationError
 from starlette.background import BackgroundTasks
 
-from application import night_batch_job
+from database.config import settings
+from shared.cache import LRUCache
+from shared.metrics import registry
 from domain.job_repository import get_job_repository, JobRepository
+from domain.models.enums.status import Status
+from domain.models.enums.task_type import TaskType
+from domain.services import job_runner
+from domain.services.execution_host import execution_host
+from domain.services.job_dependencies import UnknownUpstreamJob, dependency_gate
+from domain.services.job_queue import QueueFull, job_queue
+from domain.services.job_registry import UnknownJobType, job_registry
+from shared.artifacts import artifacts
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
 
+# Serialized job views (detail, graph...), keyed by (job_id, version, view): a new version simply misses.
+job_responses: LRUCache[tuple[uuid.UUID, int, str], bytes] = LRUCache(settings.JOB_RESPONSE_CACHE_SIZE)
+job_response_cache = registry.counter("job_response_cache_total", "Job views served, by view and result: not_modified, hit or miss")
+
+
+class TaskDependencyResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    task_id: uuid.UUID
+    upstream_task_id: uuid.UUID
+    merge_strategy: str
+
+
+class TaskResponse(BaseModel):
+    """A job and its tasks, recursively. Payloads are not included: see GET .../tasks/{task_id}/input|output."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    parent_id: uuid.UUID | None
+    name: str | None
+    kind: str
+    task_type: str
+    status: str
+    error: str | None
+    started_at: datetime | None
+    finished_at: datetime | None
+    created_at: datetime | None
+    updated_at: datetime | None
+    version: int | None = None
+    children: list["TaskResponse"] = []
+    dependencies: list[TaskDependencyResponse] = []
+
+
+class JobListItem(TaskResponse):
+    # Archived jobs (include_archived) come without their tasks.
+    archived: bool = False
+    archived_at: datetime | None = None
+    task_count: int | None = None
+
+
+class JobDetailResponse(TaskResponse):
+    depends_on: list[uuid.UUID] = []
+
+
 class JobResponse(BaseModel):
     job_id: uuid.UUID
     status: str
+    # Set while the job waits for a run slot (see domain.services.job_queue): 0 runs next.
+    queue_position: int | None = None
+    eta_seconds: float | None = None
+    # Set while the job waits for upstream jobs (depends_on) to succeed, before it is queued.
+    waiting_for: list[uuid.UUID] | None = None
+
+
+def _job_response(job_id: uuid.UUID, status: str) -> JobResponse:
+    waiting_for = dependency_gate.waiting_for(job_id)
+    if waiting_for is not None:
+        return JobResponse(job_id=job_id, status=status, waiting_for=waiting_for)
+    info = job_queue.info(job_id)
+    if info is None or info.state != "queued":
+        return JobResponse(job_id=job_id, status=status)
+    return JobResponse(job_id=job_id, status=status, queue_position=info.position, eta_seconds=info.eta_seconds)
+
+
+async def _submit(
+        request: Request, job_type: str, input, name: str | None, profile: bool, priority: int, submitter: str | None,
+        depends_on: list[uuid.UUID] | None,
+) -> JobResponse:
+    try:
+        job = await job_runner.submit(
+            job_type, input, name, profile, priority, submitter or (request.client.host if request.client else ""),
+            depends_on or (),
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except UnknownUpstreamJob as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return _job_response(job.id, job.status)
 
 
 @router.post("/", status_code=202)
-async def run(bg: BackgroundTasks):
-    job = await night_batch_job.create()
-    bg.add_task(night_batch_job.run, job.id)
-    return JobResponse(job_id=job.id, status=job.status)
+async def run(
+        request: Request,
+        profile: bool = False,
+        priority: int = 0,
+        submitter: Annotated[str | None, Header(alias="X-Submitter")] = None,
+        depends_on: Annotated[list[uuid.UUID] | None, Query()] = None,
+):
+    """
+    Creates a job of the default type (a night batch) and queues it; 429 with Retry-After when the queue is full.
+    ``depends_on``: root jobs that must succeed first, the job waiting for them without a run slot.
+    """
+    return await _submit(request, settings.DEFAULT_JOB_TYPE, None, None, profile, priority, submitter, depends_on)
 
 
-@router.get("/")
-async def get_jobs(repository: Annotated[JobRepository, Depends(get_job_repository)]):
-    jobs = await repository.get_all(load_graph=False)
+@router.post("/{job_type}", status_code=202)
+async def submit(
+        job_type: str,
+        request: Request,
+        input: Annotated[Any, Body()] = None,
+        name: str | None = None,
+        profile: bool = False,
+        priority: int = 0,
+        submitter: Annotated[str | None, Header(alias="X-Submitter")] = None,
+        depends_on: Annotated[list[uuid.UUID] | None, Query()] = None,
+):
+    """
+    Creates a job of a registered type (see domain.services.job_registry) and queues it. The body is the job's
+    input, validated against its ``input_model``: 404 for an unknown type, 422 for an invalid input or an unknown
+    ``depends_on`` job.
+    """
+    try:
+        input = job_registry.validate_input(job_type, input)
+    except UnknownJobType as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await _submit(request, job_type, input, name, profile, priority, submitter, depends_on)
+
+
+@router.get("/", response_model=list[JobListItem])
+async def get_jobs(
+        repository: Annotated[JobRepository, Depends(get_job_repository)],
+        include_archived: bool = False,
+        status: Annotated[list[Status] | None, Query()] = None,
+        since: datetime | None = None,
+        limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+):
+    """
+    Every job with its tasks. With ``status`` ("?status=RUNNING", "?status=FAILED&since=..."): the ``limit`` latest
+    jobs in those statuses created since ``since``, without their tasks and without the archived ones.
+    """
+    if status:
+        jobs = await repository.get_by_status(*status, task_type=TaskType.JOB, since=since, limit=limit)
+        return [JobListItem.model_validate(job) for job in jobs]
+
+    jobs = [JobListItem.model_validate(job) for job in await repository.get_all(load_graph=False)]
+    if include_archived:
+        # Same shape as live jobs, flagged "archived"; their tasks are only in the archive.
+        jobs += [
+            JobListItem.model_validate({
+                **row._mapping, "task_type": "JOB", "error": None, "parent_id": None, "updated_at": row.archived_at,
+                "archived": True,
+            })
+            for row in await repository.get_archived()
+        ]
     return jobs
 
 
+# One entity tag of an If-None-Match list: quoted (views may contain commas), optionally weak.
+_ENTITY_TAG = re.compile(r'\s*(?:W/)?("[^"]*")\s*(?:,|$)')
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match against the current ETag: weak comparison (a W/ prefix is ignored), "*" matches any."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(match.group(1) == etag for match in _ENTITY_TAG.finditer(if_none_match))
+
+
+async def _conditional(
+        request: Request, repository: JobRepository, job_id: uuid.UUID, view: str,
+        build: Callable[[], Awaitable[tuple[int, bytes]]],
+) -> Response:
+    """
+    Conditional GET of a job view: 304 on a matching If-None-Match, else the cached body of this version,
+    else ``build()`` (the version it returns may be newer than the one checked first).
+    """
+    current = await repository.get_version(job_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    version, _ = current
+    headers = {
+        "ETag": f'"{job_id}-{version}-{view}"',
+        # Revalidated every time, finished jobs too: any of them can be retried (POST .../retries).
+        "Cache-Control": "no-cache",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        job_response_cache.inc(result="not_modified", view=view)
+        return Response(status_code=304, headers=headers)
+
+    body = job_responses.get((job_id, version, view))
+    if body is None:
+        job_response_cache.inc(result="miss", view=view)
+        version, body = await build()
+        job_responses.put((job_id, version, view), body)
+        headers["ETag"] = f'"{job_id}-{version}-{view}"'
+    else:
+        job_response_cache.inc(result="hit", view=view)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/{job_id}")
-async def get_job(job_id: uuid.UUID, repository: Annotated[JobRepository, Depends(get_job_repository)]):
-    job = await repository.get(job_id)
-    return job
+async def get_job(job_id: uuid.UUID, request: Request, repository: Annotated[JobRepository, Depends(get_job_repository)]):
+    async def build():
+        job = await repository.get(job_id)
+        # Fixed at submission: cached with the rest of the view.
+        depends_on = await repository.get_upstream_jobs(job_id)
+        detail = JobDetailResponse.model_validate(job).model_copy(update={"depends_on": depends_on})
+        return job.version, detail.model_dump_json().encode()
+
+    return await _conditional(request, repository, job_id, "detail", build)
+
+
+class GraphNode(BaseModel):
+    id: uuid.UUID
+    parent_id: uuid.UUID | None
+    name: str | None
+    kind: str
+    task_type: str
+    status: str
+    error: str | None
+    started_at: datetime | None
+    finished_at: datetime | None
+    depth: int
+    child_count: int
+    # Job whose children were not returned (depth limit or collapse): fetch them with it as job_id.
+    collapsed: bool
+
+
+class GraphEdge(BaseModel):
+    id: str
+    source: uuid.UUID
+    target: uuid.UUID
+    merge_strategy: str
+
+
+class JobGraphResponse(BaseModel):
+    job_id: uuid.UUID
+    version: int
+    nodes: list[GraphNode]
+    edges: list[GraphEdge]
+
+
+@router.get("/{job_id}/status", response_model=JobResponse)
+async def get_job_status(job_id: uuid.UUID, repository: Annotated[JobRepository, Depends(get_job_repository)]):
+    """Status of a job and, while it waits for a run slot, its queue position and ETA (never cached)."""
+    current = await repository.get_version(job_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job_id, current[1])
+
+
+@router.get("/{job_id}/graph", response_model=JobGraphResponse)
+async def get_job_graph(
+        job_id: uuid.UUID,
+        request: Request,
+        repository: Annotated[JobRepository, Depends(get_job_repository)],
+        depth: Annotated[int | None, Query(ge=0)] = None,
+        collapse: Annotated[list[uuid.UUID] | None, Query()] = None,
+):
+    """Flat nodes/edges of the job tree for the flow view, ``depth`` levels below the job (all by default)."""
+    collapsed_jobs = frozenset(collapse or ())
+    view = f"graph:{'all' if depth is None else depth}:" + ",".join(sorted(str(job) for job in collapsed_jobs))
+
+    async def build():
+        rows, links = await repository.get_graph(job_id, depth, collapsed_jobs)
+        expanded = {row.parent_id for row in rows}
+        graph = JobGraphResponse(
+            job_id=job_id,
+            version=rows[0].version,
+            nodes=[
+                GraphNode(
+                    id=row.id, parent_id=row.parent_id if row.depth else None, name=row.name, kind=row.kind,
+                    task_type=row.task_type, status=row.status, error=row.error,
+                    started_at=row.started_at, finished_at=row.finished_at,
+                    depth=row.depth, child_count=row.child_count,
+                    collapsed=row.child_count > 0 and row.id not in expanded,
+                )
+                for row in rows
+            ],
+            edges=[
+                GraphEdge(id=f"{link.upstream_task_id}->{link.task_id}", source=link.upstream_task_id,
+                          target=link.task_id, merge_strategy=link.merge_strategy)
+                for link in links
+            ],
+        )
+        return graph.version, graph.model_dump_json().encode()
+
+    return await _conditional(request, repository, job_id, view, build)
+
+
+@router.get("/{job_id}/profile")
+async def get_profile(job_id: uuid.UUID):
+    if not artifacts.exists(job_id, job_runner.PROFILE_ARTIFACT):
+        raise HTTPException(status_code=404, detail="No profile report for this job")
+    return artifacts.read_json(job_id, job_runner.PROFILE_ARTIFACT)
 
 
 class RetryRequest(BaseModel):
@@ -41,5 +326,5 @@ class RetryRequest(BaseModel):
 
 @router.post("/{job_id}/retries", status_code=202)
 async def retry(job_id: uuid.UUID, request: RetryRequest, bg: BackgroundTasks):
-    bg.add_task(night_batch_job.retry, job_id, request.task_id)
+    bg.add_task(execution_host.run, job_id, job_runner.retry, job_id, request.task_id)
     return job_id
\ No newline at end of file
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, AsyncIterator, Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.params import Depends
+from pydantic import BaseModel, ConfigDict
+from starlette.responses import StreamingResponse
+
+from api.streaming import compress_stream, negotiate_encoding, parse_range
+from database import database
+from database.config import settings
+from database.payload import HEADER, Compression, payload_encoding_of
+from domain.job_repository import JobRepository, get_job_repository
+from domain.models.enums.status import Status
+from shared.artifacts import artifacts
+
+router = APIRouter(prefix="/api/jobs/{job_id}/tasks", tags=["tasks"])
+
+Side = Literal["input", "output"]
+
+
+def payload_artifact(task_id: uuid.UUID, side: Side) -> str:
+    """Artifact name a task can write its payload to (``artifacts.write_bytes(job_id, ...)``) instead of the row."""
+    return f"tasks/{task_id}.{side}"
+
+
+class PayloadInfo(BaseModel):
+    source: Literal["json", "binary", "artifact"]
+    size: int
+    content_type: str
+    # Binary payloads: database.payload encoding, e.g. "msgpack+zstd".
+    encoding: str | None = None
+
+
+class TaskSummaryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    parent_id: uuid.UUID | None
+    name: str | None
+    kind: str
+    task_type: str
+    status: str
+    error: str | None
+    started_at: datetime | None
+    finished_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class TaskDetailResponse(TaskSummaryResponse):
+    input: PayloadInfo | None
+    output: PayloadInfo | None
+
+
+@dataclass
+class _Payload:
+    info: PayloadInfo
+    compressed: bool = False
+
+
+async def _payload(repository: JobRepository, job_id: uuid.UUID, task, side: Side) -> _Payload | None:
+    if artifacts.exists(job_id, payload_artifact(task.id, side)):
+        size = os.path.getsize(artifacts.path(job_id, payload_artifact(task.id, side)))
+        return _Payload(PayloadInfo(source="artifact", size=size, content_type="application/octet-stream"))
+
+    binary_size = getattr(task, f"{side}_bin_size")
+    if binary_size:
+        encoding = payload_encoding_of(await repository.read_payload(task.id, side, True, 0, HEADER.size))
+        return _Payload(
+            PayloadInfo(source="binary", size=binary_size, content_type="application/octet-stream", encoding=str(encoding)),
+            compressed=encoding.compression != Compression.NONE,
+        )
+
+    json_size = getattr(task, f"{side}_json_size")
+    # A None payload is stored as JSON null.
+    if not json_size or (json_size == 4 and await repository.read_payload(task.id, side, False, 0, 4) == b"null"):
+        return None
+    return _Payload(PayloadInfo(source="json", size=json_size, content_type="application/json"))
+
+
+async def _get_summary(repository: JobRepository, job_id: uuid.UUID, task_id: uuid.UUID):
+    task = await repository.get_task_summary(job_id, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found in this job")
+    return task
+
+
+@router.get("", response_model=list[TaskSummaryResponse])
+async def get_tasks(
+        job_id: uuid.UUID,
+        repository: Annotated[JobRepository, Depends(get_job_repository)],
+        status: Annotated[list[Status] | None, Query()] = None,
+):
+    """
+    Every task of a root job's tree, shallowest first, optionally in the given statuses (``?status=FAILED``):
+    one query on the (root_job_id, status) index, whatever the depth of the tree.
+    """
+    tasks = await repository.get_batch_tasks(job_id, *(status or ()))
+    if not tasks and job_id not in await repository.get_statuses([job_id]):
+        raise HTTPException(status_code=404, detail="Root job not found")
+    return tasks
+
+
+@router.get("/{task_id}", response_model=TaskDetailResponse)
+async def get_task(job_id: uuid.UUID, task_id: uuid.UUID, repository: Annotated[JobRepository, Depends(get_job_repository)]):
+    task = await _get_summary(repository, job_id, task_id)
+    payloads = {side: await _payload(repository, job_id, task, side) for side in ("input", "output")}
+    return TaskDetailResponse(
+        id=task.id, parent_id=task.parent_id, name=task.name, kind=task.kind, task_type=task.task_type,
+        status=task.status, error=task.error, started_at=task.started_at, finished_at=task.finished_at,
+        created_at=task.created_at, updated_at=task.updated_at,
+        input=payloads["input"].info if payloads["input"] else None,
+        output=payloads["output"].info if payloads["output"] else None,
+    )
+
+
+async def _row_chunks(task_id: uuid.UUID, side: Side, binary: bool, start: int, end: int) -> AsyncIterator[bytes]:
+    # Own session: the request's one is closed once the endpoint returns, before the body is streamed.
+    async with database.get_session_manager() as session:
+        repository = JobRepository(session)
+        offset = start
+        while offset <= end:
+            length = min(settings.PAYLOAD_CHUNK_SIZE, end - offset + 1)
+            yield await repository.read_payload(task_id, side, binary, offset, length)
+            offset += length
+
+
+async def _file_chunks(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(settings.PAYLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def _stream_payload(
+        request: Request, repository: JobRepository, job_id: uuid.UUID, task_id: uuid.UUID, side: Side,
+) -> StreamingResponse:
+    task = await _get_summary(repository, job_id, task_id)
+    payload = await _payload(repository, job_id, task, side)
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"Task has no {side}")
+    info = payload.info
+
+    headers = {"Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+    if info.encoding:
+        headers["X-Payload-Encoding"] = info.encoding
+    byte_range = parse_range(request.headers.get("range"), info.size)
+    start, end = byte_range or (0, info.size - 1)
+
+    if info.source == "artifact":
+        chunks = _file_chunks(artifacts.path(job_id, payload_artifact(task_id, side)), start, end)
+    else:
+        chunks = _row_chunks(task_id, side, info.source == "binary", start, end)
+
+    # Ranges address the stored bytes: only whole, not already compressed payloads get a Content-Encoding.
+    content_encoding = None if byte_range or payload.compressed else negotiate_encoding(request.headers.get("accept-encoding"))
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+        chunks = compress_stream(chunks, content_encoding)
+    else:
+        headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+
+    return StreamingResponse(chunks, status_code=206 if byte_range else 200, media_type=info.content_type, headers=headers)
+
+
+@router.get("/{task_id}/input")
+async def get_task_input(
+        job_id: uuid.UUID, task_id: uuid.UUID, request: Request,
+        repository: Annotated[JobRepository, Depends(get_job_repository)],
+):
+    return await _stream_payload(request, repository, job_id, task_id, "input")
+
+
+@router.get("/{task_id}/output")
+async def get_task_output(
+        job_id: uuid.UUID, task_id: uuid.UUID, request: Request,
+        repository: Annotated[JobRepository, Depends(get_job_repository)],
+):
+    return await _stream_payload(request, repository, job_id, task_id, "output")
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from database.notifications import FILE_CREATED, notifications
+
+router = APIRouter(prefix="/api/notifications", tags=["notifications"])
+
+
+class FileCreated(BaseModel):
+    path: str
+
+
+@router.post("/files", status_code=202)
+async def file_created(request: FileCreated):
+    """Announces a file to the FileSensors waiting for it, which check it at once instead of at their next recheck."""
+    await notifications.publish(FILE_CREATED, {"path": request.path})
+    return {"path": request.path}
@@ -0,0 +1,166 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Depends
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.exc import IntegrityError
+
+from domain.models.enums.misfire_policy import MisfirePolicy
+from domain.models.schedule import Schedule, as_utc
+from domain.schedule_repository import ScheduleRepository, get_schedule_repository
+from domain.services import job_runner
+from domain.services.job_queue import QueueFull
+from domain.services.job_registry import UnknownJobType, job_registry
+from domain.services.scheduler import scheduler
+from shared.cron import CronError
+
+router = APIRouter(prefix="/api/schedules", tags=["schedules"])
+
+
+class ScheduleRequest(BaseModel):
+    name: str
+    # Registered job type (domain.services.job_registry) and its input, validated against the job's input_model.
+    job_type: str
+    input: Any = None
+    priority: int = 0
+    # Cron expression (see shared.cron), read in ``timezone``; ``calendar``: fire on its business days only.
+    cron: str
+    timezone: str = "UTC"
+    calendar: str | None = None
+    misfire_policy: MisfirePolicy = MisfirePolicy.SKIP
+    enabled: bool = True
+
+
+class ScheduleUpdate(BaseModel):
+    """Fields to change; the others are kept."""
+    name: str | None = None
+    job_type: str | None = None
+    input: Any = None
+    priority: int | None = None
+    cron: str | None = None
+    timezone: str | None = None
+    calendar: str | None = None
+    misfire_policy: MisfirePolicy | None = None
+    enabled: bool | None = None
+
+
+class ScheduleResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: str
+    job_type: str
+    input: Any
+    priority: int
+    cron: str
+    timezone: str
+    calendar: str | None
+    misfire_policy: MisfirePolicy
+    enabled: bool
+    next_run_at: datetime | None
+    last_run_at: datetime | None
+    last_job_id: uuid.UUID | None
+    created_at: datetime
+    updated_at: datetime
+
+
+def _response(schedule: Schedule) -> ScheduleResponse:
+    response = ScheduleResponse.model_validate(schedule)
+    response.next_run_at, response.last_run_at = as_utc(schedule.next_run_at), as_utc(schedule.last_run_at)
+    return response
+
+
+def _prepare(schedule: Schedule, reschedule: bool) -> None:
+    """Validates the schedule (422) and sets its next run when ``reschedule``."""
+    try:
+        schedule.input = jsonable_encoder(job_registry.validate_input(schedule.job_type, schedule.input))
+        schedule.validate()
+    except (UnknownJobType, CronError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if reschedule:
+        schedule.next_run_at = schedule.next_fire(datetime.now(timezone.utc)) if schedule.enabled else None
+
+
+async def _save(repository: ScheduleRepository, schedule: Schedule) -> ScheduleResponse:
+    try:
+        await repository.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail=f"A schedule named {schedule.name!r} already exists")
+    await repository.refresh(schedule)
+    scheduler.notify(schedule.id, as_utc(schedule.next_run_at))
+    return _response(schedule)
+
+
+async def _get(repository: ScheduleRepository, schedule_id: uuid.UUID) -> Schedule:
+    schedule = await repository.get(schedule_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return schedule
+
+
+@router.get("/")
+async def get_schedules(repository: Annotated[ScheduleRepository, Depends(get_schedule_repository)]):
+    return [_response(schedule) for schedule in await repository.get_all()]
+
+
+@router.post("/", status_code=201)
+async def create_schedule(
+        request: ScheduleRequest, repository: Annotated[ScheduleRepository, Depends(get_schedule_repository)],
+) -> ScheduleResponse:
+    schedule = Schedule(**request.model_dump())
+    _prepare(schedule, reschedule=True)
+    await repository.add(schedule)
+    return await _save(repository, schedule)
+
+
+@router.get("/{schedule_id}")
+async def get_schedule(
+        schedule_id: uuid.UUID, repository: Annotated[ScheduleRepository, Depends(get_schedule_repository)],
+) -> ScheduleResponse:
+    return _response(await _get(repository, schedule_id))
+
+
+@router.patch("/{schedule_id}")
+async def update_schedule(
+        schedule_id: uuid.UUID, request: ScheduleUpdate,
+        repository: Annotated[ScheduleRepository, Depends(get_schedule_repository)],
+) -> ScheduleResponse:
+    """A change of cron, time zone, calendar or enabled moves the next run (runs missed meanwhile are dropped)."""
+    schedule = await _get(repository, schedule_id)
+    changes = request.model_dump(exclude_unset=True)
+    required = [key for key, value in changes.items() if value is None and key not in ("input", "calendar")]
+    if required:
+        raise HTTPException(status_code=422, detail=f"{', '.join(required)} cannot be null")
+    for key, value in changes.items():
+        setattr(schedule, key, value)
+    _prepare(schedule, reschedule=bool(changes.keys() & {"cron", "timezone", "calendar", "enabled"}))
+    return await _save(repository, schedule)
+
+
+@router.delete("/{schedule_id}", status_code=204)
+async def delete_schedule(
+        schedule_id: uuid.UUID, repository: Annotated[ScheduleRepository, Depends(get_schedule_repository)],
+):
+    await repository.delete(await _get(repository, schedule_id))
+    await repository.commit()
+    scheduler.notify(schedule_id, None)
+    return Response(status_code=204)
+
+
+@router.post("/{schedule_id}/runs", status_code=202)
+async def run_schedule(
+        schedule_id: uuid.UUID, repository: Annotated[ScheduleRepository, Depends(get_schedule_repository)],
+):
+    """Launches the schedule's job now, out of its cron times (its next run is unchanged)."""
+    schedule = await _get(repository, schedule_id)
+    try:
+        job = await job_runner.submit(
+            schedule.job_type, schedule.input, name=f"{schedule.name} (manual)", priority=schedule.priority,
+            submitter=f"schedule:{schedule.name}",
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return {"job_id": job.id, "status": job.status}
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import AsyncIterator, Callable
+
+from fastapi import HTTPException
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    (start, end) inclusive of a single ``Range: bytes=`` header, None to send the whole body.
+    Multiple ranges are not supported: the whole body is sent, as RFC 9110 allows.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _zstd_compressor():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard.ZstdCompressor().compressobj()
+
+
+# Content-Encoding -> factory of an object with compress()/flush(), None when unavailable.
+ENCODINGS: dict[str, Callable[[], object | None]] = {
+    "zstd": _zstd_compressor,
+    "gzip": lambda: zlib.compressobj(wbits=31),
+}
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """First supported coding of Accept-Encoding (q-values ignored, zstd preferred), or None for identity."""
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    for name, factory in ENCODINGS.items():
+        if name in accepted and factory() is not None:
+            return name
+    return None
+
+
+async def compress_stream(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[bytes]:
+    compressor = ENCODINGS[encoding]()
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -16,6 +16,9 @@ class PricingEngine(PricingLibrary):
 
 
 class BuildLibraryTask(Task[PricingLibrary, PricingEngine]):
+    # Candidate and reference batches often build the same library at the same time.
+    single_flight = True
+
     async def action(self) -> PricingEngine:
         print(f"executing action BuildLibraryTask {self.parent.name}")
         await asyncio.sleep(2)
@@ -2,8 +2,10 @@ import asyncio
 
 from pydantic import BaseModel
 
-from domain.models.enums.input_strategy import MergeStrategy
+from domain.models.batch_task import BatchTask
+from domain.models.enums.input_strategy import MergeStrategy, register_mapper
 from domain.models.job import Job
+from domain.models.map_job import MapJob
 from domain.models.task import Task
 
 
@@ -15,15 +17,20 @@ class TriggerMultiPriceOut(TriggerMultiPriceInput):
     status: str
 
 
-class TriggerMultiPrice(Task[TriggerMultiPriceInput, TriggerMultiPriceInput]):
+class TriggerMultiPrice(BatchTask[TriggerMultiPriceInput, TriggerMultiPriceInput]):
+    """Triggers are sent to the pricing backend together: one call per batch instead of one per collation."""
+    batch_size = 100
+    batch_window_ms = 50
+
     def __init__(self, input: TriggerMultiPriceInput, **kwargs):
         super().__init__(**kwargs)
         self.input = input
 
-    async def action(self):
+    @classmethod
+    async def action_batch(cls, inputs: list[TriggerMultiPriceInput]) -> list[TriggerMultiPriceInput]:
         await asyncio.sleep(1)
-        print(f"executing action TriggerMultiPrice {self.parent.name}")
-        return self.input
+        print(f"executing action TriggerMultiPrice for {len(inputs)} collations")
+        return inputs
 
 
 class CollationMultiPrice(Task[TriggerMultiPriceInput, TriggerMultiPriceOut]):
@@ -33,6 +40,7 @@ class CollationMultiPrice(Task[TriggerMultiPriceInput, TriggerMultiPriceOut]):
         return TriggerMultiPriceOut(collation_id=self.input.collation_id, status="OK")
 
 
+@register_mapper
 def mapper(inputs: list[TriggerMultiPriceInput]):
     return inputs[0]
 
@@ -50,3 +58,17 @@ class MultiPriceJob(Job[TriggerMultiPriceInput, TriggerMultiPriceOut]):
             merge_strategy=MergeStrategy.CUSTOM,
             mapper=mapper
         )
+
+
+class PriceCollations(Task[list[TriggerMultiPriceInput], list[TriggerMultiPriceOut]]):
+    async def action(self):
+        await asyncio.sleep(1)
+        print(f"executing action PriceCollations {self.name} for {len(self.input)} collations")
+        return [TriggerMultiPriceOut(collation_id=item.collation_id, status="OK") for item in self.input]
+
+
+class MultiPriceMapJob(MapJob[list[TriggerMultiPriceInput], list[TriggerMultiPriceOut]]):
+    """Prices every collation of its input list, expanded at run time in chunks of ``chunk_size``."""
+    item_task = PriceCollations
+    chunk_size = 100
+    reduce_strategy = MergeStrategy.MERGE_LIST
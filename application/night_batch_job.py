@@ -1,12 +1,7 @@
-import uuid
-
 from application.build_library_job import BuildLibraryJob, PricingLibrary
 from application.multi_price_job import MultiPriceJob, TriggerMultiPriceInput
-from database import database
-from domain.job_repository import JobRepository
 from domain.models.job import Job
 from domain.models.task import Task
-from domain.services.engine.reactive.reactive_engine import get_engine
 
 
 class Start(Task):
@@ -16,6 +11,7 @@ class Start(Task):
 
 class NightBatchJob(Job):
     def __init__(self, **kwargs):
+        kwargs.setdefault("name", "Night Batch Job")
         super().__init__(**kwargs)
 
         self.start = Start(parent=self, name="Start")
@@ -48,24 +44,3 @@ class NightBatchJob(Job):
         self.reference_pricing.add_upstream(self.reference_engine)
 
         self.candidate_pricing.add_upstream(self.candidate_engine)
-
-
-async def create() -> NightBatchJob:
-    job = NightBatchJob(name="Night Batch Job")
-    async with database.get_session_manager() as session:
-        session.add(job)
-        await session.commit()
-        await session.refresh(job)
-    return job
-
-
-async def run(job_id: uuid.UUID):
-    async with database.get_session_manager() as session:
-        engine = await get_engine(repository=JobRepository(session), job_id=job_id)
-        await engine.run()
-
-
-async def retry(job_id: uuid.UUID, task_id: uuid.UUID):
-    async with database.get_session_manager() as session:
-        engine = await get_engine(repository=JobRepository(session), job_id=job_id)
-        await engine.retry(task_id=task_id)
@@ -0,0 +1,88 @@
+"""
+Engine throughput: one job of N independent tasks (each sleeping a few ms, i.e. waiting on I/O),
+grouped in sub-jobs of --width tasks, run by the ReactiveEngine against the configured database.
+
+    python -m benchmarks.engine_throughput [--tasks 10 100 500 1000] [--width 20] [--latency-ms 5]
+
+Tasks/s should keep growing with N while the tasks' waits overlap; it flattens out when every status
+update waits for the previous one to be committed. Jobs are created in the configured database.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import math
+import os
+import time
+from typing import ClassVar
+
+from database import database, instrumentation
+from domain.job_repository import JobRepository
+from domain.models.job import Job
+from domain.models.task import Task
+from domain.services.engine.reactive.reactive_engine import ReactiveEngine
+
+
+class BenchTask(Task):
+    latency: ClassVar[float] = 0.005
+
+    async def action(self):
+        await asyncio.sleep(self.latency)
+        return {"ok": True}
+
+
+class BenchGroup(Job):
+    pass
+
+
+class BenchJob(Job):
+    def __init__(self, tasks: int, width: int, **kwargs):
+        super().__init__(**kwargs)
+        for group_index in range(math.ceil(tasks / width)):
+            group = BenchGroup(parent=self, name=f"group-{group_index}")
+            for index in range(min(width, tasks - group_index * width)):
+                BenchTask(parent=group, name=f"task-{group_index}-{index}")
+
+
+async def run_once(tasks: int, width: int) -> tuple[float, int]:
+    async with database.get_session_manager("worker") as session:
+        job = BenchJob(tasks, width, name=f"bench-{tasks}")
+        session.add(job)
+        await database.commit(session)
+        job_id = job.id
+
+    async with database.get_session_manager("worker") as session:
+        engine = ReactiveEngine(JobRepository(session), job_id)
+        # The engine is chatty: keep the report readable.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with instrumentation.collect() as stats:
+                started = time.perf_counter()
+                await engine.run()
+                elapsed = time.perf_counter() - started
+    return elapsed, stats.count
+
+
+async def main_async(sizes: list[int], width: int) -> None:
+    await database.init()
+    try:
+        print(f"{'tasks':>6} {'seconds':>8} {'tasks/s':>8} {'statements':>10}")
+        for tasks in sizes:
+            elapsed, statements = await run_once(tasks, width)
+            print(f"{tasks:>6} {elapsed:>8.2f} {tasks / elapsed:>8.1f} {statements:>10}")
+    finally:
+        await database.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+    BenchTask.latency = args.latency_ms / 1000
+    asyncio.run(main_async(args.tasks, args.width))
+
+
+if __name__ == "__main__":
+    main()
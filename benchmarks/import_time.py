@@ -0,0 +1,95 @@
+"""
+Process startup: time to import the API (``main``) and to run ``database.init()`` against a migrated database,
+each measured in fresh interpreters (median of --runs), then the top-level packages ``import main`` spends its
+time in (``python -X importtime``).
+
+    python -m benchmarks.import_time [--runs 5] [--top 10]
+
+The database is a temporary SQLite file: the configured one is left alone.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_MAIN = """
+import time
+started = time.perf_counter()
+import main
+print(time.perf_counter() - started)
+"""
+
+INIT = """
+import asyncio, sys, time
+started = time.perf_counter()
+from database import database
+
+async def init():
+    await database.init()
+    await database.shutdown()
+
+asyncio.run(init())
+elapsed = time.perf_counter() - started
+print("alembic" in sys.modules)
+print(elapsed)
+"""
+
+
+def _python(code: str, env: dict[str, str], *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def _median_ms(code: str, env: dict[str, str], runs: int) -> tuple[float, list[str]]:
+    """Median of the elapsed time ``code`` prints last, and the output of the last run."""
+    timings, lines = [], []
+    for _ in range(runs):
+        lines = _python(code, env).stdout.strip().splitlines()
+        timings.append(float(lines[-1]) * 1000)
+    return statistics.median(timings), lines
+
+
+def _import_profile(env: dict[str, str], top: int) -> list[tuple[str, float]]:
+    """Self time (ms) of each top-level package imported by ``import main``."""
+    stderr = _python("import main", env, "-X", "importtime").stderr
+    packages: Counter[str] = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    return packages.most_common(top)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, "DB_BACKEND": "sqlite", "DATABASE_URL": f"sqlite+aiosqlite:///{directory}/startup.db"}
+        # First run: creates and migrates the database.
+        _python(INIT, env)
+
+        main_ms, _ = _median_ms(IMPORT_MAIN, env, args.runs)
+        init_ms, lines = _median_ms(INIT, env, args.runs)
+        print(f"import main                  {main_ms:8.1f} ms")
+        print(f"database.init() (migrated)   {init_ms:8.1f} ms   alembic imported: {lines[-2]}")
+        print()
+        print("import main, self time by top-level package:")
+        for package, ms in _import_profile(env, args.top):
+            print(f"  {package:<26} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+JSON encoding of large task outputs: the previous path (model_dump + stdlib json) against the
+codecs of database.serialization, alone and through a SQLAlchemy commit.
+
+    python -m benchmarks.json_serialization [--items 20000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Column, Integer, MetaData, Table, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.serialization import CODECS, JsonCodec
+
+
+class Quote(BaseModel):
+    collation_id: str
+    instrument: str
+    price: float
+    currency: str
+    at: datetime
+    tags: list[str]
+
+
+def make_output(items: int) -> list[Quote]:
+    now = datetime.now(timezone.utc)
+    return [
+        Quote(collation_id=str(uuid.uuid4()), instrument=f"INST-{i}", price=i * 1.5,
+              currency="EUR", at=now, tags=["night", "batch", str(i % 7)])
+        for i in range(items)
+    ]
+
+
+def legacy_dumps(value: list[Quote]) -> str:
+    # Former IO._to_json (model_dump into dicts) then SQLAlchemy's default json.dumps.
+    return json.dumps([item.model_dump() for item in value], default=str)
+
+
+def available_codecs() -> list[JsonCodec]:
+    codecs = []
+    for name, factory in CODECS.items():
+        try:
+            codecs.append(factory())
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+    return codecs
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+async def commit_time(dumps, value, repeat: int) -> float:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", json_serializer=dumps)
+    table = Table("outputs", MetaData(), Column("id", Integer, primary_key=True), Column("output", JSON))
+    async with engine.begin() as conn:
+        await conn.run_sync(table.metadata.create_all)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(insert(table).values(output=value))
+        timings.append(time.perf_counter() - started)
+    await engine.dispose()
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    output = make_output(args.items)
+    legacy_value = [item.model_dump() for item in output]
+    print(f"{args.items} items, best of {args.repeat}")
+    print(f"{'path':<10} {'encode ms':>10} {'commit ms':>10}")
+
+    encode = best_of(args.repeat, lambda: legacy_dumps(output))
+    commit = asyncio.run(commit_time(lambda value: json.dumps(value, default=str), legacy_value, args.repeat))
+    # The legacy commit excludes model_dump, which ran when the output was assigned.
+    print(f"{'legacy':<10} {encode * 1000:>10.1f} {commit * 1000:>10.1f}")
+
+    for codec in available_codecs():
+        encode = best_of(args.repeat, lambda: codec.dumps(output))
+        commit = asyncio.run(commit_time(codec.dumps, output, args.repeat))
+        print(f"{codec.name:<10} {encode * 1000:>10.1f} {commit * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
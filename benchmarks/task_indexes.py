@@ -0,0 +1,183 @@
+"""
+Query plans and timings of the status / listing / polling queries on ``tasks``, before and after the
+indexes of revision 6c3ac2e084c6, on a seeded database.
+
+    python -m benchmarks.task_indexes [--rows 10000000] [--url sqlite+aiosqlite:///./bench_indexes.db]
+
+The database is migrated to the previous revision, seeded in SQL (one statement, no round trip per row),
+measured, migrated to head and measured again. It is wiped first: never point --url at real data.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from database.config import settings
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.enums.task_type import TaskType
+from domain.models.task import ACTIVE_STATUSES, Task
+from domain.services.archive import Archiver
+
+BEFORE = "3e01108759a9"
+JOB_SIZE = 100  # one root job followed by its 99 tasks
+ACTIVE_SHARE = 0.001  # the most recent rows are still SCHEDULED / RUNNING / READY_TO_RETRY
+FAILED_EVERY = 97
+SPAN = 365 * 24 * 3600  # created_at spread over the last year
+
+SEED = {
+    "sqlite": """
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < :rows - 1),
+        seeded AS (
+            SELECT i, datetime('now', printf('-%d seconds', (:rows - i) * :span / :rows)) AS at,
+                   printf('%032x', i - i % :job_size) AS root, i % :job_size = 0 AS is_root, i >= :rows - :active AS active
+            FROM n
+        )
+        INSERT INTO tasks (id, task_type, kind, status, version, parent_id, root_job_id, depth,
+                           created_at, updated_at, started_at, finished_at)
+        SELECT printf('%032x', i),
+               CASE WHEN is_root THEN 'JOB' ELSE 'TASK' END,
+               CASE WHEN is_root THEN :job_kind ELSE :task_kind END,
+               CASE WHEN active THEN (CASE i % 3 WHEN 0 THEN 'SCHEDULED' WHEN 1 THEN 'RUNNING' ELSE 'READY_TO_RETRY' END)
+                    WHEN i % :failed_every = 0 THEN 'FAILED' ELSE 'SUCCESS' END,
+               0, CASE WHEN is_root THEN NULL ELSE root END, root, CASE WHEN is_root THEN 0 ELSE 1 END,
+               at, at, at, CASE WHEN active THEN NULL ELSE at END
+        FROM seeded
+    """,
+    "postgresql": """
+        WITH seeded AS (
+            SELECT i, now() - make_interval(secs => (:rows - i) * :span::float8 / :rows) AS at,
+                   lpad(to_hex(i - i % :job_size), 32, '0')::uuid AS root,
+                   i % :job_size = 0 AS is_root, i >= :rows - :active AS active
+            FROM generate_series(0, :rows - 1) AS i
+        )
+        INSERT INTO tasks (id, task_type, kind, status, version, parent_id, root_job_id, depth,
+                           created_at, updated_at, started_at, finished_at)
+        SELECT lpad(to_hex(i), 32, '0')::uuid,
+               (CASE WHEN is_root THEN 'JOB' ELSE 'TASK' END)::tasktype,
+               CASE WHEN is_root THEN :job_kind ELSE :task_kind END,
+               (CASE WHEN active THEN (CASE i % 3 WHEN 0 THEN 'SCHEDULED' WHEN 1 THEN 'RUNNING' ELSE 'READY_TO_RETRY' END)
+                     WHEN i % :failed_every = 0 THEN 'FAILED' ELSE 'SUCCESS' END)::status,
+               0, CASE WHEN is_root THEN NULL ELSE root END, root, CASE WHEN is_root THEN 0 ELSE 1 END,
+               at, at, at, CASE WHEN active THEN NULL ELSE at END
+        FROM seeded
+    """,
+}
+
+EXPLAIN = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+
+def migrate(revision: str) -> None:
+    cfg = Config("alembic.ini")
+    command.downgrade(cfg, "base") if revision == "base" else command.upgrade(cfg, revision)
+
+
+async def seed(engine: AsyncEngine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(SEED[engine.dialect.name]), {
+            "rows": rows, "span": SPAN, "job_size": JOB_SIZE, "active": max(1, int(rows * ACTIVE_SHARE)),
+            "failed_every": FAILED_EVERY, "job_kind": "domain.models.job.Job", "task_kind": "domain.models.task.Task",
+        })
+        await conn.execute(text("ANALYZE"))
+
+
+def queries():
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "failed today": lambda session: JobRepository(session).get_by_status(Status.FAILED, since=today),
+        "running jobs": lambda session: JobRepository(session).get_by_status(Status.RUNNING, task_type=TaskType.JOB),
+        "runnable work": _runnable,
+        "archivable roots": lambda session: _next_roots(session, datetime.now() - timedelta(days=30)),
+    }
+
+
+async def _runnable(session: AsyncSession):
+    # What a worker polling for unfinished work would read: the partial index alone on Postgres (INCLUDE columns).
+    tasks = Task.__table__
+    return (await session.execute(
+        select(tasks.c.id, tasks.c.kind, tasks.c.root_job_id, tasks.c.status)
+        .where(text(ACTIVE_STATUSES))
+        .order_by(tasks.c.status, tasks.c.created_at)
+        .limit(100)
+    )).all()
+
+
+async def _next_roots(session: AsyncSession, cutoff: datetime):
+    return await Archiver(session.bind)._next_roots(await session.connection(), cutoff)
+
+
+async def measure(engine: AsyncEngine, repeat: int) -> None:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        for name, run in queries().items():
+            timings = []
+            for _ in range(repeat):
+                async with AsyncSession(engine) as session:
+                    captured.clear()
+                    started = time.perf_counter()
+                    await run(session)
+                    timings.append(time.perf_counter() - started)
+            statement, parameters = captured[-1]
+            async with engine.connect() as conn:
+                plan = (await conn.exec_driver_sql(EXPLAIN[engine.dialect.name] + statement, parameters)).all()
+            print(f"  {name:<17} {min(timings) * 1000:>9.1f} ms")
+            for row in plan:
+                print(f"      {row[-1]}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def run(url: str, rows: int, repeat: int) -> None:
+    engine = create_async_engine(url)
+    try:
+        print(f"seeding {rows} tasks ...")
+        started = time.perf_counter()
+        await seed(engine, rows)
+        print(f"seeded in {time.perf_counter() - started:.1f} s")
+
+        print(f"\nbefore ({BEFORE}), best of {repeat}")
+        await measure(engine, repeat)
+
+        started = time.perf_counter()
+        await asyncio.to_thread(migrate, "head")
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE"))
+        print(f"\nindexes built in {time.perf_counter() - started:.1f} s")
+
+        print(f"\nafter (head), best of {repeat}")
+        await measure(engine, repeat)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///./bench_indexes.db")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # The migrations read the URL from the settings.
+    settings.DATABASE_URL = args.url
+    if args.url.startswith("sqlite") and os.path.exists(args.url.rsplit("///", 1)[-1]):
+        os.remove(args.url.rsplit("///", 1)[-1])
+    migrate("base")
+    migrate(BEFORE)
+    asyncio.run(run(args.url, args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+from datetime import timedelta
+
+from database import database
+from database.config import settings
+
+
+async def profile(args: argparse.Namespace) -> None:
+    from domain.services import job_runner
+    from domain.services.job_registry import job_registry
+
+    await database.init()
+    try:
+        job = await job_registry.create(args.job_type)
+        path = await job_runner.run(job.id, profile=True)
+        print(f"Job {job.id} finished, profile report: {path}")
+    finally:
+        await database.shutdown()
+
+
+async def archive(args: argparse.Namespace) -> None:
+    from domain.services.archive import Archiver
+
+    await database.init()
+    try:
+        archiver = Archiver(database.get_engine("worker"), mode=args.mode, batch_size=args.batch_size)
+        count = await archiver.run(timedelta(days=args.older_than_days))
+        print(f"{count} jobs archived")
+    finally:
+        await database.shutdown()
+
+
+async def migrate(args: argparse.Namespace) -> None:
+    await database.run_migrations(args.revision)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="night-batch")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    profile_parser = commands.add_parser("profile", help="Run a job (a night batch by default) with profiling enabled")
+    profile_parser.add_argument("--job-type", default=settings.DEFAULT_JOB_TYPE)
+    profile_parser.set_defaults(handler=profile)
+
+    archive_parser = commands.add_parser("archive", help="Move old finished jobs to the archive")
+    archive_parser.add_argument("--older-than-days", type=float, default=settings.ARCHIVE_AFTER_DAYS)
+    archive_parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    archive_parser.add_argument("--mode", choices=("table", "file"), default=settings.ARCHIVE_MODE)
+    archive_parser.set_defaults(handler=archive)
+
+    migrate_parser = commands.add_parser("migrate", help="Upgrade the database schema (before starting the API)")
+    migrate_parser.add_argument("--revision", default="head")
+    migrate_parser.set_defaults(handler=migrate)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
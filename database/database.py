@@ -1,50 +1,121 @@
 import asyncio
+import threading
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Awaitable, Callable, Optional, TypeVar
 
-from alembic import command
-from alembic.config import Config
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from . import instrumentation
 from .config import settings
-from .postgres import engine_postgres, SessionLocalPostgres
-from .sqlite import engine_sqlite, SessionLocalSqlite
+from .pool import track_checkouts, untrack_checkouts
+from .revisions import is_current, script_heads
+from .postgres import ROLES, create_postgres_engine, create_postgres_session
+from .sqlite import create_sqlite_engine, create_sqlite_session, init_sqlite
+from .writer import WriteQueue
 
-engine: Optional[AsyncEngine]
-SessionLocal: Optional[async_sessionmaker[AsyncSession]]
+T = TypeVar("T")
 
 
-async def init() -> AsyncEngine:
-    global engine, SessionLocal
+class _LoopDatabase(threading.local):
+    """Engines, session factories and write queue of the current thread's event loop (see init)."""
+
+    def __init__(self) -> None:
+        # One engine per role on Postgres; SQLite uses the same engine for every role.
+        self.engines: dict[str, AsyncEngine] = {}
+        self.session_makers: dict[str, async_sessionmaker[AsyncSession]] = {}
+        self.writer: Optional[WriteQueue] = None
+
+
+# Pools, connections and the write queue belong to the event loop that created them: every thread running a loop
+# (the API's, each execution thread's) calls init() and gets its own.
+_state = _LoopDatabase()
+
+
+async def init(migrate: bool = True) -> AsyncEngine:
+    engines, session_makers = _state.engines, _state.session_makers
 
     if settings.DB_BACKEND == "postgres":
-        engine = engine_postgres
-        SessionLocal = SessionLocalPostgres
+        for role in ROLES:
+            engines[role] = create_postgres_engine(role)
+            session_makers[role] = create_postgres_session(engines[role])
     else:
-        engine = engine_sqlite
-        SessionLocal = SessionLocalSqlite
-    async with engine.begin() as connection:
-        await run_migrations(connection)
-    return engine
+        sqlite_engine = create_sqlite_engine()
+        track_checkouts(sqlite_engine, "sqlite")
+        sqlite_session = create_sqlite_session(sqlite_engine)
+        for role in ROLES:
+            engines[role] = sqlite_engine
+            session_makers[role] = sqlite_session
+    for role_engine in set(engines.values()):
+        instrumentation.install(role_engine)
+    if migrate:
+        await ensure_schema(engines["worker"])
+    if settings.DB_BACKEND != "postgres":
+        _state.writer = await init_sqlite()
+    return engines["api"]
 
 
-async def run_migrations(connection) -> None:
-    cfg = Config("alembic.ini")
-    cfg.attributes['connection'] = connection
+async def shutdown() -> None:
+    if _state.writer is not None:
+        await _state.writer.stop()
+        _state.writer = None
+    for role_engine in set(_state.engines.values()):
+        await role_engine.dispose()
+    if _state.engines:
+        for role in (ROLES if settings.DB_BACKEND == "postgres" else ("sqlite",)):
+            untrack_checkouts(role)
+    _state.engines.clear()
+    _state.session_makers.clear()
+
+
+def get_engine(role: str = "api") -> AsyncEngine:
+    if role not in _state.engines:
+        raise RuntimeError("database.init() n'a pas été appelé")
+    return _state.engines[role]
 
-    def _run_migrations():
-        command.upgrade(cfg, "head")
 
-    await asyncio.to_thread(_run_migrations)
+async def commit(session: AsyncSession) -> None:
+    """Commit through the write queue when there is one (SQLite), directly otherwise."""
+    if _state.writer is not None and _state.writer.running:
+        await _state.writer.commit(session)
+    else:
+        await session.commit()
+
+
+async def write(work: Callable[[], Awaitable[T]]) -> T:
+    """Runs a unit of work that writes and commits through the write queue when there is one, directly otherwise."""
+    if _state.writer is not None and _state.writer.running:
+        return await _state.writer.run(work)
+    return await work()
+
+
+async def ensure_schema(engine: AsyncEngine) -> None:
+    """Brings the schema to the migration head, without loading Alembic when it already is there."""
+    async with engine.connect() as connection:
+        current = await is_current(connection)
+    if current:
+        print(f"Schema at revision {', '.join(sorted(script_heads()))}, migrations skipped")
+        return
+    if not settings.DB_MIGRATE_ON_STARTUP:
+        raise RuntimeError("Le schéma n'est pas à jour : lancer `python cli.py migrate`")
+    await run_migrations()
+
+
+async def run_migrations(revision: str = "head") -> None:
+    """Alembic upgrade, in a thread: env.py runs its own event loop and engine."""
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config("alembic.ini")
+    await asyncio.to_thread(command.upgrade, cfg, revision)
     print("Migration ended")
 
 
 @asynccontextmanager
-async def get_session_manager():
-    if SessionLocal is None:
+async def get_session_manager(role: str = "api"):
+    if role not in _state.session_makers:
         raise RuntimeError("database.init() n'a pas été appelé")
 
-    async with SessionLocal() as session:
+    async with _state.session_makers[role]() as session:
         yield session
 
 
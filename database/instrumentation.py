@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.config import settings
+from shared.metrics import registry
+
+statements_total = registry.counter("db_statements_total", "SQL statements executed, by scope")
+statements_per_scope = registry.histogram(
+    "db_statements_per_scope", "SQL statements issued by one request or job run",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000),
+)
+statement_seconds = registry.histogram("db_statement_time_per_scope_seconds", "Time spent in SQL by one request or job run")
+n_plus_one_total = registry.counter("db_n_plus_one_total", "Repeated identical SELECTs flagged as N+1, by scope")
+
+_collectors: contextvars.ContextVar[tuple["StatementStats", ...]] = contextvars.ContextVar("sql_collectors", default=())
+
+
+@dataclass
+class StatementStats:
+    """Counts and timings of the SQL statements executed while the collector is active."""
+    count: int = 0
+    total_time: float = 0.0
+    statements: dict[str, list[float]] = field(default_factory=dict)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        entry = self.statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def repeated(self, threshold: int | None = None) -> dict[str, int]:
+        """Identical SELECTs issued at least ``threshold`` times: the N+1 candidates."""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return {
+            statement: int(count)
+            for statement, (count, _) in self.statements.items()
+            if count >= threshold and statement.lstrip().upper().startswith("SELECT")
+        }
+
+    def top(self, limit: int = 20, by: str = "time") -> list[dict]:
+        key = (lambda item: item[1][1]) if by == "time" else (lambda item: item[1][0])
+        return [
+            {"statement": statement, "count": int(count), "total_ms": round(total * 1000, 3)}
+            for statement, (count, total) in sorted(self.statements.items(), key=key, reverse=True)[:limit]
+        ]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors.get():
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors.get()
+    if not collectors:
+        return
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for collector in collectors:
+        collector.record(statement, elapsed)
+
+
+def install(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def collect(stats: StatementStats | None = None) -> Iterator[StatementStats]:
+    """Record every statement executed from this context (and the asyncio tasks it spawns)."""
+    stats = stats or StatementStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def suspend() -> Iterator[None]:
+    """Leave the statements of this block out of every collection (polling: their count depends on time, not on the work)."""
+    token = _collectors.set(())
+    try:
+        yield
+    finally:
+        _collectors.reset(token)
+
+
+def report(stats: StatementStats, scope: str, name: str) -> dict[str, int]:
+    """Publish a finished collection to the metrics and warn about N+1 candidates."""
+    statements_total.inc(stats.count, scope=scope)
+    statements_per_scope.observe(stats.count, scope=scope)
+    statement_seconds.observe(stats.total_time, scope=scope)
+    repeated = stats.repeated()
+    if repeated:
+        n_plus_one_total.inc(len(repeated), scope=scope)
+        for statement, count in repeated.items():
+            print(f"N+1 suspected in {scope} {name}: {count}x {statement.splitlines()[0][:200]}")
+    return repeated
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_statements: int) -> Iterator[StatementStats]:
+    """Fail when the block issues more than ``max_statements`` SQL statements."""
+    with collect() as stats:
+        yield stats
+    if stats.count > max_statements:
+        details = "\n".join(f"  {item['count']}x {item['statement']}" for item in stats.top(by="count"))
+        raise QueryBudgetExceeded(f"{stats.count} statements issued, budget is {max_statements}:\n{details}")
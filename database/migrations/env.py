@@ -25,7 +25,8 @@ if config.config_file_name is not None:
 target_metadata = models.base.Base.metadata
 
 database_url = settings.get_database_url()
-config.set_main_option("sqlalchemy.url", database_url)
+# "%" must be escaped for configparser (URL-encoded passwords)
+config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
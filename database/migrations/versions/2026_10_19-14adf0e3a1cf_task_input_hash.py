@@ -0,0 +1,34 @@
+"""task input hash
+
+Revision ID: 14adf0e3a1cf
+Revises: 6c3ac2e084c6
+Create Date: 2026-10-19 17:38:42.232093
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '14adf0e3a1cf'
+down_revision: Union[str, Sequence[str], None] = '6c3ac2e084c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('input_hash', sa.String(length=64), nullable=True))
+    # Only single-flight tasks are hashed: the index stays small.
+    op.create_index('ix_tasks_kind_input_hash', 'tasks', ['kind', 'input_hash'], unique=False,
+                    postgresql_where=sa.text('input_hash IS NOT NULL'), sqlite_where=sa.text('input_hash IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_kind_input_hash', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('input_hash')
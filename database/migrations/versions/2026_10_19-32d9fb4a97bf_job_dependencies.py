@@ -0,0 +1,45 @@
+"""job dependencies
+
+Revision ID: 32d9fb4a97bf
+Revises: ce67b519a19d
+Create Date: 2026-10-19 18:52:40.311208
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '32d9fb4a97bf'
+down_revision: Union[str, Sequence[str], None] = 'ce67b519a19d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'job_dependencies',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('job_id', sa.Uuid(), nullable=False),
+        sa.Column('upstream_job_id', sa.Uuid(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                  nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                  nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['tasks.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'upstream_job_id'),
+    )
+    op.create_index(op.f('ix_job_dependencies_job_id'), 'job_dependencies', ['job_id'], unique=False)
+    op.create_index(
+        op.f('ix_job_dependencies_upstream_job_id'), 'job_dependencies', ['upstream_job_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_dependencies_upstream_job_id'), table_name='job_dependencies')
+    op.drop_index(op.f('ix_job_dependencies_job_id'), table_name='job_dependencies')
+    op.drop_table('job_dependencies')
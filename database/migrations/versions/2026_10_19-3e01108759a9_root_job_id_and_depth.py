@@ -0,0 +1,73 @@
+"""root job id and depth
+
+Revision ID: 3e01108759a9
+Revises: b942b3745a91
+Create Date: 2026-10-19 15:22:10.118734
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3e01108759a9'
+down_revision: Union[str, Sequence[str], None] = 'b942b3745a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('root_job_id', sa.Uuid(), nullable=True))
+        batch_op.add_column(sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+    with op.batch_alter_table('task_dependencies') as batch_op:
+        batch_op.add_column(sa.Column('root_job_id', sa.Uuid(), nullable=True))
+        batch_op.add_column(sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill: walk every tree once from its root.
+    tree = """
+        WITH RECURSIVE tree(id, root_id, depth) AS (
+            SELECT id, id, 0 FROM tasks WHERE parent_id IS NULL
+            UNION ALL
+            SELECT tasks.id, tree.root_id, tree.depth + 1 FROM tasks JOIN tree ON tasks.parent_id = tree.id
+        )
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        # Joined once: correlated subqueries would scan the tree again for every row.
+        op.execute(tree + """
+            UPDATE tasks SET root_job_id = tree.root_id, depth = tree.depth FROM tree WHERE tree.id = tasks.id
+        """)
+        op.execute("""
+            UPDATE task_dependencies SET root_job_id = tasks.root_job_id, depth = tasks.depth
+            FROM tasks WHERE tasks.id = task_dependencies.task_id
+        """)
+    else:
+        op.execute(tree + """
+            UPDATE tasks SET
+                root_job_id = (SELECT tree.root_id FROM tree WHERE tree.id = tasks.id),
+                depth = (SELECT tree.depth FROM tree WHERE tree.id = tasks.id)
+        """)
+        op.execute("""
+            UPDATE task_dependencies SET
+                root_job_id = (SELECT tasks.root_job_id FROM tasks WHERE tasks.id = task_dependencies.task_id),
+                depth = (SELECT tasks.depth FROM tasks WHERE tasks.id = task_dependencies.task_id)
+        """)
+
+    op.create_index('ix_tasks_root_job_id_status', 'tasks', ['root_job_id', 'status'], unique=False)
+    op.create_index('ix_tasks_root_job_id_depth', 'tasks', ['root_job_id', 'depth'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_root_job_id'), 'task_dependencies', ['root_job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_dependencies_root_job_id'), table_name='task_dependencies')
+    op.drop_index('ix_tasks_root_job_id_depth', table_name='tasks')
+    op.drop_index('ix_tasks_root_job_id_status', table_name='tasks')
+    with op.batch_alter_table('task_dependencies') as batch_op:
+        batch_op.drop_column('depth')
+        batch_op.drop_column('root_job_id')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('depth')
+        batch_op.drop_column('root_job_id')
@@ -0,0 +1,46 @@
+"""task status and listing indexes
+
+Revision ID: 6c3ac2e084c6
+Revises: 3e01108759a9
+Create Date: 2026-10-19 17:28:01.315987
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c3ac2e084c6'
+down_revision: Union[str, Sequence[str], None] = '3e01108759a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE = sa.text("status IN ('SCHEDULED', 'RUNNING', 'READY_TO_RETRY')")
+ROOTS = sa.text("parent_id IS NULL")
+
+# Built CONCURRENTLY on Postgres (outside the migration transaction): tasks is large and written to constantly.
+INDEXES = [
+    ('ix_tasks_status_created_at', ['status', 'created_at'], {}),
+    ('ix_tasks_task_type_created_at', ['task_type', 'created_at'], {'postgresql_include': ['status']}),
+    ('ix_tasks_active', ['status', 'created_at'],
+     {'postgresql_where': ACTIVE, 'sqlite_where': ACTIVE, 'postgresql_include': ['id', 'kind', 'root_job_id']}),
+    ('ix_tasks_roots_finished_at', ['parent_id', 'finished_at'],
+     {'postgresql_where': ROOTS, 'sqlite_where': ROOTS, 'postgresql_include': ['status']}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns, options in INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False, postgresql_concurrently=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""job dependency release
+
+Revision ID: a41c7e9d2b63
+Revises: 32d9fb4a97bf
+Create Date: 2026-10-19 21:14:05.902113
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e9d2b63'
+down_revision: Union[str, Sequence[str], None] = '32d9fb4a97bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_dependencies', sa.Column('released_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_dependencies', 'released_at')
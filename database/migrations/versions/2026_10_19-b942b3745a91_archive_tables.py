@@ -0,0 +1,88 @@
+"""archive tables
+
+Revision ID: b942b3745a91
+Revises: be387273ad7b
+Create Date: 2026-10-19 13:05:52.817430
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b942b3745a91'
+down_revision: Union[str, Sequence[str], None] = 'be387273ad7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partitioned by month on Postgres (postgresql_partition_by is ignored elsewhere).
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('root_job_id', sa.Uuid(), nullable=False),
+        sa.Column('task_type', sa.String(length=10), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('parent_id', sa.Uuid(), nullable=True),
+        sa.Column('input', sa.JSON(), nullable=True),
+        sa.Column('output', sa.JSON(), nullable=True),
+        sa.Column('input_bin', sa.LargeBinary(), nullable=True),
+        sa.Column('output_bin', sa.LargeBinary(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index('ix_tasks_archive_root_job_id', 'tasks_archive', ['root_job_id'], unique=False)
+    op.create_table(
+        'task_dependencies_archive',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('root_job_id', sa.Uuid(), nullable=False),
+        sa.Column('task_id', sa.Uuid(), nullable=False),
+        sa.Column('upstream_task_id', sa.Uuid(), nullable=False),
+        sa.Column('job_id', sa.Uuid(), nullable=True),
+        sa.Column('merge_strategy', sa.String(length=20), nullable=False),
+        sa.Column('mapper_config', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index('ix_task_dependencies_archive_root_job_id', 'task_dependencies_archive', ['root_job_id'],
+                    unique=False)
+    op.create_table(
+        'archived_jobs',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('task_count', sa.Integer(), nullable=False),
+        sa.Column('location', sa.String(length=1024), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archived_jobs_finished_at', 'archived_jobs', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_archived_jobs_finished_at', table_name='archived_jobs')
+    op.drop_table('archived_jobs')
+    op.drop_index('ix_task_dependencies_archive_root_job_id', table_name='task_dependencies_archive')
+    op.drop_table('task_dependencies_archive')
+    op.drop_index('ix_tasks_archive_root_job_id', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
@@ -0,0 +1,31 @@
+"""binary task payloads
+
+Revision ID: c7981c0a7264
+Revises: b7cfe518b75c
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7981c0a7264'
+down_revision: Union[str, Sequence[str], None] = 'b7cfe518b75c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.add_column(sa.Column('input_bin', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('output_bin', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('output_bin')
+        batch_op.drop_column('input_bin')
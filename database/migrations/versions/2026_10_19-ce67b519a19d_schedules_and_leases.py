@@ -0,0 +1,59 @@
+"""schedules and leases
+
+Revision ID: ce67b519a19d
+Revises: 14adf0e3a1cf
+Create Date: 2026-10-19 18:36:15.096074
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'ce67b519a19d'
+down_revision: Union[str, Sequence[str], None] = '14adf0e3a1cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'schedules',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('job_type', sa.String(length=100), nullable=False),
+        sa.Column('input', sa.JSON(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('cron', sa.String(length=100), nullable=False),
+        sa.Column('timezone', sa.String(length=64), nullable=False),
+        sa.Column('calendar', sa.String(length=64), nullable=True),
+        sa.Column('misfire_policy', sa.Enum('SKIP', 'CATCH_UP', name='misfirepolicy'), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=False),
+        sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_job_id', sa.Uuid(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                  nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                  nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index('ix_schedules_enabled_next_run_at', 'schedules', ['enabled', 'next_run_at'], unique=False)
+    op.create_table(
+        'leases',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('owner', sa.String(length=255), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leases')
+    op.drop_index('ix_schedules_enabled_next_run_at', table_name='schedules')
+    op.drop_table('schedules')
+    sa.Enum(name='misfirepolicy').drop(op.get_bind(), checkfirst=True)
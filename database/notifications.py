@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from sqlalchemy import func, make_url, select
+
+from . import database
+from .config import settings
+
+T = TypeVar("T")
+
+# A root job reached a final status: {"job_id": ..., "status": ...}.
+JOB_FINISHED = "job_finished"
+# A file sensors may wait for was written: {"path": ...}.
+FILE_CREATED = "file_created"
+CHANNELS = (JOB_FINISHED, FILE_CREATED)
+
+
+@dataclasses.dataclass(eq=False)
+class Subscription:
+    """Notifications of ``channels`` published while subscribed, queued for the subscriber's loop."""
+    channels: frozenset[str]
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[tuple[str, dict]] = dataclasses.field(default_factory=asyncio.Queue)
+
+    async def get(self, timeout: float | None = None) -> tuple[str, dict] | None:
+        """Next (channel, payload), None after ``timeout`` seconds without any."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def drain(self) -> list[tuple[str, dict]]:
+        """The notifications already queued, without waiting."""
+        received = []
+        while not self.queue.empty():
+            received.append(self.queue.get_nowait())
+        return received
+
+
+@dataclasses.dataclass
+class NotificationBus:
+    """
+    Wakes up what waits on other jobs or on files (depends_on, sensors) instead of having it poll. Notifications
+    are hints, not state: waiters re-read what they wait for after each one, so a duplicate costs a query and a
+    lost one only delays them until their next recheck.
+
+    What is published in this process reaches the subscribers of all its loops (API, execution threads). On
+    Postgres ``publish`` is a NOTIFY, and ``start`` opens the process's LISTEN connection, which hands every
+    process's notifications to the local subscribers. On SQLite notifications stay in the publishing process.
+    """
+    _subscriptions: set[Subscription] = dataclasses.field(default_factory=set, init=False)
+    _lock: threading.Lock = dataclasses.field(default_factory=threading.Lock, init=False)
+    # asyncpg connection LISTENing to CHANNELS (Postgres, once started).
+    _listener: Any = dataclasses.field(default=None, init=False)
+
+    async def start(self) -> None:
+        if settings.DB_BACKEND != "postgres":
+            return
+        import asyncpg
+
+        url = make_url(settings.get_database_url()).set(drivername="postgresql")
+        self._listener = await asyncpg.connect(url.render_as_string(hide_password=False))
+        for channel in CHANNELS:
+            await self._listener.add_listener(channel, self._on_notify)
+        print(f"Listening to {', '.join(CHANNELS)}")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            await listener.close()
+
+    @contextlib.contextmanager
+    def subscribe(self, *channels: str) -> Iterator[Subscription]:
+        subscription = Subscription(frozenset(channels), asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+    async def publish(self, channel: str, payload: dict) -> None:
+        """Never raises: a notification that cannot be sent is only logged (waiters recheck anyway)."""
+        if settings.DB_BACKEND == "postgres":
+            try:
+                async with database.get_engine("worker").connect() as connection:
+                    await connection.execute(select(func.pg_notify(channel, json.dumps(payload))))
+                    await connection.commit()
+            except Exception as e:
+                print(f"Notification {channel} {payload} not sent: {e!r}")
+            if self._listener is not None:
+                return  # delivered here too by the LISTEN connection
+        self.deliver(channel, payload)
+
+    def deliver(self, channel: str, payload: dict) -> None:
+        """Thread-safe: queues the notification for each local subscriber of ``channel``, on its own loop."""
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if channel in s.channels]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, (channel, payload))
+            except RuntimeError:
+                pass  # loop closed, its subscriber is gone
+
+    def _on_notify(self, _connection, _pid: int, channel: str, payload: str) -> None:
+        self.deliver(channel, json.loads(payload))
+
+    async def wait_for(
+            self, check: Callable[[], Awaitable[T | None]], channels: tuple[str, ...], recheck_interval: float,
+            timeout: float,
+    ) -> T:
+        """
+        Result of ``check`` once it is not None: called now, then after each notification of ``channels`` (a burst
+        counts once) and every ``recheck_interval`` seconds. TimeoutError after ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        # Subscribed before the first check: a notification sent while it runs is not missed.
+        with self.subscribe(*channels) as subscription:
+            while True:
+                result = await check()
+                if result is not None:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Still waiting after {timeout:g}s")
+                await subscription.get(min(recheck_interval, remaining))
+                subscription.drain()
+
+
+notifications = NotificationBus()
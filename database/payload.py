@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import functools
+import struct
+import zlib
+from array import array
+from dataclasses import asdict, dataclass, is_dataclass
+from enum import IntEnum
+from typing import Any
+
+from pydantic import BaseModel
+
+from database.config import settings
+
+try:
+    import numpy
+except ImportError:  # optional: vectors then decode to array.array
+    numpy = None
+
+# Self-describing header: magic, format, compression. Rows stay readable when a class changes its encoding.
+MAGIC = b"NBP1"
+HEADER = struct.Struct("<4sBB")
+
+
+class PayloadFormat(IntEnum):
+    MSGPACK = 1
+    ARROW = 2
+    ARRAY = 3  # stdlib array: flat numeric vectors only
+
+
+class Compression(IntEnum):
+    NONE = 0
+    ZLIB = 1
+    ZSTD = 2
+
+
+@dataclass(frozen=True)
+class PayloadEncoding:
+    """Binary encoding of a task payload, written ``"<format>[+<compression>]"`` e.g. ``"msgpack+zstd"``."""
+    format: PayloadFormat
+    compression: Compression = Compression.NONE
+
+    @classmethod
+    def parse(cls, spec: str | PayloadEncoding) -> PayloadEncoding:
+        if isinstance(spec, PayloadEncoding):
+            return spec
+        name, _, compression = spec.lower().partition("+")
+        try:
+            return cls(PayloadFormat[name.upper()], Compression[(compression or "none").upper()])
+        except KeyError:
+            raise ValueError(f"Unknown payload encoding {spec!r}") from None
+
+    def __str__(self) -> str:
+        name = self.format.name.lower()
+        return name if self.compression == Compression.NONE else f"{name}+{self.compression.name.lower()}"
+
+
+def _plain(value: Any) -> Any:
+    """Builtins (and numpy arrays) only: what msgpack / Arrow can take."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def _is_ndarray(value: Any) -> bool:
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+# ---- msgpack ----
+
+_NDARRAY_EXT = 1
+
+
+def _msgpack_encode(value: Any) -> bytes:
+    import msgpack
+
+    def default(obj):
+        if _is_ndarray(obj):
+            return msgpack.ExtType(_NDARRAY_EXT, msgpack.packb([obj.dtype.str, list(obj.shape), obj.tobytes()]))
+        raise TypeError(f"Cannot encode {type(obj).__name__} as msgpack")
+
+    return msgpack.packb(_plain(value), default=default, use_bin_type=True)
+
+
+def _msgpack_decode(body: memoryview) -> Any:
+    import msgpack
+
+    def ext_hook(code, data):
+        if code == _NDARRAY_EXT and numpy is not None:
+            dtype, shape, raw = msgpack.unpackb(data)
+            return numpy.frombuffer(raw, dtype=dtype).reshape(shape)
+        return msgpack.ExtType(code, data)
+
+    return msgpack.unpackb(body, ext_hook=ext_hook, raw=False)
+
+
+# ---- Arrow IPC ----
+
+def _is_vector(value: Any) -> bool:
+    return _is_ndarray(value) or (
+        isinstance(value, (list, tuple)) and all(isinstance(item, (int, float)) for item in value)
+    )
+
+
+def _arrow_encode(value: Any) -> bytes:
+    import pyarrow
+
+    if _is_vector(value):
+        table = pyarrow.table({"values": pyarrow.array(value)}, metadata={"nbp": "vector"})
+    else:
+        records = _plain(value)
+        if not isinstance(records, list) or not all(isinstance(item, dict) for item in records):
+            raise ValueError("Arrow payloads hold numeric vectors or lists of records")
+        table = pyarrow.Table.from_pylist(records, metadata={"nbp": "records"})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_decode(body: memoryview) -> Any:
+    import pyarrow
+
+    # Read straight from the buffer: numeric columns are not copied.
+    table = pyarrow.ipc.open_stream(pyarrow.py_buffer(body)).read_all()
+    if (table.schema.metadata or {}).get(b"nbp") == b"vector":
+        column = table.column("values").combine_chunks()
+        return column.to_numpy(zero_copy_only=False) if numpy is not None else column.to_pylist()
+    return table.to_pylist()
+
+
+# ---- stdlib array ----
+
+_ARRAY_TYPECODES = "bBhHiIlLqQfd"
+
+
+def _array_encode(value: Any) -> bytes:
+    if _is_ndarray(value):
+        if value.ndim != 1 or value.dtype.char not in _ARRAY_TYPECODES:
+            raise ValueError(f"array payloads hold 1-d numeric vectors, got {value.dtype}{value.shape}")
+        return value.dtype.char.encode() + value.tobytes()
+    if not _is_vector(value):
+        raise ValueError("array payloads hold numeric vectors only")
+    typecode = "q" if all(isinstance(item, int) for item in value) else "d"
+    return typecode.encode() + array(typecode, value).tobytes()
+
+
+def _array_decode(body: memoryview) -> Any:
+    typecode = chr(body[0])
+    if numpy is not None:
+        return numpy.frombuffer(body[1:], dtype=typecode)
+    values = array(typecode)
+    values.frombytes(body[1:])
+    return values
+
+
+_CODECS = {
+    PayloadFormat.MSGPACK: (_msgpack_encode, _msgpack_decode),
+    PayloadFormat.ARROW: (_arrow_encode, _arrow_decode),
+    PayloadFormat.ARRAY: (_array_encode, _array_decode),
+}
+
+
+# ---- compression ----
+
+@functools.cache
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        print("zstandard is not installed, zstd payloads are compressed with zlib instead")
+        return None
+    return zstandard
+
+
+def _compress(body: bytes, compression: Compression) -> tuple[bytes, Compression]:
+    if compression == Compression.ZSTD:
+        zstandard = _zstandard()
+        if zstandard is None:
+            compression = Compression.ZLIB
+        else:
+            return zstandard.ZstdCompressor(level=settings.PAYLOAD_ZSTD_LEVEL).compress(body), compression
+    if compression == Compression.ZLIB:
+        return zlib.compress(body), compression
+    return body, compression
+
+
+def _decompress(body: memoryview, compression: Compression) -> memoryview:
+    if compression == Compression.ZSTD:
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise RuntimeError("This payload is zstd-compressed: install zstandard to read it")
+        return memoryview(zstandard.ZstdDecompressor().decompress(body))
+    if compression == Compression.ZLIB:
+        return memoryview(zlib.decompress(body))
+    return body
+
+
+def encode_payload(value: Any, encoding: PayloadEncoding) -> bytes:
+    encode, _ = _CODECS[encoding.format]
+    body, compression = _compress(encode(value), encoding.compression)
+    return HEADER.pack(MAGIC, encoding.format, compression) + body
+
+
+def payload_encoding_of(data: bytes) -> PayloadEncoding:
+    magic, payload_format, compression = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a task payload")
+    return PayloadEncoding(PayloadFormat(payload_format), Compression(compression))
+
+
+def decode_payload(data: bytes) -> Any:
+    encoding = payload_encoding_of(data)
+    _, decode = _CODECS[encoding.format]
+    return decode(_decompress(memoryview(data)[HEADER.size:], encoding.compression))
+
+
+def describe_payload(data: bytes) -> dict:
+    """JSON-friendly summary of a stored payload (the bytes themselves are not valid JSON)."""
+    return {"encoding": str(payload_encoding_of(data)), "size": len(data)}
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+import time
+from functools import cache
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from shared.metrics import registry
+
+pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection (includes connecting)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+# Every event loop (the API's, each execution thread's) has its own pools: the gauges are labelled by loop too.
+pool_checked_out = registry.gauge("db_pool_checked_out", "Connections currently checked out of the pool")
+pool_size = registry.gauge("db_pool_size", "Configured pool size (without overflow)")
+pool_timeouts = registry.counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection")
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited, labelled by ``role``."""
+    role: str = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc(role=self.role)
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - started, role=self.role)
+
+
+@cache
+def timed_pool(role: str) -> type[TimedAsyncAdaptedQueuePool]:
+    return type(f"TimedAsyncAdaptedQueuePool_{role}", (TimedAsyncAdaptedQueuePool,), {"role": role})
+
+
+def _gauge_labels(role: str) -> dict[str, str]:
+    # database.init / shutdown run on the thread of the loop the pools belong to.
+    return {"role": role, "loop": threading.current_thread().name}
+
+
+def track_checkouts(engine: AsyncEngine, role: str) -> None:
+    pool = engine.sync_engine.pool
+    labels = _gauge_labels(role)
+    pool_size.set(pool.size(), **labels)
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(*_args) -> None:
+        pool_checked_out.set(engine.sync_engine.pool.checkedout(), **labels)
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _on_checkin(*_args) -> None:
+        pool_checked_out.set(engine.sync_engine.pool.checkedout(), **labels)
+
+
+def untrack_checkouts(role: str) -> None:
+    """Drops the gauges of a disposed pool: a stopped loop must not keep reporting its last values."""
+    labels = _gauge_labels(role)
+    pool_size.remove(**labels)
+    pool_checked_out.remove(**labels)
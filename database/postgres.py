@@ -1,25 +1,62 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 
 from database.config import settings
+from database.pool import timed_pool, track_checkouts
+from database.serialization import codec
 
-engine_postgres = create_async_engine(
-    settings.get_database_url(),
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30,
-    pool_recycle=1800,
-)
-
-SessionLocalPostgres = async_sessionmaker(
-    bind=engine_postgres,
-    expire_on_commit=False,
-    autoflush=False,
-    class_=AsyncSession,
-)
-
-
-async def init_postgres() -> None:
-    async with engine_postgres.connect() as conn:
-        await conn.execute("SELECT 1")
+# "api" serves HTTP reads, "worker" runs the engines and their writes: each role gets its own pool.
+ROLES = ("api", "worker")
+
+
+def _connect_args(role: str) -> dict:
+    server_settings = {
+        "application_name": f"{settings.POSTGRES_APPLICATION_NAME}-{role}",
+        **settings.POSTGRES_SERVER_SETTINGS,
+    }
+    if settings.POSTGRES_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.POSTGRES_STATEMENT_TIMEOUT_MS)
+
+    connect_args: dict = {"server_settings": server_settings}
+    if settings.POSTGRES_SERVER_SIDE_PREPARED:
+        # asyncpg's own LRU of prepared statements + SQLAlchemy's adapter-level cache.
+        connect_args["statement_cache_size"] = settings.POSTGRES_STATEMENT_CACHE_SIZE
+        connect_args["prepared_statement_cache_size"] = settings.POSTGRES_STATEMENT_CACHE_SIZE
+    else:
+        # Behind a transaction-pooling PgBouncer named prepared statements cannot be reused.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+    return connect_args
+
+
+def create_postgres_engine(role: str) -> AsyncEngine:
+    pool = settings.postgres_pool(role)
+    engine = create_async_engine(
+        settings.get_database_url(),
+        echo=False,
+        pool_pre_ping=True,
+        poolclass=timed_pool(role),
+        pool_size=pool.size,
+        max_overflow=pool.max_overflow,
+        pool_timeout=pool.timeout,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        connect_args=_connect_args(role),
+        json_serializer=codec.dumps,
+        json_deserializer=codec.loads,
+    )
+    track_checkouts(engine, role)
+    return engine
+
+
+def create_postgres_session(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=engine,
+        expire_on_commit=False,
+        autoflush=False,
+        class_=AsyncSession,
+    )
+
+
+async def init_postgres(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
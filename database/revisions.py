@@ -0,0 +1,47 @@
+"""
+Is the database schema at the migration head? Answered without importing Alembic (~0.1 s of imports, plus the
+env.py run), so that a process starting against a migrated database only pays for one query.
+"""
+from __future__ import annotations
+
+import re
+from functools import cache
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSIONS = Path(__file__).parent / "migrations" / "versions"
+VERSION_TABLE = "alembic_version"
+
+_REVISION = re.compile(r"^revision(?:\s*:[^=]+)?\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision(?:\s*:[^=]+)?\s*=\s*(.+)$", re.MULTILINE)
+_QUOTED = re.compile(r"['\"](\w+)['\"]")
+
+
+@cache
+def script_heads() -> frozenset[str]:
+    """Revisions of the migration scripts that no other script revises (read from the files, as Alembic does)."""
+    revisions, revised = set(), set()
+    for path in VERSIONS.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision is not None:
+            revised.update(_QUOTED.findall(down_revision.group(1)))
+    return frozenset(revisions - revised)
+
+
+async def current_heads(connection: AsyncConnection) -> frozenset[str]:
+    """Revisions stored in the database, empty when it was never migrated."""
+    if not await connection.run_sync(lambda sync_connection: inspect(sync_connection).has_table(VERSION_TABLE)):
+        return frozenset()
+    result = await connection.execute(text(f"SELECT version_num FROM {VERSION_TABLE}"))
+    return frozenset(result.scalars())
+
+
+async def is_current(connection: AsyncConnection) -> bool:
+    return await current_heads(connection) == script_heads()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, NamedTuple
+
+import pydantic_core
+from pydantic import BaseModel
+
+from database.config import settings
+
+
+class JsonCodec(NamedTuple):
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[str | bytes], Any]
+
+
+def _pydantic_codec() -> JsonCodec:
+    # pydantic-core encodes models, dataclasses, UUIDs, datetimes... natively: no intermediate dict.
+    return JsonCodec(
+        "pydantic",
+        lambda value: pydantic_core.to_json(value).decode(),
+        pydantic_core.from_json,
+    )
+
+
+def _orjson_codec() -> JsonCodec:
+    import orjson
+
+    def default(value: Any):
+        if isinstance(value, BaseModel):
+            # The model's own JSON, spliced into the document as is.
+            return orjson.Fragment(value.model_dump_json())
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+    return JsonCodec(
+        "orjson",
+        lambda value: orjson.dumps(value, default=default).decode(),
+        orjson.loads,
+    )
+
+
+def _stdlib_default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return str(value)
+
+
+def _stdlib_codec() -> JsonCodec:
+    return JsonCodec("stdlib", lambda value: json.dumps(value, default=_stdlib_default), json.loads)
+
+
+CODECS: dict[str, Callable[[], JsonCodec]] = {
+    "pydantic": _pydantic_codec,
+    "orjson": _orjson_codec,
+    "stdlib": _stdlib_codec,
+}
+
+
+def get_codec(name: str | None = None) -> JsonCodec:
+    name = name or settings.JSON_SERIALIZER
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON_SERIALIZER {name!r}, expected one of {sorted(CODECS)}")
+    try:
+        return CODECS[name]()
+    except ImportError:
+        print(f"JSON serializer {name!r} is not installed, falling back to 'pydantic'")
+        return _pydantic_codec()
+
+
+# Engine-wide JSON columns (Task input/output): passed as json_serializer / json_deserializer.
+codec = get_codec()
@@ -1,26 +1,53 @@
-# app/db_sqlite.py
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.pool import NullPool
-
-SQLITE_URL: str = "sqlite+aiosqlite:///./app.db"
-
-engine_sqlite = create_async_engine(
-    SQLITE_URL,
-    echo=False,
-    future=True,
-    connect_args={"timeout": 30},
-    poolclass=NullPool,
-)
-
-SessionLocalSqlite = async_sessionmaker(
-    bind=engine_sqlite,
-    expire_on_commit=False,
-    class_=AsyncSession,
-)
-
-
-async def init_sqlite() -> None:
-    async with engine_sqlite.begin() as conn:
-        await conn.execute(text("PRAGMA journal_mode=WAL"))
-        await conn.execute(text("PRAGMA foreign_keys=ON"))
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from database.config import settings
+from database.pool import timed_pool
+from database.serialization import codec
+from database.writer import WriteQueue
+
+def create_sqlite_engine() -> AsyncEngine:
+    """One per event loop (API loop, execution threads): pooled aiosqlite connections are bound to their loop."""
+    engine = create_async_engine(
+        # Same URL as the migrations (env.py): DATABASE_URL when set, ./app.db otherwise.
+        settings.get_database_url(),
+        echo=False,
+        future=True,
+        connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT},
+        poolclass=timed_pool("sqlite"),
+        pool_size=settings.SQLITE_POOL_SIZE,
+        max_overflow=settings.SQLITE_MAX_OVERFLOW,
+        json_serializer=codec.dumps,
+        json_deserializer=codec.loads,
+    )
+    event.listen(engine.sync_engine, "connect", _apply_pragmas)
+    return engine
+
+
+# Writes go through the write queue: no autoflush, so a read never opens a write transaction by itself.
+def create_sqlite_session(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=engine,
+        expire_on_commit=False,
+        autoflush=False,
+        class_=AsyncSession,
+    )
+
+
+def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+async def init_sqlite() -> WriteQueue | None:
+    if not settings.SQLITE_WRITE_QUEUE:
+        return None
+    writer = WriteQueue(batch_window=settings.SQLITE_WRITE_BATCH_MS / 1000)
+    writer.start()
+    return writer
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class WriteQueue:
+    """
+    Single writer task of an event loop, executing its writes one at a time so that SQLite never sees two writers
+    from this loop (the loops of other threads have their own queue: SQLite's busy timeout orders them).
+    Only what is submitted to it is serialized, two ways:
+    - ``commit`` (database.commit): ORM changes, flushed by the commit itself (sessions do not autoflush). Commit
+      requests queued for the same session while a write is running are coalesced into one commit.
+    - ``run`` (database.write): a whole unit of work (statements + commit), for writers that execute their own
+      INSERT / UPDATE / DELETE statements. Such statements executed outside of it open a write transaction
+      the queue knows nothing about.
+    Reads do not go through the queue and stay concurrent (WAL).
+    """
+
+    def __init__(self, batch_window: float = 0.0) -> None:
+        self.batch_window = batch_window
+        self._pending: dict[AsyncSession, list[asyncio.Future]] = {}
+        self._contexts: dict[AsyncSession, contextvars.Context] = {}
+        self._work: list[tuple[Callable[[], Awaitable], asyncio.Future, contextvars.Context]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="sqlite-writer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        await self._drain()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def commit(self, session: AsyncSession) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(session, []).append(future)
+        # The commit runs in the requester's context so per-request / per-job instrumentation still sees it.
+        self._contexts.setdefault(session, contextvars.copy_context())
+        self._wakeup.set()
+        await future
+
+    async def run(self, work: Callable[[], Awaitable[T]]) -> T:
+        """Result of ``work()``, executed by the writer task: ``work`` must commit (or roll back) before returning."""
+        future = asyncio.get_running_loop().create_future()
+        self._work.append((work, future, contextvars.copy_context()))
+        self._wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            self._wakeup.clear()
+            await self._drain()
+
+    async def _drain(self) -> None:
+        pending, self._pending = self._pending, {}
+        contexts, self._contexts = self._contexts, {}
+        for session, futures in pending.items():
+            try:
+                await asyncio.create_task(session.commit(), context=contexts[session])
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+        work, self._work = self._work, []
+        for run, future, context in work:
+            try:
+                result = await asyncio.create_task(run(), context=context)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
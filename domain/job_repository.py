@@ -1,15 +1,30 @@
 from __future__ import annotations
 
 import uuid
+from collections import defaultdict
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import LargeBinary, Row, Text, cast, func, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 import database.database
+from domain.models.archive import archived_jobs
+from domain.models.enums.status import Status
 from domain.models.job import Job
+from domain.models.job_dependency import JobDependency
+from domain.models.enums.task_type import TaskType
 from domain.models.task import Task
+from domain.models.task_dependency import TaskDependency
+
+
+def _select_jobs():
+    # Not select(Job): it filters on the kinds of the Job classes imported so far, and job definitions are only
+    # imported when one of their rows is loaded (see domain.models.task._LazyPolymorphicMap).
+    return select(Task).where(Task.task_type == TaskType.JOB)
 
 
 @dataclass
@@ -17,29 +32,204 @@ class JobRepository:
     session: AsyncSession
 
     async def get_all(self, load_graph: bool = True) -> list[Job]:
-        stmt = select(Job)
+        stmt = _select_jobs()
         if load_graph:
             stmt = stmt.options(
-                selectinload(Job.children).selectinload(Task.upstream_links),
-                selectinload(Job.children).selectinload(Task.downstream_links),
-                selectinload(Job.dependencies),
+                selectinload(Task.children).selectinload(Task.upstream_links),
+                selectinload(Task.children).selectinload(Task.downstream_links),
+                selectinload(Task.dependencies),
             )
 
         result = await self.session.execute(stmt)
         return list(result.scalars().unique().all())
 
+    async def get_archived(self) -> list[Row]:
+        """Archived root jobs (see domain.services.archive), most recently finished first."""
+        result = await self.session.execute(select(archived_jobs).order_by(archived_jobs.c.finished_at.desc()))
+        return list(result)
+
     async def get(self, job_id: uuid.UUID, load_graph: bool = False) -> Job:
-        stmt = select(Job).where(Job.id == job_id)
+        stmt = _select_jobs().where(Task.id == job_id)
         if load_graph:
             stmt = stmt.options(
-                selectinload(Job.children).selectinload(Task.upstream_links),
-                selectinload(Job.children).selectinload(Task.downstream_links),
-                selectinload(Job.dependencies),
+                selectinload(Task.children).selectinload(Task.upstream_links),
+                selectinload(Task.children).selectinload(Task.downstream_links),
+                selectinload(Task.dependencies),
             )
 
         result = await self.session.execute(stmt)
         return result.scalar_one()
 
+    async def get_version(self, job_id: uuid.UUID) -> tuple[int, Status] | None:
+        """(version, status) of a job without loading it."""
+        stmt = select(Task.version, Task.status).where(Task.id == job_id, Task.task_type == TaskType.JOB)
+        row = (await self.session.execute(stmt)).one_or_none()
+        return (row.version, row.status) if row else None
+
+    async def get_statuses(self, job_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, Status]:
+        """Status of each root job found among ``job_ids``, archived ones included (see depends_on)."""
+        job_ids = list(job_ids)
+        live = await self.session.execute(
+            select(Task.id, Task.status).where(Task.id.in_(job_ids), Task.parent_id.is_(None))
+        )
+        statuses = {row.id: row.status for row in live}
+        missing = [job_id for job_id in job_ids if job_id not in statuses]
+        if missing:
+            archived = await self.session.execute(
+                select(archived_jobs.c.id, archived_jobs.c.status).where(archived_jobs.c.id.in_(missing))
+            )
+            statuses.update((row.id, Status(row.status)) for row in archived)
+        return statuses
+
+    async def get_upstream_jobs(self, job_id: uuid.UUID) -> list[uuid.UUID]:
+        """Root jobs ``job_id`` was submitted to wait for (depends_on)."""
+        result = await self.session.execute(
+            select(JobDependency.upstream_job_id).where(JobDependency.job_id == job_id)
+        )
+        return list(result.scalars())
+
+    async def get_waiting_jobs(self) -> list[Row]:
+        """(job_id, upstream_job_id) of the SCHEDULED root jobs still waiting for their upstream jobs (depends_on)."""
+        result = await self.session.execute(
+            select(JobDependency.job_id, JobDependency.upstream_job_id)
+            .join(Task, Task.id == JobDependency.job_id)
+            .where(JobDependency.released_at.is_(None), Task.status == Status.SCHEDULED, Task.parent_id.is_(None))
+        )
+        return list(result)
+
+    async def get_graph(
+            self, job_id: uuid.UUID, depth: int | None = None, collapse: frozenset[uuid.UUID] = frozenset(),
+    ) -> tuple[list[Row], list[Row]]:
+        """
+        Flat (nodes, edges) rows of a job tree, projected in SQL (no ORM objects).
+        ``depth`` limits the levels below the job; the children of ``collapse`` jobs are not expanded.
+        """
+        tasks = Task.__table__
+        dependencies = TaskDependency.__table__
+
+        tree = select(tasks.c.id, literal(0).label("depth")).where(tasks.c.id == job_id).cte("tree", recursive=True)
+        child = tasks.alias("child")
+        step = select(child.c.id, tree.c.depth + 1).join(tree, child.c.parent_id == tree.c.id)
+        if depth is not None:
+            step = step.where(tree.c.depth < depth)
+        if collapse:
+            step = step.where(tree.c.id.not_in(collapse))
+        tree = tree.union_all(step)
+
+        counted = tasks.alias("counted")
+        child_count = select(func.count()).where(counted.c.parent_id == tasks.c.id).scalar_subquery()
+        nodes = await self.session.execute(
+            select(
+                tasks.c.id, tasks.c.parent_id, tasks.c.name, tasks.c.kind, tasks.c.task_type, tasks.c.status,
+                tasks.c.error, tasks.c.started_at, tasks.c.finished_at, tasks.c.version, tree.c.depth,
+                child_count.label("child_count"),
+            )
+            .join(tree, tree.c.id == tasks.c.id)
+            .order_by(tree.c.depth, tasks.c.created_at)
+        )
+        edges = await self.session.execute(
+            select(dependencies.c.upstream_task_id, dependencies.c.task_id, dependencies.c.merge_strategy)
+            .where(
+                dependencies.c.task_id.in_(select(tree.c.id)),
+                dependencies.c.upstream_task_id.in_(select(tree.c.id)),
+            )
+        )
+        return list(nodes), list(edges)
+
+    async def load_batch(self, root_job_id: uuid.UUID) -> Job:
+        """
+        Whole tree of a root job in two indexed queries (tasks, then dependencies, by ``root_job_id``),
+        relationships being wired from those rows instead of the per-level selectin cascade of ``get``.
+        """
+        tasks = (await self.session.execute(
+            select(Task).where(Task.root_job_id == root_job_id).order_by(Task.depth, Task.created_at).options(noload("*"))
+        )).scalars().all()
+        links = (await self.session.execute(
+            select(TaskDependency).where(TaskDependency.root_job_id == root_job_id).options(noload("*"))
+        )).scalars().all()
+
+        by_id = {task.id: task for task in tasks}
+        children, upstream, downstream, owned = defaultdict(list), defaultdict(list), defaultdict(list), defaultdict(list)
+        for task in tasks:
+            set_committed_value(task, "parent", by_id.get(task.parent_id))
+            if task.parent_id in by_id:
+                children[task.parent_id].append(task)
+        for link in links:
+            set_committed_value(link, "task", by_id[link.task_id])
+            set_committed_value(link, "upstream_task", by_id[link.upstream_task_id])
+            set_committed_value(link, "job", by_id.get(link.job_id))
+            upstream[link.task_id].append(link)
+            downstream[link.upstream_task_id].append(link)
+            if link.job_id is not None:
+                owned[link.job_id].append(link)
+        for task in tasks:
+            set_committed_value(task, "children", children[task.id])
+            set_committed_value(task, "upstream_links", upstream[task.id])
+            set_committed_value(task, "downstream_links", downstream[task.id])
+            set_committed_value(task, "dependencies", owned[task.id])
+
+        root = by_id.get(root_job_id)
+        if not isinstance(root, Job):
+            raise ValueError(f"No root job {root_job_id}")
+        return root
+
+    async def get_batch_tasks(self, root_job_id: uuid.UUID, *statuses: Status) -> list[Task]:
+        """Tasks of a batch, optionally by status (e.g. all FAILED ones), without their relationships."""
+        stmt = select(Task).where(Task.root_job_id == root_job_id).options(raiseload("*"))
+        if statuses:
+            stmt = stmt.where(Task.status.in_(statuses))
+        return list((await self.session.execute(stmt.order_by(Task.depth, Task.created_at))).scalars().all())
+
+    async def get_by_status(
+            self, *statuses: Status, task_type: TaskType | None = None, since: datetime | None = None, limit: int = 100,
+    ) -> list[Task]:
+        """
+        Latest tasks in the given statuses ("failed today", "running jobs"), read from the (status, created_at)
+        index. Their relationships are not loaded (empty).
+        """
+        stmt = select(Task).where(Task.status.in_(statuses)).options(noload("*"))
+        if task_type is not None:
+            stmt = stmt.where(Task.task_type == task_type)
+        if since is not None:
+            stmt = stmt.where(Task.created_at >= since)
+        return list((await self.session.execute(stmt.order_by(Task.created_at.desc()).limit(limit))).scalars().all())
+
+    async def get_task_summary(self, job_id: uuid.UUID, task_id: uuid.UUID) -> Row | None:
+        """Task metadata and payload sizes (payloads not loaded), if ``task_id`` belongs to the job's tree."""
+        tasks = Task.__table__
+        ancestors = select(tasks.c.id, tasks.c.parent_id).where(tasks.c.id == task_id).cte("ancestors", recursive=True)
+        parent = tasks.alias("parent")
+        ancestors = ancestors.union_all(
+            select(parent.c.id, parent.c.parent_id).join(ancestors, parent.c.id == ancestors.c.parent_id)
+        )
+        stmt = (
+            select(
+                tasks.c.id, tasks.c.parent_id, tasks.c.name, tasks.c.kind, tasks.c.task_type, tasks.c.status,
+                tasks.c.error, tasks.c.started_at, tasks.c.finished_at, tasks.c.created_at, tasks.c.updated_at,
+                *(
+                    func.length(self._payload_bytes(side, binary)).label(f"{side}_{'bin' if binary else 'json'}_size")
+                    for side in ("input", "output") for binary in (False, True)
+                ),
+            )
+            .where(tasks.c.id == task_id, select(ancestors.c.id).where(ancestors.c.id == job_id).exists())
+        )
+        return (await self.session.execute(stmt)).one_or_none()
+
+    def _payload_bytes(self, side: str, binary: bool):
+        """Stored payload as bytes in SQL, so that length/substr count bytes rather than characters."""
+        column = Task.__table__.c[f"{side}_bin" if binary else side]
+        if binary:
+            return column
+        if self.session.get_bind().dialect.name == "postgresql":
+            return func.convert_to(cast(column, Text), "UTF8")
+        return cast(column, LargeBinary)
+
+    async def read_payload(self, task_id: uuid.UUID, side: str, binary: bool, offset: int, length: int) -> bytes:
+        """``length`` bytes of a stored payload from ``offset``, sliced by the database."""
+        tasks = Task.__table__
+        stmt = select(func.substr(self._payload_bytes(side, binary), offset + 1, length)).where(tasks.c.id == task_id)
+        return bytes((await self.session.execute(stmt)).scalar_one() or b"")
+
     async def get_task(self, task_id: uuid.UUID) -> Task:
         stmt = select(Task).where(Task.id == task_id)
         result = await self.session.execute(stmt)
@@ -52,7 +242,7 @@ class JobRepository:
         await self.session.flush()
 
     async def commit(self) -> None:
-        await self.session.commit()
+        await database.database.commit(self.session)
 
     async def refresh(self, job: Job) -> None:
         await self.session.refresh(job)
@@ -1,4 +1,4 @@
-from . import task, job, task_dependency
+from . import task, job, task_dependency, job_dependency, hierarchy, versioning, archive, schedule
 from .mixins import base
 
-__all__ = ["job", "task", 'task_dependency', "base"]
+__all__ = ["job", "task", "task_dependency", "job_dependency", "hierarchy", "versioning", "archive", "schedule", "base"]
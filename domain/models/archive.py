@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, LargeBinary, String, Table, Uuid
+
+from domain.models.mixins.base import Base
+
+# Archived rows are only copied and scanned (never hydrated as ORM objects): plain tables.
+# On Postgres they are range-partitioned by month of created_at, partitions being created by the archiver.
+
+tasks_archive = Table(
+    "tasks_archive",
+    Base.metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("created_at", DateTime(timezone=True), primary_key=True),
+    Column("root_job_id", Uuid, nullable=False),
+    Column("task_type", String(10), nullable=False),
+    Column("kind", String(50), nullable=False),
+    Column("name", String(255), nullable=True),
+    Column("status", String(20), nullable=False),
+    Column("error", String, nullable=True),
+    Column("parent_id", Uuid, nullable=True),
+    Column("input", JSON, nullable=True),
+    Column("output", JSON, nullable=True),
+    Column("input_bin", LargeBinary, nullable=True),
+    Column("output_bin", LargeBinary, nullable=True),
+    Column("version", Integer, nullable=False),
+    Column("started_at", DateTime(timezone=True), nullable=True),
+    Column("finished_at", DateTime(timezone=True), nullable=True),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+    Index("ix_tasks_archive_root_job_id", "root_job_id"),
+    postgresql_partition_by="RANGE (created_at)",
+)
+
+task_dependencies_archive = Table(
+    "task_dependencies_archive",
+    Base.metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("created_at", DateTime(timezone=True), primary_key=True),
+    Column("root_job_id", Uuid, nullable=False),
+    Column("task_id", Uuid, nullable=False),
+    Column("upstream_task_id", Uuid, nullable=False),
+    Column("job_id", Uuid, nullable=True),
+    Column("merge_strategy", String(20), nullable=False),
+    Column("mapper_config", JSON, nullable=True),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+    Index("ix_task_dependencies_archive_root_job_id", "root_job_id"),
+    postgresql_partition_by="RANGE (created_at)",
+)
+
+# One row per archived root job, whatever the storage: what the listing API reads.
+archived_jobs = Table(
+    "archived_jobs",
+    Base.metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("kind", String(50), nullable=False),
+    Column("name", String(255), nullable=True),
+    Column("status", String(20), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("started_at", DateTime(timezone=True), nullable=True),
+    Column("finished_at", DateTime(timezone=True), nullable=True),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+    Column("task_count", Integer, nullable=False),
+    # None: rows in the archive tables; otherwise the compressed file holding them.
+    Column("location", String(1024), nullable=True),
+    Index("ix_archived_jobs_finished_at", "finished_at"),
+)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import abc
+from typing import ClassVar, Generic
+
+from domain.models.mixins.base import AbstractMappedMeta
+from domain.models.mixins.io import InputT, OutputT
+from domain.models.task import Task
+
+
+class BatchTask(Generic[InputT, OutputT], Task[InputT, OutputT], metaclass=AbstractMappedMeta):
+    """
+    Task whose work is amortized over many instances: the engine groups ready tasks of the same ``kind``
+    (up to ``batch_size`` of them, or whatever is ready after ``batch_window_ms``), calls ``action_batch``
+    once and stores every status/output of the batch with a single commit.
+    """
+
+    batch_size: ClassVar[int] = 50
+    batch_window_ms: ClassVar[float] = 20
+
+    @classmethod
+    @abc.abstractmethod
+    async def action_batch(cls, inputs: list[InputT]) -> list[OutputT]:
+        """One output per input, in the same order."""
+
+    async def action(self) -> OutputT:
+        # Run outside the engine (or alone): a batch of one.
+        outputs = await type(self).action_batch([self.input])
+        return outputs[0]
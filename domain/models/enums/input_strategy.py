@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import functools
+import importlib
 from enum import Enum
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Callable
+
+from sqlalchemy import select
+
+import database.database
+from database.config import settings
+from database.payload import decode_payload
+from domain.models.enums.task_type import TaskType
+from domain.models.mixins.io import _to_model
 
 
 class MergeStrategy(str, Enum):
@@ -12,6 +22,45 @@ class MergeStrategy(str, Enum):
     MERGE_DICT = "merge_dict"  # Merge all dict outputs (later keys override)
     MERGE_LIST = "merge_list"  # Concatenate all list outputs
     CUSTOM = "custom"  # Use custom mapper function
+    STREAM = "stream"  # Not materialized: consumed with Task.stream_input(), chunk by chunk
+
+
+# (module, name) -> mapper function, filled at import time by @register_mapper.
+_mappers: dict[tuple[str, str], Callable[[list[Any]], Any]] = {}
+
+
+def register_mapper(fn: Callable[[list[Any]], Any]) -> Callable[[list[Any]], Any]:
+    """Register a module-level function usable as ``add_upstream(..., mapper=fn)``."""
+    if fn.__qualname__ != fn.__name__ or fn.__name__ == "<lambda>":
+        raise ValueError(f"Mapper {fn.__qualname__} must be a module-level function")
+    _mappers[(fn.__module__, fn.__name__)] = fn
+    return fn
+
+
+@functools.cache
+def resolve_mapper(module_name: str, function_name: str) -> Callable[[list[Any]], Any]:
+    key = (module_name, function_name)
+    if key not in _mappers:
+        # Importing the module runs its @register_mapper decorators.
+        print(f"Loading custom mapper {module_name}.{function_name}")
+        module = importlib.import_module(module_name)
+        if key not in _mappers:
+            _mappers[key] = getattr(module, function_name)
+    return _mappers[key]
+
+
+def mapper_config_for(mapper: Callable[[list[Any]], Any]) -> dict:
+    """Serializable reference to ``mapper``, checked to resolve back to the same function."""
+    if mapper.__qualname__ != mapper.__name__ or mapper.__name__ == "<lambda>":
+        raise ValueError(f"Mapper {mapper.__qualname__} must be a module-level function")
+    config = {"module": mapper.__module__, "name": mapper.__name__}
+    try:
+        resolved = InputMapper.load_mapper_function(config)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Mapper {mapper.__qualname__} cannot be resolved from {config}: {e}") from e
+    if resolved is not mapper:
+        raise ValueError(f"Mapper {mapper.__qualname__} must be a module-level function, got {config}")
+    return config
 
 
 class InputMapper:
@@ -70,8 +119,6 @@ class InputMapper:
 
     @staticmethod
     def load_mapper_function(mapper_config: dict) -> Callable:
-        import importlib
-
         module_name = mapper_config.get("module")
         function_name = mapper_config.get("name")
 
@@ -81,34 +128,112 @@ class InputMapper:
                 "Must contain 'module' and 'name' keys."
             )
 
-        module = importlib.import_module(module_name)
-        mapper_fn = getattr(module, function_name)
+        return resolve_mapper(module_name, function_name)
 
-        return mapper_fn
+    @staticmethod
+    def combine(results: list[Any]) -> Any:
+        """Combine the results of links merged with different strategies."""
+        if all(isinstance(result, dict) for result in results):
+            return InputMapper.merge_outputs(results, MergeStrategy.MERGE_DICT)
+        return InputMapper.merge_outputs(results, MergeStrategy.MERGE_LIST)
 
 
 async def prepare_task_input(task) -> None:
-    if not task.upstream:
-        return
-    upstream_outputs = [up_task.output for up_task in task.upstream]
     if not task.upstream_links:
         return
-    first_link = task.upstream_links[0]
-    merge_strategy = MergeStrategy(first_link.merge_strategy)
-    mapper_config = first_link.mapper_config
-
-    custom_mapper = None
-    if mapper_config:
-        print(f"Loading custom mapper for {task.name}: {mapper_config}")
-        custom_mapper = InputMapper.load_mapper_function(mapper_config)
-
-    print(f"Preparing input for {task.name}, strategy={merge_strategy}, upstream_count={len(upstream_outputs)}")
-
-    # Merge outputs and assign to task input
-    merged_input = InputMapper.merge_outputs(
-        upstream_outputs,
-        merge_strategy,
-        custom_mapper
-    )
+
+    # One pass over the links: outputs are grouped by (strategy, mapper), in link order.
+    groups: dict[tuple[MergeStrategy, tuple[str, str] | None], list[Any]] = {}
+    for link in task.upstream_links:
+        if link.merge_strategy == MergeStrategy.STREAM:
+            continue
+        mapper_key = (link.mapper_config["module"], link.mapper_config["name"]) if link.mapper_config else None
+        groups.setdefault((MergeStrategy(link.merge_strategy), mapper_key), []).append(link.upstream_task.output)
+
+    if not groups:
+        return
+
+    print(f"Preparing input for {task.name}, strategies={[strategy for strategy, _ in groups]}, "
+          f"upstream_count={len(task.upstream_links)}")
+
+    results = [
+        InputMapper.merge_outputs(
+            outputs,
+            merge_strategy,
+            resolve_mapper(*mapper_key) if mapper_key else None,
+        )
+        for (merge_strategy, mapper_key), outputs in groups.items()
+    ]
+    merged_input = results[0] if len(results) == 1 else InputMapper.combine(results)
     print(f"Merged input for {task.name}: {merged_input}")
     task.input = merged_input
+
+
+def _item_model(model: Any) -> Any:
+    args = getattr(model, "__args__", None)
+    return args[0] if args and getattr(model, "__origin__", None) is list else None
+
+
+async def stream_task_input(task, chunk_size: int | None = None) -> AsyncIterator[Any]:
+    """
+    Items of the upstream outputs linked with MergeStrategy.STREAM, in link order.
+    List outputs are flattened like MERGE_LIST. Outputs are read from the DB ``chunk_size`` upstream
+    tasks at a time and converted one item at a time, so memory stays bounded by the chunk size.
+    """
+    size = chunk_size or settings.STREAM_CHUNK_SIZE
+    task_cls = type(task).__mapper__.base_mapper.class_
+    polymorphic_map = type(task).__mapper__.polymorphic_map
+    pending = [link.upstream_task_id for link in task.upstream_links if link.merge_strategy == MergeStrategy.STREAM]
+
+    while pending:
+        chunk, pending = pending[:size], pending[size:]
+        async with database.database.get_session_manager("worker") as session:
+            rows = {
+                row.id: row
+                for row in await session.execute(
+                    select(task_cls.id, task_cls.task_type, task_cls.kind, task_cls._output_data, task_cls._output_bin)
+                    .where(task_cls.id.in_(chunk))
+                )
+            }
+            # A job stores no output of its own: stream its children's outputs instead.
+            job_ids = [
+                task_id for task_id in chunk
+                if rows[task_id].task_type == TaskType.JOB
+                and rows[task_id]._output_data is None and rows[task_id]._output_bin is None
+            ]
+            children: dict[Any, list] = {}
+            if job_ids:
+                for child_id, parent_id in await session.execute(
+                    select(task_cls.id, task_cls.parent_id).where(task_cls.parent_id.in_(job_ids)).order_by(task_cls.created_at)
+                ):
+                    children.setdefault(parent_id, []).append(child_id)
+
+        for task_id in chunk:
+            if task_id in children:
+                pending = children.pop(task_id) + pending
+                continue
+            row = rows.pop(task_id)
+            mapper = polymorphic_map.get(row.kind)
+            output_model = mapper.class_.output_model if mapper else None
+            raw = decode_payload(row._output_bin) if row._output_bin is not None else row._output_data
+            if hasattr(raw, "tolist") and not isinstance(raw, list):
+                raw = raw.tolist()
+            if isinstance(raw, list):
+                item_model = _item_model(output_model)
+                for item in raw:
+                    yield _to_model(item_model, item) if item_model else item
+            elif raw is not None:
+                yield _to_model(output_model, raw)
+
+
+async def stream_task_input_chunks(task, chunk_size: int | None = None) -> AsyncIterator[list[Any]]:
+    """Same items as ``stream_task_input``, grouped in lists of at most ``chunk_size``."""
+    size = chunk_size or settings.STREAM_CHUNK_SIZE
+    chunk = []
+    async for item in stream_task_input(task, size):
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class MisfirePolicy(str, Enum):
+    """What a schedule does with the runs it missed (scheduler stopped, no leader...)."""
+    SKIP = "SKIP"  # launch nothing for them, unless late by less than SCHEDULER_MISFIRE_GRACE
+    CATCH_UP = "CATCH_UP"  # launch each of them, oldest first
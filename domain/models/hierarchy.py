@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from domain.models.task import Task
+from domain.models.task_dependency import TaskDependency
+
+
+def _place(task: Task) -> None:
+    """Sets ``root_job_id`` / ``depth`` of a new task from its parent chain."""
+    chain = [task]
+    while chain[-1].parent is not None:
+        chain.append(chain[-1].parent)
+    root = chain[-1]
+    # Ids are generated at INSERT time: the root's one is needed now.
+    if root.id is None:
+        root.id = uuid.uuid4()
+    task.root_job_id = root.id
+    task.depth = len(chain) - 1
+
+
+@event.listens_for(Session, "before_flush")
+def populate_hierarchy(session: Session, _flush_context, _instances) -> None:
+    new = list(session.new)
+    for obj in new:
+        if isinstance(obj, Task) and obj.root_job_id is None:
+            _place(obj)
+    for obj in new:
+        if isinstance(obj, TaskDependency) and obj.root_job_id is None and obj.task is not None:
+            if obj.task.root_job_id is None:
+                _place(obj.task)
+            obj.root_job_id = obj.task.root_job_id
+            obj.depth = obj.task.depth
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import DateTime, ForeignKey, UniqueConstraint, Uuid
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from domain.models.mixins.base import Base
+from domain.models.mixins.timestamp import Timestamp
+
+if TYPE_CHECKING:
+    from domain.models.task import Task
+
+
+class JobDependency(Timestamp, Base):
+    """
+    Root job ``job_id`` is queued once root job ``upstream_job_id`` succeeded (see
+    domain.services.job_dependencies). Unlike TaskDependency, it links two trees: no output is passed.
+    """
+    __tablename__ = "job_dependencies"
+    __table_args__ = (UniqueConstraint("job_id", "upstream_job_id"),)
+
+    job_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("tasks.id"), nullable=False, index=True)
+    # No foreign key: the upstream job may be archived (see domain.services.archive) before this one runs.
+    upstream_job_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False, index=True)
+    # Set once every upstream job succeeded, compare-and-set: only the process that set it queues the job.
+    released_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Inserted after the job it belongs to: the relationship orders the flush.
+    job: Mapped["Task"] = relationship("Task", foreign_keys=[job_id], lazy="raise")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, ClassVar, Generic
+
+from domain.models.enums.input_strategy import InputMapper, MergeStrategy
+from domain.models.job import Job
+from domain.models.mixins.io import IO, InputT, OutputT
+from domain.models.task import Task
+
+
+class MapJob(Generic[InputT, OutputT], Job[InputT, OutputT]):
+    """
+    Map-style job: its input is a list, expanded at run time into one ``item_task`` child per chunk.
+    Children outputs are reduced with ``reduce_strategy`` into the job's own (stored) output.
+
+    - ``chunk_size``: items per child, children receive a list;
+    - ``max_children``: alternatively, spread the items over at most this many children;
+    - neither: one child per item, receiving the item itself.
+    """
+
+    item_task: ClassVar[type[Task]]
+    chunk_size: ClassVar[int | None] = None
+    max_children: ClassVar[int | None] = None
+    max_concurrency: ClassVar[int] = 16
+    reduce_strategy: ClassVar[MergeStrategy] = MergeStrategy.MERGE_LIST
+    reducer: ClassVar[Callable[[list[Any]], Any] | None] = None
+
+    # Unlike a static Job, the reduced output is stored on the row.
+    output = IO.output
+
+    def split(self, items: list[Any]) -> list[Any]:
+        if self.chunk_size:
+            size = self.chunk_size
+        elif self.max_children:
+            size = max(1, math.ceil(len(items) / self.max_children))
+        else:
+            return list(items)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def expand(self) -> list[Task]:
+        items = self.raw_input
+        items = [] if items is None else items
+        if hasattr(items, "tolist"):
+            items = items.tolist()
+        if not isinstance(items, list):
+            raise ValueError(f"{self.name} expects a list input, got {type(items).__name__}")
+        children = []
+        for index, chunk in enumerate(self.split(items)):
+            child = self.item_task(name=f"{self.name or self.kind}[{index}]")
+            child.input = chunk
+            children.append(child)
+        # Appending to the collection (not setting child.parent) cascades the children into the session.
+        self.children.extend(children)
+        return children
+
+    def ordered_children(self) -> list[Task]:
+        """Children in expansion order (the collection order is not kept when reloaded from the DB)."""
+        return sorted(self.children, key=lambda child: int(child.name.rsplit("[", 1)[1].rstrip("]")))
+
+    def reduce(self, outputs: list[Any]) -> Any:
+        # Read from the class: a function stored on the instance side would come back as a bound method.
+        return InputMapper.merge_outputs(outputs, self.reduce_strategy, type(self).reducer)
@@ -1,3 +1,4 @@
+import abc
 import uuid
 
 from sqlalchemy import Uuid
@@ -11,3 +12,7 @@ class Base(AsyncAttrs, DeclarativeBase):
 
     def __hash__(self):
         return hash(self.id)
+
+
+class AbstractMappedMeta(abc.ABCMeta, type(Base)):
+    """Metaclass of mapped classes declaring ``abc.abstractmethod``: a subclass missing one cannot be instantiated."""
@@ -4,9 +4,11 @@ from dataclasses import is_dataclass, asdict
 from typing import Any, ClassVar, Optional, TypeVar, get_args, get_origin, Generic
 
 from pydantic import BaseModel
-from sqlalchemy import JSON
+from sqlalchemy import JSON, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column
 
+from database.payload import PayloadEncoding, decode_payload, encode_payload
+
 InputT = TypeVar("InputT")
 OutputT = TypeVar("OutputT")
 
@@ -24,12 +26,26 @@ def _to_model(model: Any, raw: Any):
         return raw
 
     origin = get_origin(model)
+    # Vecteurs binaires (array.array, numpy) relus pour un list[...] : copie en liste Python
+    if origin is list and not isinstance(raw, list) and hasattr(raw, "tolist"):
+        raw = raw.tolist()
+    # Listes de modèles (list[Model]) : conversion élément par élément
+    if origin is list and isinstance(raw, list):
+        (item_model,) = get_args(model) or (None,)
+        if isinstance(item_model, type) and (is_dataclass(item_model) or issubclass(item_model, BaseModel)):
+            return [_to_model(item_model, item) for item in raw]
     # Types génériques (list[str], dict[str, int], etc.)
     if origin in (list, dict, tuple, set):
         # Ici tu peux faire du mapping récursif fin si tu veux,
         # mais en pratique le JSON correspond déjà à la structure.
         return raw
 
+    # Modèle Pydantic gardé tel quel (pas encore relu depuis la base)
+    if isinstance(raw, BaseModel):
+        if isinstance(model, type) and isinstance(raw, model):
+            return raw
+        raw = raw.model_dump()
+
     # Si ce n'est pas un dict, on suppose que c'est déjà instancié ou un type simple
     if not isinstance(raw, dict):
         return raw
@@ -46,12 +62,16 @@ def _to_model(model: Any, raw: Any):
 
 
 def _to_json(value: Any):
+    """
+    JSON-compatible value for the IO columns. Pydantic models are kept as is:
+    the engine's json_serializer encodes them directly (see database.serialization).
+    """
     if value is None:
         return None
     if is_dataclass(value):
         return asdict(value)
     if isinstance(value, BaseModel):
-        return value.model_dump()
+        return value
     if isinstance(value, list):
         return [_to_json(item) for item in value]
     if isinstance(value, dict):
@@ -73,10 +93,26 @@ class IO(Generic[InputT, OutputT]):
         nullable=True,
     )
 
+    # Payloads binaires (voir database.payload), utilisés à la place du JSON quand un encodage est choisi
+    _input_bin: Mapped[bytes | None] = mapped_column(
+        "input_bin",
+        LargeBinary,
+        nullable=True,
+    )
+    _output_bin: Mapped[bytes | None] = mapped_column(
+        "output_bin",
+        LargeBinary,
+        nullable=True,
+    )
+
     # modèles typés déduits des génériques
     input_model: ClassVar[Optional[Any]] = None
     output_model: ClassVar[Optional[Any]] = None
 
+    # Encodage binaire, ex. "msgpack+zstd" ; sinon pris dans ``__payload_encoding__`` du modèle ; None = JSON
+    input_encoding: ClassVar[PayloadEncoding | str | None] = None
+    output_encoding: ClassVar[PayloadEncoding | str | None] = None
+
     def __init_subclass__(cls, **kwargs):
         """
         Déduction automatique de InputT / OutputT à partir des bases génériques.
@@ -110,22 +146,49 @@ class IO(Generic[InputT, OutputT]):
             # on prend le premier match qui convient
             break
 
+        for side, model in (("input", cls.input_model), ("output", cls.output_model)):
+            spec = cls.__dict__.get(f"{side}_encoding") or getattr(model, "__payload_encoding__", None)
+            spec = spec or getattr(cls, f"{side}_encoding")
+            setattr(cls, f"{side}_encoding", PayloadEncoding.parse(spec) if spec else None)
+
+    @staticmethod
+    def _store(value: Any, encoding: PayloadEncoding | None) -> tuple[Any, bytes | None]:
+        """(JSON, binary) column values for ``value``: only one of them is set."""
+        if value is None:
+            return None, None
+        if encoding is None:
+            return _to_json(value), None
+        return None, encode_payload(value, encoding)
+
+    @property
+    def raw_input(self) -> Any:
+        """Stored input before conversion to ``input_model``."""
+        if self._input_bin is not None:
+            return decode_payload(self._input_bin)
+        return self._input_data
+
+    @property
+    def raw_output(self) -> Any:
+        if self._output_bin is not None:
+            return decode_payload(self._output_bin)
+        return self._output_data
+
     # ---- Input ----
 
     @property
     def input(self) -> Optional[InputT]:
-        return _to_model(self.input_model, self._input_data)
+        return _to_model(self.input_model, self.raw_input)
 
     @input.setter
     def input(self, value: Optional[InputT]) -> None:
-        self._input_data = _to_json(value)
+        self._input_data, self._input_bin = self._store(value, self.input_encoding)
 
     # ---- Output ----
 
     @property
     def output(self) -> Optional[OutputT]:
-        return _to_model(self.output_model, self._output_data)
+        return _to_model(self.output_model, self.raw_output)
 
     @output.setter
     def output(self, value: Optional[OutputT]) -> None:
-        self._output_data = _to_json(value)
+        self._output_data, self._output_bin = self._store(value, self.output_encoding)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Enum as SAEnum, Index, Integer, String, Table, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.config import settings
+from domain.models.enums.misfire_policy import MisfirePolicy
+from domain.models.mixins.base import Base
+from domain.models.mixins.timestamp import Timestamp
+from shared.cron import CronExpression, business_calendar, time_zone
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    """SQLite gives back the stored UTC datetimes without their time zone."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class Schedule(Timestamp, Base):
+    """A job type launched by the scheduler at the times of a cron expression (see domain.services.scheduler)."""
+    __tablename__ = "schedules"
+    __table_args__ = (
+        # The scheduler's reload: enabled schedules and their next run.
+        Index("ix_schedules_enabled_next_run_at", "enabled", "next_run_at"),
+    )
+
+    name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    # Name in the job registry (domain.services.job_registry) and its input, as JSON.
+    job_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    input: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    priority: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    cron: Mapped[str] = mapped_column(String(100), nullable=False)
+    timezone: Mapped[str] = mapped_column(String(64), default="UTC", nullable=False)
+    # Name in settings.BUSINESS_CALENDARS: fires only on its business days.
+    calendar: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    misfire_policy: Mapped[MisfirePolicy] = mapped_column(
+        SAEnum(MisfirePolicy), default=MisfirePolicy.SKIP, nullable=False,
+    )
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    # UTC. None while disabled; only moved forward by the scheduler, compare-and-set (no run launched twice).
+    next_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_job_id: Mapped[Optional[uuid.UUID]] = mapped_column(Uuid, nullable=True)
+
+    def validate(self) -> None:
+        """Raises shared.cron.CronError for an invalid cron expression, time zone or calendar."""
+        CronExpression.parse(self.cron)
+        time_zone(self.timezone)
+        if self.calendar is not None:
+            business_calendar(self.calendar)
+
+    def next_fire(self, after: datetime) -> datetime:
+        calendar = business_calendar(self.calendar) if self.calendar is not None else None
+        return CronExpression.parse(self.cron).next_fire(after, time_zone(self.timezone), calendar)
+
+    def plan(self, due: datetime, now: datetime) -> tuple[list[datetime], datetime]:
+        """(fire times to launch now, next run) for the run due at ``due``, according to the misfire policy."""
+        if self.misfire_policy == MisfirePolicy.CATCH_UP:
+            runs, fire = [], due
+            while fire <= now and len(runs) < settings.SCHEDULER_MAX_CATCH_UP:
+                runs.append(fire)
+                fire = self.next_fire(fire)
+            # The missed runs beyond the SCHEDULER_MAX_CATCH_UP oldest ones are dropped.
+            return runs, fire if fire > now else self.next_fire(now)
+        late = (now - due).total_seconds()
+        return ([due] if late <= settings.SCHEDULER_MISFIRE_GRACE else []), self.next_fire(now)
+
+
+# Named leases: the row's owner is the only process doing the lease's work until expires_at (see
+# domain.services.lease). Plain table, updated compare-and-set.
+leases = Table(
+    "leases",
+    Base.metadata,
+    Column("name", String(100), primary_key=True),
+    Column("owner", String(255), nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+)
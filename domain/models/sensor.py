@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import os
+import uuid
+from typing import ClassVar, Generic, Optional
+
+from pydantic import BaseModel
+
+from database import database
+from database.config import settings
+from database.notifications import FILE_CREATED, JOB_FINISHED, notifications
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.mixins.base import AbstractMappedMeta
+from domain.models.mixins.io import InputT, OutputT
+from domain.models.task import Task
+
+
+class Sensor(Generic[InputT, OutputT], Task[InputT, OutputT], metaclass=AbstractMappedMeta):
+    """
+    Task waiting for a condition outside its job. ``poke`` is called when the task runs, again on each
+    notification of ``channels`` (see database.notifications) and every ``recheck_interval`` seconds, until it
+    returns something else than None: the task's output. The task fails when ``poke`` raises or after ``timeout``.
+    A waiting sensor holds its job's run slot: to wait before a whole job starts, submit it with ``depends_on``.
+    """
+
+    channels: ClassVar[tuple[str, ...]] = ()
+    # None: settings.SENSOR_RECHECK_INTERVAL / SENSOR_TIMEOUT.
+    recheck_interval: ClassVar[float | None] = None
+    timeout: ClassVar[float | None] = None
+
+    @abc.abstractmethod
+    async def poke(self) -> Optional[OutputT]:
+        """The output once the condition holds, None while it does not."""
+
+    async def action(self) -> OutputT:
+        try:
+            return await notifications.wait_for(
+                self.poke, self.channels,
+                self.recheck_interval or settings.SENSOR_RECHECK_INTERVAL, self.timeout or settings.SENSOR_TIMEOUT,
+            )
+        except TimeoutError as e:
+            raise TimeoutError(f"{self.name or self.kind}: {e}") from None
+
+
+class JobStatusInput(BaseModel):
+    job_id: uuid.UUID
+    # Statuses the sensor waits for; a job finishing with another one fails the sensor.
+    statuses: list[Status] = [Status.SUCCESS]
+
+
+class JobStatusSensor(Sensor[JobStatusInput, Status]):
+    """Waits for another root job (a previous date's reference pricing...) to reach one of ``statuses``."""
+
+    channels = (JOB_FINISHED,)
+
+    async def poke(self) -> Status | None:
+        job_id = self.input.job_id
+        async with database.get_session_manager("worker") as session:
+            status = (await JobRepository(session).get_statuses([job_id])).get(job_id)
+        if status is None:
+            raise ValueError(f"Job {job_id} not found")
+        if status in self.input.statuses:
+            return status
+        if status.is_final():
+            raise ValueError(f"Job {job_id} ended {status}")
+        return None
+
+
+class FileInput(BaseModel):
+    path: str
+
+
+class FileSensor(Sensor[FileInput, str]):
+    """
+    Waits for a file to exist, its output being the path. Writers announce files with POST
+    /api/notifications/files; files nobody announces are found by the periodic recheck.
+    """
+
+    channels = (FILE_CREATED,)
+
+    async def poke(self) -> str | None:
+        path = self.input.path
+        return path if await asyncio.to_thread(os.path.exists, path) else None
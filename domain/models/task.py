@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import uuid
-from typing import Optional, TYPE_CHECKING, Generic
+from typing import Any, AsyncIterator, ClassVar, Optional, TYPE_CHECKING, Generic
 
-from sqlalchemy import Enum as SAEnum, ForeignKey, String
+from sqlalchemy import Enum as SAEnum, ForeignKey, Index, Integer, String, Uuid, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
 
+from domain.models.enums.input_strategy import MergeStrategy, stream_task_input, stream_task_input_chunks
 from domain.models.enums.status import Status
 from domain.models.enums.task_type import TaskType
 from domain.models.mixins.base import Base
@@ -18,6 +19,10 @@ if TYPE_CHECKING:
     from domain.models.job import Job
 
 
+# SQL predicate of the partial index on unfinished tasks: queries repeat it verbatim so that SQLite uses the index.
+ACTIVE_STATUSES = "status IN ('SCHEDULED', 'RUNNING', 'READY_TO_RETRY')"
+
+
 class Task(Base, IO[InputT, OutputT], Dependency, Generic[InputT, OutputT], Lifecycle, Timestamp):
     """
     Base task: atomic task or job (polymorphic single-table inheritance).
@@ -26,6 +31,35 @@ class Task(Base, IO[InputT, OutputT], Dependency, Generic[InputT, OutputT], Life
 
     __tablename__ = "tasks"
 
+    # Deterministic, side-effect free tasks whose identical instances (same kind and input) should run once:
+    # while one is RUNNING, in this process or another worker, the others wait for its output.
+    single_flight: ClassVar[bool] = False
+    __table_args__ = (
+        Index("ix_tasks_root_job_id_status", "root_job_id", "status"),
+        Index("ix_tasks_root_job_id_depth", "root_job_id", "depth"),
+        # "failed today", "running jobs": status / type over a time window.
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        Index("ix_tasks_task_type_created_at", "task_type", "created_at", postgresql_include=["status"]),
+        # Runnable work: a few rows among millions of finished ones, polled often.
+        Index(
+            "ix_tasks_active", "status", "created_at",
+            postgresql_where=text(ACTIVE_STATUSES), sqlite_where=text(ACTIVE_STATUSES),
+            postgresql_include=["id", "kind", "root_job_id"],
+        ),
+        # Single-flight lookups (see domain.services.engine.reactive.single_flight): only hashed tasks are indexed.
+        Index(
+            "ix_tasks_kind_input_hash", "kind", "input_hash",
+            postgresql_where=text("input_hash IS NOT NULL"), sqlite_where=text("input_hash IS NOT NULL"),
+        ),
+        # Finished root jobs by age (archiver, listings). parent_id leads, although constant, so that SQLite
+        # prefers it to ix_tasks_parent_id (whose statistics estimate ~one job's worth of rows per value).
+        Index(
+            "ix_tasks_roots_finished_at", "parent_id", "finished_at",
+            postgresql_where=text("parent_id IS NULL"), sqlite_where=text("parent_id IS NULL"),
+            postgresql_include=["status"],
+        ),
+    )
+
     task_type: Mapped[TaskType] = mapped_column(
         SAEnum(TaskType),
         default=TaskType.TASK,
@@ -44,6 +78,12 @@ class Task(Base, IO[InputT, OutputT], Dependency, Generic[InputT, OutputT], Life
 
     error: Mapped[Optional[str]] = mapped_column(nullable=True)
 
+    # sha256 of the stored input, set when a single_flight task starts: identical running tasks share one execution.
+    input_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+    # Bumped on jobs whenever a task of their tree is persisted (see domain.models.versioning): cache/ETag key.
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # Parent job (if any). Only Jobs can be parents, but stored in same table (STI).
     parent_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         ForeignKey("tasks.id"),
@@ -51,6 +91,11 @@ class Task(Base, IO[InputT, OutputT], Dependency, Generic[InputT, OutputT], Life
         index=True,
     )
 
+    # Top-level job of the tree (the task itself for a root) and distance to it, set on insert
+    # (see domain.models.hierarchy): a whole batch is one indexed query instead of a parent_id traversal.
+    root_job_id: Mapped[Optional[uuid.UUID]] = mapped_column(Uuid, nullable=True)
+    depth: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     parent: Mapped[Optional["Job"]] = relationship(
         "Task",
         back_populates="children",
@@ -87,6 +132,20 @@ class Task(Base, IO[InputT, OutputT], Dependency, Generic[InputT, OutputT], Life
             return True
         return all(t.status == Status.SUCCESS for t in self.upstream)
 
+    @property
+    def is_stream_only(self) -> bool:
+        """Output consumed only through MergeStrategy.STREAM links: no need to keep it in memory once stored."""
+        return bool(self.downstream_links) and all(
+            link.merge_strategy == MergeStrategy.STREAM for link in self.downstream_links
+        )
+
+    def stream_input(self, chunk_size: int | None = None) -> AsyncIterator[Any]:
+        """Fan-in input of the MergeStrategy.STREAM links, loaded from the DB chunk by chunk."""
+        return stream_task_input(self, chunk_size)
+
+    def stream_input_chunks(self, chunk_size: int | None = None) -> AsyncIterator[list[Any]]:
+        return stream_task_input_chunks(self, chunk_size)
+
     @declared_attr
     def __mapper_args__(self):
         return {"polymorphic_on": self.kind, "polymorphic_identity": f"{self.__module__}.{self.__name__}"}
@@ -95,4 +154,34 @@ class Task(Base, IO[InputT, OutputT], Dependency, Generic[InputT, OutputT], Life
         print(f"action executed {self.id=} {self.name=} {self.kind=} {self.status=}")
 
     def __repr__(self):
-        return f"<{self.name} | {self.status}>"
\ No newline at end of file
+        return f"<{self.name} | {self.status}>"
+
+
+class _LazyPolymorphicMap(dict):
+    """
+    kind -> mapper of the Task hierarchy. A kind read from the database whose class is not imported yet
+    ("module.Class") is looked for among the declared job types (domain.services.job_registry), the ones of the
+    kind's module first: importing a job module maps its classes, so job definitions load on first use. Nothing
+    else is imported: a stored kind never names the module to load.
+    """
+
+    def __missing__(self, kind: str):
+        from domain.services.job_registry import job_registry
+
+        module_name = kind.rpartition(".")[0]
+        names = sorted(job_registry.names(), key=lambda name: job_registry.module_of(name) != module_name)
+        for name in names:
+            if dict.__contains__(self, kind):
+                break
+            print(f"Loading task kind {kind} from job type {name}")
+            try:
+                job_registry.get(name)
+            except Exception as e:
+                print(f"Job type {name} not loaded: {e!r}")
+        if dict.__contains__(self, kind):
+            return dict.__getitem__(self, kind)
+        raise KeyError(f"Unknown task kind {kind!r}: defined by none of the declared job types")
+
+
+# Subclass mappers share their base's map: installed before any of them is defined.
+Task.__mapper__.polymorphic_map = _LazyPolymorphicMap(Task.__mapper__.polymorphic_map)
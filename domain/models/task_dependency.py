@@ -3,14 +3,14 @@ from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING, Callable, Any
 
-from sqlalchemy import ForeignKey, String, JSON
+from sqlalchemy import ForeignKey, Integer, String, JSON, Uuid
 from sqlalchemy.ext.associationproxy import association_proxy, AssociationProxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
 
 from domain.models.enums.status import Status
 from domain.models.mixins.base import Base
 from domain.models.mixins.timestamp import Timestamp
-from domain.models.enums.input_strategy import MergeStrategy
+from domain.models.enums.input_strategy import MergeStrategy, mapper_config_for
 
 if TYPE_CHECKING:
     from domain.models.task import Task
@@ -56,6 +56,10 @@ class TaskDependency(Timestamp, Base):
         foreign_keys=[job_id],
     )
 
+    # Root job and depth of ``task``, copied on insert (see domain.models.hierarchy).
+    root_job_id: Mapped[uuid.UUID | None] = mapped_column(Uuid, nullable=True, index=True)
+    depth: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     # Input mapping configuration
     merge_strategy: Mapped[str] = mapped_column(
         String(20),
@@ -120,17 +124,16 @@ class Dependency:
             if t in self.upstream:
                 continue
 
-            # Prepare mapper config if custom mapper provided
+            # Prepare mapper config if custom mapper provided, validated now rather than when the task runs
             mapper_config = None
             if mapper is not None:
                 if merge_strategy != MergeStrategy.CUSTOM:
                     raise ValueError(
                         "mapper function can only be used with merge_strategy='custom'"
                     )
-                mapper_config = {
-                    "module": mapper.__module__,
-                    "name": mapper.__name__,
-                }
+                mapper_config = mapper_config_for(mapper)
+            elif merge_strategy == MergeStrategy.CUSTOM:
+                raise ValueError("merge_strategy='custom' requires a mapper function")
 
             dep = TaskDependency(
                 task=self,
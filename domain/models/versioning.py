@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from domain.models.enums.task_type import TaskType
+from domain.models.task import Task
+from domain.models.task_dependency import TaskDependency
+
+
+def _jobs_of(task: Task):
+    """The task itself if it is a job, then its ancestors."""
+    current = task if task.task_type == TaskType.JOB else task.parent
+    while current is not None:
+        yield current
+        current = current.parent
+
+
+@event.listens_for(Session, "before_flush")
+def bump_job_versions(session: Session, _flush_context, _instances) -> None:
+    """Every flush touching a job's tree bumps that job's ``version`` (and its parents'), once per flush."""
+    changed: list[Task] = []
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, TaskDependency):
+            obj = obj.task
+        if isinstance(obj, Task) and (obj in session.new or session.is_modified(obj, include_collections=False)):
+            changed.append(obj)
+
+    jobs = {}
+    for task in changed:
+        for job in _jobs_of(task):
+            jobs[id(job)] = job
+    for job in jobs.values():
+        job.version = (job.version or 0) + 1
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database.database
+from domain.models.schedule import Schedule
+
+
+@dataclass
+class ScheduleRepository:
+    session: AsyncSession
+
+    async def get_all(self) -> list[Schedule]:
+        result = await self.session.execute(select(Schedule).order_by(Schedule.name))
+        return list(result.scalars())
+
+    async def get(self, schedule_id: uuid.UUID) -> Schedule | None:
+        return await self.session.get(Schedule, schedule_id)
+
+    async def get_pending(self) -> list[Row]:
+        """(id, next_run_at) of the enabled schedules: the scheduler's timers."""
+        stmt = select(Schedule.id, Schedule.next_run_at).where(Schedule.enabled, Schedule.next_run_at.is_not(None))
+        return list(await self.session.execute(stmt))
+
+    async def claim(
+            self, schedule_id: uuid.UUID, due: datetime, next_run_at: datetime, run_at: datetime | None,
+    ) -> bool:
+        """
+        Moves the next run of a schedule still due at ``due`` to ``next_run_at``, committed: False when another
+        process (or an update of the schedule) moved it first. Only the process that moved it launches the run.
+        """
+        values: dict = {"next_run_at": next_run_at}
+        if run_at is not None:
+            values["last_run_at"] = run_at
+        result = await self.session.execute(
+            update(Schedule)
+            .where(Schedule.id == schedule_id, Schedule.enabled, Schedule.next_run_at == due)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def set_last_job(self, schedule_id: uuid.UUID, job_id: uuid.UUID) -> None:
+        await self.session.execute(
+            update(Schedule).where(Schedule.id == schedule_id).values(last_job_id=job_id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
+    async def add(self, schedule: Schedule) -> None:
+        self.session.add(schedule)
+
+    async def delete(self, schedule: Schedule) -> None:
+        await self.session.delete(schedule)
+
+    async def commit(self) -> None:
+        await database.database.commit(self.session)
+
+    async def refresh(self, schedule: Schedule) -> None:
+        await self.session.refresh(schedule)
+
+
+async def get_schedule_repository():
+    async with database.database.get_session_manager() as session:
+        yield ScheduleRepository(session)
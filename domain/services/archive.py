@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import functools
+import gzip
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import Table, delete, func, insert, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from database import database
+from database.config import settings
+from domain.models.archive import archived_jobs, task_dependencies_archive, tasks_archive
+from domain.models.enums.status import Status
+from domain.models.job_dependency import JobDependency
+from domain.models.task import Task
+from domain.models.task_dependency import TaskDependency
+
+tasks = Task.__table__
+dependencies = TaskDependency.__table__
+job_dependencies = JobDependency.__table__
+
+FINAL_STATUSES = [status for status in Status if status.is_final()]
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode()
+    if isinstance(value, (uuid.UUID, datetime)):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _month_starts(first: datetime, last: datetime):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= last:
+        following = (month + timedelta(days=32)).replace(day=1)
+        yield month, following
+        month = following
+
+
+@dataclass
+class Archiver:
+    """
+    Moves finished root jobs older than a cutoff, with their whole subtree, out of ``tasks`` /
+    ``task_dependencies``: into the archive tables (``mode="table"``) or one gzip JSON-lines file per job
+    (``mode="file"``). Jobs are processed ``batch_size`` at a time, one transaction per batch (run by the write
+    queue), rows being copied by the database (INSERT ... SELECT) rather than loaded, selected by ``root_job_id``.
+    """
+    engine: AsyncEngine
+    mode: str = field(default_factory=lambda: settings.ARCHIVE_MODE)
+    batch_size: int = field(default_factory=lambda: settings.ARCHIVE_BATCH_SIZE)
+    directory: str = field(default_factory=lambda: settings.ARCHIVE_DIR)
+
+    def __post_init__(self):
+        if self.mode not in ("table", "file"):
+            raise ValueError(f"Unknown archive mode {self.mode!r}, expected 'table' or 'file'")
+
+    async def run(self, older_than: timedelta) -> int:
+        cutoff = datetime.now() - older_than
+        archived = 0
+        while True:
+            # Each batch is a write like the others: through the write queue (SQLite).
+            roots = await database.write(functools.partial(self._archive_batch, cutoff))
+            if not roots:
+                break
+            archived += len(roots)
+            print(f"Archived {len(roots)} jobs ({archived} so far)")
+        return archived
+
+    async def _archive_batch(self, cutoff: datetime) -> list:
+        async with self.engine.begin() as conn:
+            roots = await self._next_roots(conn, cutoff)
+            if not roots:
+                return roots
+            tree = self._tree([root.id for root in roots])
+            if self.mode == "table":
+                locations = await self._to_tables(conn, tree)
+            else:
+                locations = await self._to_files(conn, tree, roots)
+            await self._index(conn, tree, roots, locations)
+            await self._delete(conn, tree)
+        return roots
+
+    async def _next_roots(self, conn: AsyncConnection, cutoff: datetime) -> list:
+        result = await conn.execute(
+            select(tasks.c.id, tasks.c.kind, tasks.c.name, tasks.c.status, tasks.c.created_at,
+                   tasks.c.started_at, tasks.c.finished_at)
+            .where(tasks.c.parent_id.is_(None), tasks.c.status.in_(FINAL_STATUSES), tasks.c.finished_at < cutoff)
+            .order_by(tasks.c.finished_at)
+            .limit(self.batch_size)
+        )
+        return list(result)
+
+    @staticmethod
+    def _tree(root_ids: list[uuid.UUID]):
+        """(id, root_id) of every task below the given roots, roots included."""
+        return (
+            select(tasks.c.id, tasks.c.root_job_id.label("root_id"))
+            .where(tasks.c.root_job_id.in_(root_ids))
+            .cte("tree")
+        )
+
+    # ---- archive tables ----
+
+    async def _to_tables(self, conn: AsyncConnection, tree) -> dict[uuid.UUID, str | None]:
+        now = datetime.now()
+        copies = (
+            (tasks_archive, tasks, tasks.c.id),
+            (task_dependencies_archive, dependencies, dependencies.c.task_id),
+        )
+        for archive, source, key in copies:
+            if conn.dialect.name == "postgresql":
+                await self._ensure_partitions(conn, archive, source, key, tree)
+            columns = [column.name for column in archive.c if column.name not in ("root_job_id", "archived_at")]
+            await conn.execute(
+                insert(archive).from_select(
+                    [*columns, "root_job_id", "archived_at"],
+                    select(*(source.c[name] for name in columns), tree.c.root_id, literal(now, archive.c.archived_at.type))
+                    .join(tree, key == tree.c.id),
+                )
+            )
+        return {}
+
+    @staticmethod
+    async def _ensure_partitions(conn: AsyncConnection, archive: Table, source: Table, key, tree) -> None:
+        first, last = (await conn.execute(
+            select(func.min(source.c.created_at), func.max(source.c.created_at)).join(tree, key == tree.c.id)
+        )).one()
+        if first is None:
+            return
+        for start, end in _month_starts(first, last):
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {archive.name}_p{start:%Y%m} PARTITION OF {archive.name} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+
+    # ---- compressed files ----
+
+    def _path(self, root) -> str:
+        return os.path.join(self.directory, f"{root.created_at:%Y}", f"{root.created_at:%m}", f"{root.id}.jsonl.gz")
+
+    async def _to_files(self, conn: AsyncConnection, tree, roots: list) -> dict[uuid.UUID, str | None]:
+        locations = {}
+        for root in roots:
+            path = self._path(root)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                for table, source, key in (("tasks", tasks, tasks.c.id), ("task_dependencies", dependencies, dependencies.c.task_id)):
+                    rows = await conn.stream(
+                        select(source).join(tree, key == tree.c.id).where(tree.c.root_id == root.id)
+                    )
+                    async for chunk in rows.mappings().partitions(500):
+                        lines = "".join(
+                            json.dumps({"table": table, **row}, default=_json_default) + "\n" for row in chunk
+                        )
+                        await asyncio.to_thread(f.write, lines)
+            os.replace(tmp, path)
+            locations[root.id] = path
+        return locations
+
+    # ---- common ----
+
+    @staticmethod
+    async def _index(conn: AsyncConnection, tree, roots: list, locations: dict[uuid.UUID, str | None]) -> None:
+        counts = dict((await conn.execute(select(tree.c.root_id, func.count()).group_by(tree.c.root_id))).all())
+        now = datetime.now()
+        await conn.execute(insert(archived_jobs), [
+            {
+                "id": root.id, "kind": root.kind, "name": root.name, "status": str(root.status),
+                "created_at": root.created_at, "started_at": root.started_at, "finished_at": root.finished_at,
+                "archived_at": now, "task_count": counts.get(root.id, 0), "location": locations.get(root.id),
+            }
+            for root in roots
+        ])
+
+    @staticmethod
+    async def _delete(conn: AsyncConnection, tree) -> None:
+        ids = select(tree.c.id)
+        await conn.execute(delete(dependencies).where(or_(
+            dependencies.c.task_id.in_(ids), dependencies.c.upstream_task_id.in_(ids), dependencies.c.job_id.in_(ids),
+        )))
+        # Links to the upstream jobs this one waited for are not kept (the archive holds what ran).
+        await conn.execute(delete(job_dependencies).where(job_dependencies.c.job_id.in_(ids)))
+        await conn.execute(delete(tasks).where(tasks.c.id.in_(ids)))
@@ -2,8 +2,10 @@ from typing import Generator
 
 from domain.models.enums.task_type import TaskType
 from domain.models.job import Job
+from domain.models.map_job import MapJob
 from domain.models.task import Task
 from .reactive_job import ReactiveJob
+from .reactive_map_job import ReactiveMapJob
 from .reactive_task import ReactiveTask
 
 
@@ -14,19 +16,25 @@ def iter_task_tree(root: Job) -> Generator[Task, None, None]:
         current = stack.pop()
         yield current
 
-        if current.task_type == TaskType.JOB and isinstance(current, Job):
+        # A map job runs its (runtime-expanded) children itself: they are not graph nodes.
+        if current.task_type == TaskType.JOB and isinstance(current, Job) and not isinstance(current, MapJob):
             stack.extend(current.children)
 
 
+def _node(task: Task) -> ReactiveTask:
+    if isinstance(task, MapJob):
+        return ReactiveMapJob(task=task)
+    if isinstance(task, Job):
+        return ReactiveJob(task=task)
+    return ReactiveTask(task=task)
+
+
 def build_reactive_graph(root: Job) -> dict[Task, ReactiveTask]:
-    nodes: dict[Task, ReactiveTask] = {
-        task:  ReactiveJob(task=task) if isinstance(task, Job) else ReactiveTask(task=task)
-        for task in iter_task_tree(root)
-    }
+    nodes: dict[Task, ReactiveTask] = {task: _node(task) for task in iter_task_tree(root)}
 
     for task, node in nodes.items():
         node.upstream = [nodes[up] for up in task.upstream if up in nodes]
-        if isinstance(task, Job):
+        if isinstance(node, ReactiveJob):
             node.children = [nodes[child] for child in task.children if child in nodes]
         if task.parent:
             node.parent = nodes[task.parent]
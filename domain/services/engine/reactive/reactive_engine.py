@@ -4,12 +4,18 @@ import asyncio
 import dataclasses
 import uuid
 
+from database import instrumentation
+from database.notifications import JOB_FINISHED, notifications
 from domain.job_repository import JobRepository
+from domain.models.batch_task import BatchTask
 from domain.services.engine.reactive.async_map import ConcurrentAsyncMap
 from domain.services.engine.reactive.event import Event, EventType
 from domain.services.engine.reactive.graph_builder import build_reactive_graph
 from domain.services.engine.reactive.reactive_job import ReactiveJob
+from domain.services.engine.reactive.state_writer import StateWriter
+from domain.services.engine.reactive.task_batcher import TaskBatcher
 
+# Shared by the execution threads: a job's entry is only ever touched by the loop its runs are routed to.
 active_engines: ConcurrentAsyncMap[uuid.UUID, "ReactiveEngine"] = ConcurrentAsyncMap()
 
 
@@ -17,8 +23,12 @@ active_engines: ConcurrentAsyncMap[uuid.UUID, "ReactiveEngine"] = ConcurrentAsyn
 class ReactiveEngine:
     repository: JobRepository
     job_id: uuid.UUID
-    lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock, init=False)
+    writer: StateWriter = dataclasses.field(init=False)
     done: asyncio.Event = dataclasses.field(default_factory=asyncio.Event, init=False)
+    batchers: dict[str, TaskBatcher] = dataclasses.field(default_factory=dict, init=False)
+
+    def __post_init__(self):
+        self.writer = StateWriter(self.repository.session)
 
     def on_next(self, event: Event):
         print(f"Received {event.type} for {event.task}")
@@ -26,17 +36,27 @@ class ReactiveEngine:
             self.done.set()
             print(f"Job {event.task} Completed")
 
-    async def _safe_commit(self) -> None:
-        await self.repository.flush()
-        await self.repository.commit()
+    def _batcher(self, task: BatchTask) -> TaskBatcher:
+        if task.kind not in self.batchers:
+            self.batchers[task.kind] = TaskBatcher(type(task), self.writer.flush)
+        return self.batchers[task.kind]
+
+    def _wire(self, nodes: dict) -> None:
+        for node in nodes.values():
+            node.on_change = self.writer.flush
+            if isinstance(node.task, BatchTask):
+                node.batcher = self._batcher(node.task)
 
     async def run(self) -> None:
+        with instrumentation.collect() as stats:
+            await self._run()
+        instrumentation.report(stats, "job", str(self.job_id))
+
+    async def _run(self) -> None:
 
-        job = await self.repository.get(self.job_id)
+        job = await self.repository.load_batch(self.job_id)
         nodes = build_reactive_graph(job)
-        for node in nodes.values():
-            node.on_change = self._safe_commit
-            node.lock = self.lock
+        self._wire(nodes)
 
         reactive_job = nodes.get(job)
 
@@ -54,17 +74,30 @@ class ReactiveEngine:
         try:
             await reactive_job.start()
             await self.done.wait()
+            # A failed job completes while other branches may still be writing: let them finish before the
+            # caller closes the session under them.
+            await self.writer.idle()
             await active_engines.delete(self.job_id)
+            await self._notify(job)
         finally:
             subscription.dispose()
 
+    @staticmethod
+    async def _notify(job) -> None:
+        # Committed by now: jobs and sensors waiting on this one re-read its status (see database.notifications).
+        if job.is_finished:
+            await notifications.publish(JOB_FINISHED, {"job_id": str(job.id), "status": job.status})
+
     async def retry(self, task_id: uuid.UUID) -> None:
-        job = await self.repository.get(self.job_id)
+        with instrumentation.collect() as stats:
+            await self._retry(task_id)
+        instrumentation.report(stats, "job", str(self.job_id))
+
+    async def _retry(self, task_id: uuid.UUID) -> None:
+        job = await self.repository.load_batch(self.job_id)
         task = await self.repository.get_task(task_id)
         nodes = build_reactive_graph(job)
-        for node in nodes.values():
-            node.on_change = self._safe_commit
-            node.lock = self.lock
+        self._wire(nodes)
 
         reactive_job = nodes.get(job)
         reactive_task = nodes.get(task)
@@ -83,7 +116,9 @@ class ReactiveEngine:
         try:
             await reactive_task.retry()
             await self.done.wait()
+            await self.writer.idle()
             await active_engines.delete(self.job_id)
+            await self._notify(job)
         finally:
             subscription.dispose()
 
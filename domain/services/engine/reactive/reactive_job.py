@@ -25,6 +25,7 @@ class ReactiveJob(ReactiveTask):
             if self.is_setup(*events) or not self.task.is_runnable:
                 return await self._start(event_type=EventType.SETUP)
             else:
+                self.open_span()
                 await self.refresh_input()
                 return await self._start(event_type=EventType.RUN)
         except Exception as e:
@@ -37,9 +38,11 @@ class ReactiveJob(ReactiveTask):
         try:
             statuses = [event.task.status for event in events]
             final_status = Status.compute(statuses)
-            if final_status.is_final() and self.task.status != final_status:
-                await self.finish()
+            finishing = final_status.is_final() and self.task.status != final_status
+            # Status first: finish() closes the job span, which records it.
             await self.set_status(final_status)
+            if finishing:
+                await self.finish()
             if self.is_retry(*events):
                 return Event(task=self.task, type=EventType.RETRY)
             if self.is_setup(*events):
@@ -79,8 +82,8 @@ class ReactiveJob(ReactiveTask):
             return self.subject.on_next(Event(task=self.task, type=event_type))
         if event_type == EventType.RETRY:
             return self.subject.on_next(Event(task=self.task, type=event_type))
+        self.open_span()
         await self.start_now()
-        await self.locked_update(self.task.start)
         return self.subject.on_next(Event(task=self.task, type=event_type))
 
 
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from domain.models.enums.status import Status
+from domain.models.map_job import MapJob
+from domain.models.task import Task
+from domain.services.engine.reactive.reactive_task import ReactiveTask
+
+
+@dataclass
+class ReactiveMapJob(ReactiveTask):
+    """
+    Runs like a task once its upstream succeeded: expands the MapJob into its children,
+    runs them with bounded concurrency and stores the reduced output.
+    Children that already succeeded (retry) are not run again.
+    """
+    task: MapJob
+
+    async def execute(self):
+        if not self.task.children:
+            with self.child_span("expand"):
+                children = self.task.expand()
+                # One write inserts every child row.
+                await self.apply_changes()
+            print(f"Expanded {self.task.name} into {len(children)} tasks")
+
+        children = self.task.ordered_children()
+        semaphore = asyncio.Semaphore(self.task.max_concurrency)
+        await asyncio.gather(*(
+            self._run_child(child, semaphore) for child in children if child.status != Status.SUCCESS
+        ))
+
+        failed = [child for child in children if child.status == Status.FAILED]
+        if failed:
+            raise RuntimeError(f"{len(failed)}/{len(children)} mapped tasks failed, first error: {failed[0].error}")
+        with self.child_span("reduce"):
+            return self.task.reduce([child.output for child in children])
+
+    async def _run_child(self, child: Task, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            with self.child_span(child.name):
+                child.status = Status.RUNNING
+                child.error = None
+                child.start()
+                await self.apply_changes()
+                try:
+                    output = await child.action()
+                except Exception as e:
+                    child.status = Status.FAILED
+                    child.error = str(e)
+                    child.finish()
+                    await self.apply_changes()
+                    return
+                child.output = output
+                child.status = Status.SUCCESS
+                child.finish()
+                await self.apply_changes()
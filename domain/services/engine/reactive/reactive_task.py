@@ -1,18 +1,24 @@
 from __future__ import annotations
 
 import asyncio
-import dataclasses
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import Callable, Awaitable, Optional
+from typing import Callable, Awaitable, Optional, TYPE_CHECKING
 
 from reactivex import Observable, combine_latest, operators, from_future, Subject
 from reactivex.subject import BehaviorSubject
+from sqlalchemy.orm.attributes import set_committed_value
 
 from domain.models.enums.input_strategy import prepare_task_input
 from domain.models.enums.status import Status
 from domain.models.task import Task
+from shared.tracing import Span, tracer
 from shared.utils import flatten_tuple_to_list
 from .event import Event, EventType
+from .single_flight import in_flight
+
+if TYPE_CHECKING:
+    from .task_batcher import TaskBatcher
 
 
 @dataclass
@@ -27,9 +33,14 @@ class ReactiveTask:
     complete: Subject = Subject()
     _observable: Observable | None = None
 
+    # Persists the task's pending changes (the engine's StateWriter.flush). Changes need no lock: every node runs
+    # on the engine's event loop, and a change is a plain attribute update between two awaits.
     on_change: Callable[[], Awaitable[None]] | None = None
 
-    lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock, init=False)
+    span: Span | None = None
+
+    # Set by the engine for BatchTask nodes: status, output and commits are then handled per batch.
+    batcher: TaskBatcher | None = None
 
     def __post_init__(self):
         self.subject = BehaviorSubject(Event(task=self.task, type=EventType.NONE))
@@ -56,19 +67,35 @@ class ReactiveTask:
                 return Event(task=self.task, type=EventType.RETRY)
 
             if self.task.is_runnable:
+                self.open_span()
                 await self.refresh_input()
-                await self.set_status(Status.RUNNING)
-                await self.start_now()
-                output = await self.task.action()
+                if self.batcher is not None:
+                    with self.child_span("action"):
+                        await self.batcher.submit(self.task)
+                    self.close_span()
+                    return Event(task=self.task, type=EventType.RUN)
+                if self.task.single_flight:
+                    output = await in_flight.run(self.task, self.start_running, self.execute)
+                else:
+                    await self.start_running()
+                    output = await self.execute()
                 await self.set_output(output)
                 await self.set_status(Status.SUCCESS)
                 await self.finish()
+                if self.task.is_stream_only:
+                    # Stored: stream consumers read it back from the DB, the engine need not hold it.
+                    set_committed_value(self.task, "_output_data", None)
+                    set_committed_value(self.task, "_output_bin", None)
             return Event(task=self.task, type=EventType.RUN)
         except Exception as e:
             await self.set_status(Status.FAILED, str(e))
             await self.finish()
             return Event(task=self.task, type=EventType.FAILED)
 
+    async def execute(self):
+        with self.child_span("action"):
+            return await self.task.action()
+
     def _get_observable(self) -> Observable:
         if self.is_root:
             return combine_latest(self.subject, self.parent.subject).pipe(
@@ -89,39 +116,62 @@ class ReactiveTask:
     def is_root(self) -> bool:
         return not self.upstream
 
+    def open_span(self) -> None:
+        if self.span is not None and not self.span.ended:
+            return
+        self.span = tracer.start_span(
+            self.task.name or self.task.kind,
+            parent=self.parent.span if self.parent else None,
+            attributes={"task.id": str(self.task.id), "task.kind": self.task.kind, "task.type": str(self.task.task_type)},
+        )
+
+    def child_span(self, name: str):
+        if self.span is None or self.span.ended:
+            return nullcontext()
+        return tracer.span(name, parent=self.span)
+
+    def close_span(self) -> None:
+        if self.span is None:
+            return
+        self.span.set_attribute("task.status", str(self.task.status))
+        if self.task.status == Status.FAILED:
+            self.span.set_error(self.task.error or "failed")
+        self.span.end()
+
     async def set_status(self, status: Status, error: Optional[str] = None) -> None:
-        async with self.lock:
-            if self.task.status != status:
-                self.task.status = status
-                print(f"Setting status of {self.task.name} to {status}")
-                await self.apply_changes()
-                if error:
-                    self.task.error = error
-                await self.apply_changes()
+        if self.task.status != status:
+            self.task.status = status
+            if error:
+                self.task.error = error
+            print(f"Setting status of {self.task.name} to {status}")
+            await self.apply_changes()
 
     async def refresh_input(self):
-        async with self.lock:
+        with self.child_span("input-merge"):
             await prepare_task_input(self.task)
-            await self.apply_changes()
+        await self.apply_changes()
 
     async def set_output(self, output) -> None:
-        async with self.lock:
-            self.task.output = output
-
-    async def locked_update(self, func: Callable) -> None:
-        async with self.lock:
-            func()
-            await self.apply_changes()
+        self.task.output = output
 
     async def finish(self):
-        await self.locked_update(self.task.finish)
+        self.task.finish()
+        await self.apply_changes()
+        self.close_span()
 
     async def start_now(self):
-        await self.locked_update(self.task.start)
+        self.task.start()
+        await self.apply_changes()
+
+    async def start_running(self):
+        self.task.status = Status.RUNNING
+        print(f"Setting status of {self.task.name} to {Status.RUNNING}")
+        await self.start_now()
 
     async def apply_changes(self) -> None:
         if self.on_change:
-            await self.on_change()
+            with self.child_span("persist"):
+                await self.on_change()
 
     async def retry(self) -> None:
         await asyncio.sleep(10)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable
+
+import pydantic_core
+from sqlalchemy import select
+from sqlalchemy.orm import raiseload
+
+from database import database, instrumentation
+from database.config import settings
+from domain.models.enums.status import Status
+from domain.models.task import Task
+
+Key = tuple[str, str]
+
+# The DB leader stopped running without an outcome (reset, retried, worker lost): the follower runs itself.
+_LEADER_LOST = object()
+
+
+class SingleFlightError(Exception):
+    """The execution a task was attached to failed: raised in every attached task."""
+
+
+def input_hash(task: Task) -> str:
+    """sha256 of the stored input, JSON canonicalized (sorted keys) so equal inputs hash equally."""
+    if task._input_bin is not None:
+        payload = task._input_bin
+    else:
+        payload = json.dumps(
+            pydantic_core.to_jsonable_python(task._input_data), sort_keys=True, separators=(",", ":"), default=str,
+        ).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+@dataclasses.dataclass
+class Flight:
+    leader: uuid.UUID
+    members: set[uuid.UUID]
+    result: asyncio.Future
+
+
+@dataclasses.dataclass
+class SingleFlight:
+    """
+    Registry of the single-flight tasks running in this process, by event loop and (kind, input hash): a flight's
+    result is a future of its loop, so tasks on another execution thread find the leader like another worker would.
+
+    The first task of a key leads: unless another worker already runs the same key (a RUNNING row with the same
+    ``input_hash``, polled until it finishes), it executes the action. Later tasks of the key attach to the leader
+    and get its output, or a SingleFlightError if it failed. The DB lookup happens before the task is stored as
+    RUNNING, so a task only ever waits for an earlier one. Two workers starting the same key at the same instant
+    may both execute it: deduplication is best-effort, outputs stay correct.
+    """
+    flights: dict[tuple[asyncio.AbstractEventLoop, Key], Flight] = dataclasses.field(default_factory=dict)
+
+    async def run(self, task: Task, start: Callable[[], Awaitable[None]], execute: Callable[[], Awaitable[Any]]) -> Any:
+        """Output of ``task``: executed by ``execute`` or shared with an identical running task. ``start`` stores it as RUNNING."""
+        task.input_hash = input_hash(task)
+        key = (task.kind, task.input_hash)
+        local_key = (asyncio.get_running_loop(), key)
+
+        flight = self.flights.get(local_key)
+        if flight is not None:
+            flight.members.add(task.id)
+            await start()
+            print(f"{task.name} attached to in-flight task {flight.leader}")
+            return await asyncio.shield(flight.result)
+
+        flight = self.flights[local_key] = Flight(task.id, {task.id}, asyncio.get_running_loop().create_future())
+        try:
+            output = _LEADER_LOST
+            leader = await self._find_running(key, flight.members)
+            await start()
+            if leader is not None:
+                print(f"{task.name} attached to task {leader} running in another worker")
+                output = await self._follow(leader)
+            if output is _LEADER_LOST:
+                output = await execute()
+        except BaseException as e:
+            flight.result.set_exception(SingleFlightError(f"Single-flight task {task.id} failed: {e}"))
+            flight.result.exception()  # retrieved: no "never retrieved" warning when nobody attached
+            raise
+        else:
+            flight.result.set_result(output)
+            return output
+        finally:
+            del self.flights[local_key]
+
+    @staticmethod
+    async def _find_running(key: Key, exclude: set[uuid.UUID]) -> uuid.UUID | None:
+        kind, digest = key
+        async with database.get_session_manager("worker") as session:
+            return (await session.execute(
+                select(Task.id)
+                .where(Task.kind == kind, Task.input_hash == digest, Task.status == Status.RUNNING, Task.id.not_in(exclude))
+                .order_by(Task.started_at)
+                .limit(1)
+            )).scalar()
+
+    @staticmethod
+    async def _follow(leader_id: uuid.UUID) -> Any:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.SINGLE_FLIGHT_TIMEOUT
+        while loop.time() < deadline:
+            await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+            with instrumentation.suspend():
+                async with database.get_session_manager("worker") as session:
+                    leader = await session.get(Task, leader_id, options=[raiseload("*")])
+            if leader is None or leader.status not in (Status.RUNNING, Status.SUCCESS, Status.FAILED):
+                return _LEADER_LOST
+            if leader.status == Status.SUCCESS:
+                return leader.output
+            if leader.status == Status.FAILED:
+                raise SingleFlightError(f"Single-flight task {leader_id} failed: {leader.error}")
+        print(f"Single-flight task {leader_id} still running after {settings.SINGLE_FLIGHT_TIMEOUT}s, running anyway")
+        return _LEADER_LOST
+
+
+in_flight = SingleFlight()
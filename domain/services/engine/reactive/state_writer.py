@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+from sqlalchemy import bindparam, inspect, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ColumnProperty
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
+
+from database import database
+from domain.models.task import Task
+from domain.models.versioning import _jobs_of
+
+tasks = Task.__table__
+
+
+def _column_values(obj: Task) -> dict:
+    """Loaded column attributes: a flush expires the server-generated ones (updated_at)."""
+    return {attr.key: obj.__dict__[attr.key] for attr in inspect(obj).mapper.column_attrs if attr.key in obj.__dict__}
+
+
+@dataclasses.dataclass
+class StateWriter:
+    """
+    Persists the in-memory task changes of one engine. Nodes change their task without any lock (a single event
+    loop runs them) then await ``flush()``: the requests made while a write is running are grouped into the next
+    write, one transaction for all of them (group commit), executed by the database write queue.
+
+    A write snapshots the changed columns and marks them committed in the session (keeping them out of the ORM
+    flushes), updates the rows with Core (one executemany per set of changed columns) and commits. A change made
+    while the statements run is left pending for the next write. A failed write is rolled back and its snapshot
+    flagged changed again, the in-memory job versions put back.
+    """
+    session: AsyncSession
+
+    _requested: asyncio.Future | None = dataclasses.field(default=None, init=False)
+    _task: asyncio.Task | None = dataclasses.field(default=None, init=False)
+
+    async def flush(self) -> None:
+        """Returns once the changes made so far are committed."""
+        if self._requested is None:
+            self._requested = asyncio.get_running_loop().create_future()
+            if self._task is None:
+                self._task = asyncio.create_task(self._run())
+        await asyncio.shield(self._requested)
+
+    async def idle(self) -> None:
+        """Waits for the write in progress and the ones requested meanwhile."""
+        while self._task is not None:
+            await asyncio.wait({self._task})
+
+    async def _run(self) -> None:
+        try:
+            while self._requested is not None:
+                requested, self._requested = self._requested, None
+                try:
+                    await database.write(self._write)
+                except Exception as e:
+                    requested.set_exception(e)
+                else:
+                    requested.set_result(None)
+        finally:
+            self._task = None
+
+    async def _write(self) -> None:
+        new = list(self.session.new)
+        changes = self._collect()
+        jobs = {id(job): job for task, _ in changes for job in _jobs_of(task)}
+        versions = {key: job.version for key, job in jobs.items()}
+        try:
+            if new or self.session.dirty:
+                await self._guarded(self.session.flush, changes)
+
+            by_columns: dict[tuple[str, ...], list[dict]] = defaultdict(list)
+            for task, values in changes:
+                by_columns[tuple(values)].append({"_id": task.id, **{f"_{key}": value for key, value in values.items()}})
+            for columns, rows in by_columns.items():
+                await self.session.execute(
+                    update(tasks)
+                    .where(tasks.c.id == bindparam("_id"))
+                    .values({key: bindparam(f"_{key}", type_=tasks.c[key].type) for key in columns}),
+                    rows,
+                )
+            # Same rule as domain.models.versioning, for the rows written above.
+            if jobs:
+                await self.session.execute(
+                    update(tasks)
+                    .where(tasks.c.id.in_([job.id for job in jobs.values()]))
+                    .values(version=tasks.c.version + 1)
+                )
+                # Before the commit: its flush may bump them again through the ORM (tasks changed meanwhile).
+                for job in jobs.values():
+                    set_committed_value(job, "version", (job.version or 0) + 1)
+            await self._guarded(self.session.commit, changes)
+        except Exception:
+            await self._rollback(changes, new)
+            for key, job in jobs.items():
+                set_committed_value(job, "version", versions[key])
+            raise
+
+    def _collect(self) -> list[tuple[Task, dict]]:
+        """(task, {column key: value}) of the changed task columns, marked committed so that no ORM flush writes them."""
+        changes = []
+        for obj in self.session.dirty:
+            if not isinstance(obj, Task):
+                continue
+            state = inspect(obj)
+            values = {}
+            for key in list(state.committed_state):
+                prop = state.mapper.get_property(key)
+                if not isinstance(prop, ColumnProperty):
+                    continue  # relationship changes are left to the ORM flush
+                values[prop.columns[0].key] = state.dict.get(key)
+                set_committed_value(obj, key, state.dict.get(key))
+            if values:
+                changes.append((obj, values))
+        return changes
+
+    async def _guarded(self, flush: Callable[[], Awaitable[None]], changes: list[tuple[Task, dict]]) -> None:
+        """
+        Runs an ORM flush (or the commit, which flushes). When it ends, the flush marks everything it processed
+        committed, a column a node changed while its statements ran included: such a column is flagged again for the
+        next write. The tasks of ``changes`` are among the processed ones (still in the session's modified set).
+        New rows and relationship changes (e.g. MapJob expansion) go through here; the before_flush listeners bump
+        the version of their jobs through the ORM.
+        """
+        objects = {id(obj): obj for obj in (*(task for task, _ in changes), *self.session.new, *self.session.dirty)}
+        for obj in list(objects.values()):
+            if isinstance(obj, Task):
+                objects.update((id(job), job) for job in _jobs_of(obj))
+        before = {key: _column_values(obj) for key, obj in objects.items()}
+        await flush()
+        for key, obj in objects.items():
+            for attr, value in _column_values(obj).items():
+                if attr != "version" and attr in before[key] and value is not before[key][attr]:
+                    flag_modified(obj, attr)
+
+    async def _rollback(self, changes: list[tuple[Task, dict]], new: list) -> None:
+        """
+        Rolls a failed write back, keeping the engine's objects usable and their changes pending: the rollback
+        expires every object and makes the new ones transient, so their loaded attributes are put back, the columns
+        not written flagged again and the new objects added again. The next write retries all of it.
+        """
+        loaded = []
+        for obj in self.session.identity_map.values():
+            state = inspect(obj)
+            attrs = {key: state.dict[key] for key in state.mapper.attrs.keys() if key in state.dict}
+            pending = {key for key in state.committed_state if isinstance(state.mapper.get_property(key), ColumnProperty)}
+            loaded.append((obj, attrs, pending))
+        new = {id(obj): obj for obj in (*new, *self.session.new)}
+        written = {id(task): set(values) for task, values in changes}
+
+        await self.session.rollback()
+
+        for obj, attrs, pending in loaded:
+            for key, value in attrs.items():
+                set_committed_value(obj, key, value)
+            for key in pending | {
+                prop.key for prop in inspect(obj).mapper.column_attrs if prop.columns[0].key in written.get(id(obj), ())
+            }:
+                flag_modified(obj, key)
+        self.session.add_all([obj for obj in new.values() if inspect(obj).transient])
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from typing import Awaitable, Callable
+
+from domain.models.batch_task import BatchTask
+from domain.models.enums.status import Status
+
+
+@dataclasses.dataclass
+class TaskBatcher:
+    """
+    Accumulates ready tasks of one BatchTask kind and runs them together.
+    A batch is flushed when it reaches ``batch_size`` or ``batch_window_ms`` after its first task.
+    """
+    task_class: type[BatchTask]
+    on_change: Callable[[], Awaitable[None]]
+
+    _pending: list[tuple[BatchTask, asyncio.Future]] = dataclasses.field(default_factory=list, init=False)
+    _timer: asyncio.TimerHandle | None = dataclasses.field(default=None, init=False)
+    _running: set[asyncio.Task] = dataclasses.field(default_factory=set, init=False)
+
+    async def submit(self, task: BatchTask) -> None:
+        """Waits for the batch holding ``task`` to complete; raises if the batch failed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((task, future))
+        if len(self._pending) >= self.task_class.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.task_class.batch_window_ms / 1000, self.flush)
+        await future
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        running = asyncio.create_task(self._run_batch(batch))
+        self._running.add(running)
+        running.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list[tuple[BatchTask, asyncio.Future]]) -> None:
+        try:
+            await self._execute([task for task, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for _, future in batch:
+                future.set_result(None)
+
+    async def _execute(self, tasks: list[BatchTask]) -> None:
+        print(f"Running batch of {len(tasks)} {self.task_class.__name__}")
+        for task in tasks:
+            task.status = Status.RUNNING
+            task.start()
+        await self.on_change()
+
+        try:
+            outputs = await self.task_class.action_batch([task.input for task in tasks])
+            if len(outputs) != len(tasks):
+                raise ValueError(
+                    f"{self.task_class.__name__}.action_batch returned {len(outputs)} outputs for {len(tasks)} inputs"
+                )
+        except Exception as e:
+            for task in tasks:
+                task.status = Status.FAILED
+                task.error = str(e)
+                task.finish()
+            await self.on_change()
+            raise
+
+        for task, output in zip(tasks, outputs):
+            task.output = output
+            task.status = Status.SUCCESS
+            task.finish()
+        await self.on_change()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
+import threading
+import uuid
+from typing import Any, Awaitable, Callable, TypeVar
+
+from database import database
+from database.config import settings
+from shared.loop_monitor import LoopMonitor
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass
+class ExecutionThread:
+    """An event loop in a thread of its own, with its own database engines, running the coroutines submitted to it."""
+    name: str
+    monitor: LoopMonitor = dataclasses.field(init=False)
+    loop: asyncio.AbstractEventLoop | None = dataclasses.field(default=None, init=False)
+    # Coroutines submitted and not finished yet: only changed from the loop's thread.
+    running: int = dataclasses.field(default=0, init=False)
+
+    _thread: threading.Thread | None = dataclasses.field(default=None, init=False)
+    _ready: threading.Event = dataclasses.field(default_factory=threading.Event, init=False)
+    _stop: asyncio.Event | None = dataclasses.field(default=None, init=False)
+    _error: BaseException | None = dataclasses.field(default=None, init=False)
+
+    def __post_init__(self):
+        self.monitor = LoopMonitor(self.name)
+
+    def start(self) -> None:
+        """Starts the thread and waits for its loop to be ready (database initialized)."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self._main(),), name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError(f"Execution thread {self.name} failed to start") from self._error
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Cancels what still runs, closes the thread's database engines and joins it (blocking)."""
+        if self._thread is None:
+            return
+        if self.loop is not None and self._stop is not None and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, fn: Callable[..., Awaitable[T]], *args: Any) -> concurrent.futures.Future[T]:
+        """Thread-safe: runs ``fn(*args)`` on this thread's loop. Cancelling the returned future cancels the run."""
+        if not self.alive:
+            raise RuntimeError(f"Execution thread {self.name} is not running")
+        # Empty context: the run must not inherit the submitter's statement collectors or span.
+        return contextvars.Context().run(asyncio.run_coroutine_threadsafe, self._track(fn(*args)), self.loop)
+
+    async def _track(self, run: Awaitable[T]) -> T:
+        self.running += 1
+        try:
+            return await run
+        finally:
+            self.running -= 1
+
+    async def _main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        try:
+            # The API loop already migrated the database.
+            await database.init(migrate=False)
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            raise
+        self.monitor.start()
+        self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            self.monitor.stop()
+            pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await database.shutdown()
+
+    def status(self) -> dict:
+        if not self.alive:
+            return {"loop": self.name, "running": False, "lag_ms": None, "max_lag_ms": None, "ready": False, "jobs": 0}
+        return {**self.monitor.status(), "jobs": self.running}
+
+
+@dataclasses.dataclass
+class ExecutionHost:
+    """
+    Runs the engines away from the event loop serving HTTP, on ``threads`` loops of their own. The API submits
+    coroutines from its loop with ``run``, which is thread-safe and awaitable there. Everything about one job
+    (run, retry) goes to the same thread, chosen from its id: its engine, session and futures live on that loop.
+    Not started (CLI, ``threads=0``), ``run`` simply awaits on the current loop.
+    Threads share the GIL: they keep a long engine step from delaying HTTP responses, not CPU-bound work from
+    slowing everything down.
+    """
+    threads: int = dataclasses.field(default_factory=lambda: settings.EXECUTION_THREADS)
+    _threads: list[ExecutionThread] = dataclasses.field(default_factory=list, init=False)
+
+    def start(self) -> None:
+        for index in range(self.threads):
+            thread = ExecutionThread(f"execution-{index}")
+            thread.start()
+            self._threads.append(thread)
+        if self._threads:
+            print(f"Execution host started {len(self._threads)} event loop threads")
+
+    async def stop(self) -> None:
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            await asyncio.to_thread(thread.stop)
+
+    def _thread_for(self, job_id: uuid.UUID | None) -> ExecutionThread | None:
+        if not self._threads:
+            return None
+        if job_id is None:
+            return min(self._threads, key=lambda thread: thread.running)
+        return self._threads[job_id.int % len(self._threads)]
+
+    async def run(self, job_id: uuid.UUID | None, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Result of ``fn(*args)``, run on the thread of ``job_id`` (the least busy one when None)."""
+        thread = self._thread_for(job_id)
+        if thread is None:
+            return await fn(*args)
+        return await asyncio.wrap_future(thread.submit(fn, *args))
+
+    def status(self) -> list[dict]:
+        return [thread.status() for thread in self._threads]
+
+
+execution_host = ExecutionHost()
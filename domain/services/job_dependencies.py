@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import functools
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+
+from sqlalchemy import update
+
+from database import database
+from database.config import settings
+from database.notifications import JOB_FINISHED, notifications
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.job_dependency import JobDependency
+from domain.models.task import Task
+from domain.services.job_queue import QueueFull
+from shared.metrics import registry
+
+jobs_waiting = registry.gauge("job_dependencies_waiting", "Root jobs waiting for their upstream jobs to succeed")
+
+
+class UnknownUpstreamJob(ValueError):
+    def __init__(self, job_ids: list[uuid.UUID]):
+        super().__init__(f"Unknown upstream jobs: {', '.join(str(job_id) for job_id in job_ids)}")
+        self.job_ids = job_ids
+
+
+@dataclasses.dataclass
+class WaitingJob:
+    job_id: uuid.UUID
+    # Upstream jobs not known to have succeeded yet.
+    upstream: set[uuid.UUID]
+    enqueue: Callable[[], object]
+    # Its job_dependencies rows marked released by this process (see _release).
+    released: bool = False
+
+
+@dataclasses.dataclass
+class DependencyGate:
+    """
+    Root jobs submitted with ``depends_on`` wait here, outside the job queue (no run slot held), until every upstream
+    job succeeded: they are queued then. An upstream job ending otherwise fails them without running, which in turn
+    fails their own dependents. Woken by the JOB_FINISHED notifications of the upstream jobs; every waiting job is
+    also rechecked every ``recheck_interval`` seconds (upstream run by another SQLite process, lost notification).
+    Jobs still waiting at shutdown stay SCHEDULED in the database: ``start`` reloads them (with the default run
+    options: no profile, priority 0). Every process reloads them, so a job is queued only by the process that
+    marked its job_dependencies rows released; like the job queue, a released job not run at shutdown is not.
+    """
+    recheck_interval: float = dataclasses.field(default_factory=lambda: settings.SENSOR_RECHECK_INTERVAL)
+
+    _waiting: dict[uuid.UUID, WaitingJob] = dataclasses.field(default_factory=dict, init=False)
+    _task: asyncio.Task | None = dataclasses.field(default=None, init=False)
+
+    def start(self, enqueue: Callable[[uuid.UUID], object]) -> None:
+        """``enqueue(job_id)`` queues the run of a reloaded job once released."""
+        self._task = asyncio.create_task(self._run(enqueue), name="job-dependencies")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def waiting_for(self, job_id: uuid.UUID) -> list[uuid.UUID] | None:
+        """Upstream jobs a job still waits for, None when it does not wait here."""
+        waiting = self._waiting.get(job_id)
+        return sorted(waiting.upstream) if waiting else None
+
+    async def validate(self, upstream_ids: Iterable[uuid.UUID]) -> None:
+        """Raises UnknownUpstreamJob for ids that are not root jobs, live or archived."""
+        upstream_ids = list(upstream_ids)
+        async with database.get_session_manager("worker") as session:
+            statuses = await JobRepository(session).get_statuses(upstream_ids)
+        unknown = [job_id for job_id in upstream_ids if job_id not in statuses]
+        if unknown:
+            raise UnknownUpstreamJob(unknown)
+
+    async def add(self, job_id: uuid.UUID, upstream_ids: Iterable[uuid.UUID], enqueue: Callable[[], object]) -> None:
+        """Holds the job until its upstream jobs succeeded, then calls ``enqueue`` (at once if they already did)."""
+        self._waiting[job_id] = WaitingJob(job_id, set(upstream_ids), enqueue)
+        await self._check([job_id])
+
+    async def _reload(self, enqueue: Callable[[uuid.UUID], object]) -> None:
+        async with database.get_session_manager("worker") as session:
+            rows = await JobRepository(session).get_waiting_jobs()
+        upstream = defaultdict(set)
+        for row in rows:
+            upstream[row.job_id].add(row.upstream_job_id)
+        for job_id, upstream_ids in upstream.items():
+            if job_id not in self._waiting:
+                self._waiting[job_id] = WaitingJob(job_id, upstream_ids, functools.partial(enqueue, job_id))
+        if upstream:
+            print(f"Job dependencies: {len(upstream)} waiting jobs reloaded")
+        await self._check(list(upstream))
+
+    async def _run(self, enqueue: Callable[[uuid.UUID], object]) -> None:
+        with notifications.subscribe(JOB_FINISHED) as subscription:
+            # Subscribed first: an upstream job finishing during the reload is not missed.
+            try:
+                await self._reload(enqueue)
+            except Exception as e:
+                print(f"Job dependencies: reload failed: {e!r}")
+            while True:
+                received = await subscription.get(self.recheck_interval)
+                if received is None:
+                    job_ids = list(self._waiting)
+                else:
+                    finished = {uuid.UUID(payload["job_id"]) for _, payload in (received, *subscription.drain())}
+                    job_ids = [job.job_id for job in self._waiting.values() if job.upstream & finished]
+                try:
+                    await self._check(job_ids)
+                except Exception as e:
+                    print(f"Job dependencies: check failed: {e!r}")
+
+    async def _check(self, job_ids: list[uuid.UUID]) -> None:
+        waiting = [self._waiting[job_id] for job_id in job_ids if job_id in self._waiting]
+        if not waiting:
+            return
+        async with database.get_session_manager("worker") as session:
+            statuses = await JobRepository(session).get_statuses(set().union(*(job.upstream for job in waiting)))
+
+        for job in waiting:
+            if self._waiting.get(job.job_id) is not job:
+                continue  # released by a concurrent check
+            job.upstream = {upstream for upstream in job.upstream if statuses.get(upstream) != Status.SUCCESS}
+            # Ended without succeeding, or gone (deleted): it never will.
+            blocking = sorted(
+                upstream for upstream in job.upstream if upstream not in statuses or statuses[upstream].is_final()
+            )
+            if blocking:
+                del self._waiting[job.job_id]
+                reason = statuses[blocking[0]] if blocking[0] in statuses else "missing"
+                await self._fail(job.job_id, f"Upstream job {blocking[0]} {reason}")
+            elif not job.upstream:
+                del self._waiting[job.job_id]
+                try:
+                    released = await self._release(job)
+                except Exception:
+                    self._waiting[job.job_id] = job
+                    raise
+                if not released:
+                    print(f"Job {job.job_id}: released by another process")
+                    continue
+                try:
+                    job.enqueue()
+                except QueueFull:
+                    self._waiting[job.job_id] = job
+                    print(f"Job {job.job_id}: upstream jobs done but the queue is full, retried at the next check")
+                    continue
+                print(f"Job {job.job_id}: upstream jobs succeeded, queued")
+        jobs_waiting.set(len(self._waiting))
+
+    async def _release(self, job: WaitingJob) -> bool:
+        """Marks the job's dependencies released, unless another process did first (compare-and-set)."""
+        if job.released:
+            return True  # queue full at the previous check
+
+        async def work() -> bool:
+            async with database.get_session_manager("worker") as session:
+                result = await session.execute(
+                    update(JobDependency)
+                    .where(JobDependency.job_id == job.job_id, JobDependency.released_at.is_(None))
+                    .values(released_at=datetime.now(timezone.utc))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                return result.rowcount > 0
+
+        job.released = await database.write(work)
+        return job.released
+
+    async def _fail(self, job_id: uuid.UUID, error: str) -> None:
+        async def work() -> None:
+            async with database.get_session_manager("worker") as session:
+                # Not loaded: the job never ran, only its row changes (its version too, for the API caches).
+                await session.execute(
+                    update(Task)
+                    .where(Task.id == job_id)
+                    .values(status=Status.FAILED, error=error, finished_at=datetime.now(), version=Task.version + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+
+        await database.write(work)
+        print(f"Job {job_id} not run: {error}")
+        await notifications.publish(JOB_FINISHED, {"job_id": str(job_id), "status": Status.FAILED})
+
+
+dependency_gate = DependencyGate()
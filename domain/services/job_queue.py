@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import dataclasses
+import itertools
+import math
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from database.config import settings
+from shared.metrics import registry
+
+jobs_queued = registry.gauge("job_queue_length", "Root jobs waiting for a run slot")
+jobs_running = registry.gauge("job_queue_running", "Root jobs currently running")
+jobs_rejected = registry.counter("job_queue_rejected_total", "Submissions refused because the queue was full")
+job_queue_wait = registry.histogram("job_queue_wait_seconds", "Time spent queued before running")
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclasses.dataclass
+class QueuedJob:
+    job_id: uuid.UUID
+    run: Callable[[], Awaitable[object]]
+    priority: int
+    submitter: str
+    seq: int
+    queued_at: float = dataclasses.field(default_factory=time.monotonic)
+
+
+@dataclasses.dataclass
+class QueueInfo:
+    """Where a job stands: ``position`` 0 runs next; both are None once it runs."""
+    state: str  # "queued" or "running"
+    position: int | None = None
+    eta_seconds: float | None = None
+
+
+@dataclasses.dataclass
+class JobQueue:
+    """
+    Admission control of root jobs, in this process: at most ``max_concurrent`` run at once, the others wait here.
+    The next job is the one of highest ``priority``; among equal priorities, the submitter with the fewest running
+    jobs goes first (fair share), then the least recently served one, then submission order. Submissions beyond ``max_size`` queued jobs are refused.
+    The queue lives in memory: jobs still waiting at shutdown stay SCHEDULED in the database.
+    """
+    max_concurrent: int = dataclasses.field(default_factory=lambda: settings.JOB_MAX_CONCURRENT)
+    max_size: int = dataclasses.field(default_factory=lambda: settings.JOB_QUEUE_MAX_SIZE)
+
+    _queued: dict[uuid.UUID, QueuedJob] = dataclasses.field(default_factory=dict, init=False)
+    _running: dict[uuid.UUID, QueuedJob] = dataclasses.field(default_factory=dict, init=False)
+    _tasks: set[asyncio.Task] = dataclasses.field(default_factory=set, init=False)
+    _seq: itertools.count = dataclasses.field(default_factory=itertools.count, init=False)
+    # Places held by submissions whose job row is being created (see reserve).
+    _reserved: int = dataclasses.field(default=0, init=False)
+    # Dispatch sequence number of each submitter's latest job: least recently served first among equals.
+    _last_served: dict[str, int] = dataclasses.field(default_factory=dict, init=False)
+    # Moving average of job durations (seconds), for the ETAs; None until a job has finished.
+    _average_duration: float | None = dataclasses.field(default=None, init=False)
+
+    def ensure_capacity(self) -> None:
+        """
+        Raises QueueFull when ``max_size`` jobs already wait, places reserved included (jobs only wait while every
+        slot is taken).
+        """
+        if len(self._queued) + self._reserved >= self.max_size:
+            jobs_rejected.inc()
+            raise QueueFull(self._retry_after())
+
+    def reserve(self, force: bool = False) -> None:
+        """
+        Holds a place for a job still being created, so that its ``submit(..., reserved=True)`` cannot be refused:
+        QueueFull now or never. ``release`` gives the place back when the job is not submitted after all.
+        ``force``: never refused, even beyond ``max_size`` (runs already committed to, e.g. scheduled ones).
+        """
+        if not force:
+            self.ensure_capacity()
+        self._reserved += 1
+
+    def release(self) -> None:
+        self._reserved -= 1
+
+    def submit(
+            self, job_id: uuid.UUID, run: Callable[[], Awaitable[object]], priority: int = 0, submitter: str = "",
+            reserved: bool = False,
+    ) -> QueueInfo:
+        if reserved:
+            self.release()
+        else:
+            self.ensure_capacity()
+        self._queued[job_id] = QueuedJob(job_id, run, priority, submitter, next(self._seq))
+        self._dispatch()
+        return self.info(job_id)
+
+    def info(self, job_id: uuid.UUID) -> QueueInfo | None:
+        """Queue state of a job, None when this process neither runs nor queues it."""
+        if job_id in self._running:
+            return QueueInfo("running")
+        if job_id not in self._queued:
+            return None
+        position = self._order().index(self._queued[job_id])
+        return QueueInfo("queued", position, self._eta(position))
+
+    def _key(self, job: QueuedJob):
+        running = sum(1 for other in self._running.values() if other.submitter == job.submitter)
+        return -job.priority, running, self._last_served.get(job.submitter, -1), job.seq
+
+    def _order(self) -> list[QueuedJob]:
+        # A few hundred entries at most (max_size): sorting on demand beats maintaining per-submitter heaps.
+        return sorted(self._queued.values(), key=self._key)
+
+    def _eta(self, position: int) -> float | None:
+        if self._average_duration is None:
+            return None
+        # Jobs ahead run max_concurrent at a time; this one starts when its wave's slot frees up.
+        return round((position // self.max_concurrent + 1) * self._average_duration, 1)
+
+    def _retry_after(self) -> int:
+        if self._average_duration is None:
+            return 1
+        return max(1, math.ceil(self._average_duration / self.max_concurrent))
+
+    def _dispatch(self) -> None:
+        while self._queued and len(self._running) < self.max_concurrent:
+            job = min(self._queued.values(), key=self._key)
+            del self._queued[job.job_id]
+            self._running[job.job_id] = job
+            self._last_served[job.submitter] = next(self._seq)
+            job_queue_wait.observe(time.monotonic() - job.queued_at)
+            # Fresh context: the job must not inherit the statement collectors / span of the request that queued it.
+            task = asyncio.create_task(self._run(job), context=contextvars.Context())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        jobs_queued.set(len(self._queued))
+        jobs_running.set(len(self._running))
+
+    async def _run(self, job: QueuedJob) -> None:
+        started = time.monotonic()
+        try:
+            await job.run()
+        except Exception as e:
+            print(f"Job {job.job_id} failed to run: {e!r}")
+        finally:
+            duration = time.monotonic() - started
+            self._average_duration = duration if self._average_duration is None else (
+                0.8 * self._average_duration + 0.2 * duration
+            )
+            del self._running[job.job_id]
+            self._dispatch()
+
+
+job_queue = JobQueue()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import dataclasses
+import importlib
+import uuid
+from importlib.metadata import entry_points
+from typing import Any, Sequence, TypeVar
+
+from pydantic import TypeAdapter
+
+from database import database
+from database.config import settings
+from domain.models.job import Job
+from domain.models.job_dependency import JobDependency
+
+
+class UnknownJobType(KeyError):
+    def __init__(self, job_type: str):
+        super().__init__(job_type)
+        self.job_type = job_type
+
+    def __str__(self) -> str:
+        return f"Unknown job type {self.job_type!r}"
+
+
+@dataclasses.dataclass
+class JobRegistry:
+    """
+    Job type name -> Job subclass, declared as "module:Class" references: ``settings.JOB_TYPES``, the entry points
+    of ``settings.JOB_ENTRY_POINT_GROUP`` and ``register``. A job module is imported the first time its type is
+    used, so a deployment can offer many job types without importing them at startup.
+    """
+    job_types: dict[str, str] = dataclasses.field(default_factory=lambda: dict(settings.JOB_TYPES))
+    entry_point_group: str | None = dataclasses.field(default_factory=lambda: settings.JOB_ENTRY_POINT_GROUP)
+
+    _loaded: dict[str, type[Job]] = dataclasses.field(default_factory=dict, init=False)
+    _adapters: dict[str, TypeAdapter | None] = dataclasses.field(default_factory=dict, init=False)
+    _discovered: bool = dataclasses.field(default=False, init=False)
+
+    def register(self, name: str, target: str | type[Job]) -> None:
+        if isinstance(target, str):
+            self.job_types[name] = target
+            self._loaded.pop(name, None)
+        else:
+            self.job_types[name] = f"{target.__module__}:{target.__qualname__}"
+            self._loaded[name] = target
+        self._adapters.pop(name, None)
+
+    def names(self) -> list[str]:
+        self._discover()
+        return sorted(self.job_types)
+
+    def module_of(self, name: str) -> str | None:
+        """Module of the job type ``name``, without importing it."""
+        self._discover()
+        reference = self.job_types.get(name)
+        return reference.partition(":")[0] if reference else None
+
+    def get(self, name: str) -> type[Job]:
+        """The job class of ``name``, imported on first use. Raises UnknownJobType."""
+        job_class = self._loaded.get(name)
+        if job_class is not None:
+            return job_class
+        self._discover()
+        reference = self.job_types.get(name)
+        if reference is None:
+            raise UnknownJobType(name)
+        module_name, _, attribute = reference.partition(":")
+        print(f"Loading job type {name} from {reference}")
+        job_class = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            job_class = getattr(job_class, part)
+        if not (isinstance(job_class, type) and issubclass(job_class, Job)):
+            raise TypeError(f"Job type {name}: {reference} is not a Job subclass")
+        self._loaded[name] = job_class
+        return job_class
+
+    def validate_input(self, name: str, value: Any) -> Any:
+        """``value`` (JSON-decoded) validated against the job's ``input_model``; raises pydantic's ValidationError."""
+        if name not in self._adapters:
+            model = self.get(name).input_model
+            # Jobs not parameterized (class X(Job)) inherit the InputT TypeVar: they take no input.
+            self._adapters[name] = None if model is None or isinstance(model, TypeVar) else TypeAdapter(model)
+        adapter = self._adapters[name]
+        if adapter is None:
+            if value is not None:
+                raise ValueError(f"Job type {name} takes no input")
+            return None
+        return adapter.validate_python(value)
+
+    async def create(
+            self, name: str, input: Any = None, job_name: str | None = None, depends_on: Sequence[uuid.UUID] = (),
+    ) -> Job:
+        """
+        Creates a job of type ``name`` (not run); ``input`` is validated first. ``depends_on``: root jobs it waits
+        for, stored with it (see domain.services.job_dependencies).
+        """
+        job_class = self.get(name)
+        kwargs: dict[str, Any] = {}
+        if job_name is not None:
+            kwargs["name"] = job_name
+        value = self.validate_input(name, input)
+        if value is not None:
+            kwargs["input"] = value
+        job = job_class(**kwargs)
+        if job.name is None:
+            job.name = name
+        async with database.get_session_manager("worker") as session:
+            session.add(job)
+            session.add_all(
+                JobDependency(job=job, upstream_job_id=upstream) for upstream in dict.fromkeys(depends_on)
+            )
+            await database.commit(session)
+            await session.refresh(job)
+        return job
+
+    def _discover(self) -> None:
+        # Reads the installed packages' metadata once, without importing them.
+        if self._discovered or not self.entry_point_group:
+            return
+        self._discovered = True
+        for entry_point in entry_points(group=self.entry_point_group):
+            self.job_types.setdefault(entry_point.name, entry_point.value)
+
+
+job_registry = JobRegistry()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import functools
+import uuid
+from typing import Sequence
+
+from database import database
+from domain.job_repository import JobRepository
+from domain.models.job import Job
+from domain.services.execution_host import execution_host
+from domain.services.job_dependencies import dependency_gate
+from domain.services.job_queue import job_queue
+from domain.services.job_registry import job_registry
+from shared.artifacts import artifacts
+
+PROFILE_ARTIFACT = "profile.json"
+
+
+async def submit(
+        job_type: str, input=None, name: str | None = None, profile: bool = False, priority: int = 0,
+        submitter: str = "", depends_on: Sequence[uuid.UUID] = (), force: bool = False,
+) -> Job:
+    """
+    Creates a job of a registered type and queues its run (see job_queue): raises QueueFull, before creating it,
+    when the queue is full, unless ``force`` (see JobQueue.reserve).
+    With ``depends_on`` (root jobs, else UnknownUpstreamJob) it is queued once they all succeeded (see
+    job_dependencies).
+    """
+    if depends_on:
+        await dependency_gate.validate(depends_on)
+    else:
+        # Before the job row exists: a full queue refuses the submission without leaving a job that never runs.
+        job_queue.reserve(force)
+    try:
+        # Job writes and runs happen on the execution host's loops, not on the caller's (the one serving requests).
+        job = await execution_host.run(None, job_registry.create, job_type, input, name, depends_on)
+    except BaseException:
+        if not depends_on:
+            job_queue.release()
+        raise
+
+    enqueue = functools.partial(queue_run, job.id, profile, priority, submitter)
+    if depends_on:
+        await dependency_gate.add(job.id, depends_on, enqueue)
+    else:
+        enqueue(reserved=True)
+    return job
+
+
+def queue_run(
+        job_id: uuid.UUID, profile: bool = False, priority: int = 0, submitter: str = "", reserved: bool = False,
+) -> None:
+    """Queues the run of a created job (see job_queue): ``reserved`` when its place was reserved before."""
+    job_queue.submit(
+        job_id, lambda: execution_host.run(job_id, run, job_id, profile), priority=priority, submitter=submitter,
+        reserved=reserved,
+    )
+
+
+async def run(job_id: uuid.UUID, profile: bool = False):
+    """Runs a job of any type: its classes are imported when its tasks are loaded."""
+    # The engine (and reactivex) is only loaded by the first run, not by the API's import.
+    from domain.services.engine.reactive.reactive_engine import get_engine
+
+    if profile:
+        return await run_profiled(job_id)
+    async with database.get_session_manager("worker") as session:
+        engine = await get_engine(repository=JobRepository(session), job_id=job_id)
+        await engine.run()
+
+
+async def run_profiled(job_id: uuid.UUID) -> str:
+    from shared import profiling
+
+    async with profiling.profile() as result:
+        await run(job_id)
+    path = artifacts.write_json(job_id, PROFILE_ARTIFACT, {"job_id": str(job_id), **result.report})
+    print(f"Profile report for {job_id} written to {path}")
+    return path
+
+
+async def retry(job_id: uuid.UUID, task_id: uuid.UUID):
+    from domain.services.engine.reactive.reactive_engine import get_engine
+
+    async with database.get_session_manager("worker") as session:
+        engine = await get_engine(repository=JobRepository(session), job_id=job_id)
+        await engine.retry(task_id=task_id)
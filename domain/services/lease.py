@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import database
+from domain.models.schedule import leases
+
+
+def _default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclasses.dataclass
+class Lease:
+    """
+    Named lease in the ``leases`` table: held by one process at a time, for ``ttl`` seconds after its last renewal.
+    Taking an expired lease and renewing one's own are the same compare-and-set UPDATE. Expiry compares the
+    processes' clocks: they must agree to well within ``ttl``.
+    """
+    name: str
+    ttl: float
+    owner: str = dataclasses.field(default_factory=_default_owner)
+
+    async def acquire(self) -> bool:
+        """Takes or renews the lease; False while another owner holds it."""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl)
+
+        async def work() -> bool:
+            async with database.get_session_manager("worker") as session:
+                result = await session.execute(
+                    update(leases)
+                    .where(leases.c.name == self.name, or_(leases.c.owner == self.owner, leases.c.expires_at < now))
+                    .values(owner=self.owner, expires_at=expires_at)
+                )
+                if result.rowcount == 0:
+                    if await session.scalar(select(leases.c.owner).where(leases.c.name == self.name)) is not None:
+                        return False
+                    try:
+                        await session.execute(
+                            insert(leases).values(name=self.name, owner=self.owner, expires_at=expires_at)
+                        )
+                    except IntegrityError:
+                        return False  # created meanwhile by another process
+                await session.commit()
+                return True
+
+        return await database.write(work)
+
+    async def release(self) -> None:
+        """Lets another process take the lease now instead of after its expiry."""
+        async def work() -> None:
+            async with database.get_session_manager("worker") as session:
+                await session.execute(
+                    update(leases)
+                    .where(leases.c.name == self.name, leases.c.owner == self.owner)
+                    .values(expires_at=datetime.now(timezone.utc))
+                )
+                await session.commit()
+
+        await database.write(work)
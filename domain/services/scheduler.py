@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import heapq
+import itertools
+import time
+import uuid
+from datetime import datetime, timezone
+
+from database import database
+from database.config import settings
+from domain.models.schedule import as_utc
+from domain.schedule_repository import ScheduleRepository
+from domain.services import job_runner
+from domain.services.lease import Lease
+from shared.metrics import registry
+
+schedule_runs = registry.counter("schedule_runs_total", "Scheduled runs, by result: launched, skipped or failed")
+
+
+@dataclasses.dataclass
+class Scheduler:
+    """
+    Launches the jobs of the ``schedules`` table at their cron times. Every API process runs one; only the holder
+    of the "scheduler" lease launches anything. A single task waits for the earliest timer of one heap of
+    (next run, schedule id), so thousands of schedules cost one sleeping task, not thousands.
+
+    The heap is rebuilt from the table when the lease is taken and every ``refresh_interval`` seconds (changes
+    made through other processes); this process's changes go through ``notify``. A run is launched only by the
+    process whose compare-and-set moved the schedule's next_run_at forward: even two leaders (clock skew, lease
+    taken over during a slow step) cannot launch it twice. It is launched at most once: a crash between the move
+    and the job's creation loses it. A full job queue does not refuse it (its place is forced).
+    """
+    lease: Lease = dataclasses.field(default_factory=lambda: Lease("scheduler", settings.SCHEDULER_LEASE_TTL))
+    refresh_interval: float = dataclasses.field(default_factory=lambda: settings.SCHEDULER_REFRESH_INTERVAL)
+    leader: bool = dataclasses.field(default=False, init=False)
+
+    _heap: list[tuple[datetime, int, uuid.UUID]] = dataclasses.field(default_factory=list, init=False)
+    # Current next run of each schedule: heap entries that differ are stale, skipped when popped.
+    _due: dict[uuid.UUID, datetime] = dataclasses.field(default_factory=dict, init=False)
+    _seq: itertools.count = dataclasses.field(default_factory=itertools.count, init=False)
+    _wakeup: asyncio.Event | None = dataclasses.field(default=None, init=False)
+    _task: asyncio.Task | None = dataclasses.field(default=None, init=False)
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self.leader:
+            self.leader = False
+            await self.lease.release()
+
+    def notify(self, schedule_id: uuid.UUID, next_run_at: datetime | None) -> None:
+        """A schedule was created, changed or deleted (None: nothing to run) in this process."""
+        if not self.leader:
+            return  # read by the leader's next refresh
+        self._set(schedule_id, next_run_at)
+        self._wakeup.set()
+
+    def _set(self, schedule_id: uuid.UUID, due: datetime | None) -> None:
+        if due is None:
+            self._due.pop(schedule_id, None)
+            return
+        self._due[schedule_id] = due
+        heapq.heappush(self._heap, (due, next(self._seq), schedule_id))
+
+    def _pop_due(self, now: datetime) -> list[tuple[uuid.UUID, datetime]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            at, _, schedule_id = heapq.heappop(self._heap)
+            if self._due.get(schedule_id) == at:
+                del self._due[schedule_id]
+                due.append((schedule_id, at))
+        return due
+
+    async def _run(self) -> None:
+        renew_at = refresh_at = time.monotonic()
+        while True:
+            if time.monotonic() >= renew_at:
+                was_leader = self.leader
+                try:
+                    self.leader = await self.lease.acquire()
+                except Exception as e:
+                    print(f"Scheduler: lease renewal failed: {e!r}")
+                    self.leader = False
+                renew_at = time.monotonic() + self.lease.ttl / 3
+                if self.leader and not was_leader:
+                    print(f"Scheduler: {self.lease.owner} is the leader")
+                    refresh_at = time.monotonic()
+                elif was_leader and not self.leader:
+                    print(f"Scheduler: {self.lease.owner} lost the lease")
+                    self._heap, self._due = [], {}
+
+            if self.leader and time.monotonic() >= refresh_at:
+                try:
+                    await self._reload()
+                except Exception as e:
+                    print(f"Scheduler: reload failed: {e!r}")
+                refresh_at = time.monotonic() + self.refresh_interval
+
+            if self.leader:
+                for schedule_id, due in self._pop_due(datetime.now(timezone.utc)):
+                    try:
+                        await self._fire(schedule_id, due)
+                    except Exception as e:
+                        # Left out of the heap until the next reload, which retries it.
+                        schedule_runs.inc(result="failed")
+                        print(f"Scheduler: schedule {schedule_id} failed to fire: {e!r}")
+
+            timeout = renew_at - time.monotonic()
+            if self.leader:
+                timeout = min(timeout, refresh_at - time.monotonic())
+                if self._heap:
+                    timeout = min(timeout, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0))
+            except TimeoutError:
+                pass
+
+    async def _reload(self) -> None:
+        async with database.get_session_manager("worker") as session:
+            rows = await ScheduleRepository(session).get_pending()
+        self._due = {row.id: as_utc(row.next_run_at) for row in rows}
+        self._heap = [(due, next(self._seq), schedule_id) for schedule_id, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    async def _fire(self, schedule_id: uuid.UUID, due: datetime) -> None:
+        async with database.get_session_manager("worker") as session:
+            schedule = await ScheduleRepository(session).get(schedule_id)
+        if schedule is None or not schedule.enabled or as_utc(schedule.next_run_at) != due:
+            # Deleted, disabled or moved since the heap was built.
+            if schedule is not None and schedule.enabled:
+                self._set(schedule_id, as_utc(schedule.next_run_at))
+            return
+
+        runs, next_run_at = schedule.plan(due, datetime.now(timezone.utc))
+
+        async def claim() -> bool:
+            async with database.get_session_manager("worker") as claim_session:
+                return await ScheduleRepository(claim_session).claim(
+                    schedule_id, due, next_run_at, runs[-1] if runs else None,
+                )
+
+        if not await database.write(claim):
+            return  # launched by another process: the next reload brings its new next run
+        self._set(schedule_id, next_run_at)
+        if not runs:
+            schedule_runs.inc(result="skipped")
+            print(f"Scheduler: {schedule.name} missed its {due:%Y-%m-%d %H:%M} UTC run, skipped")
+
+        job_id = None
+        for run_at in runs:
+            try:
+                # Forced past a full queue: the run is claimed already, a refusal would lose it.
+                job = await job_runner.submit(
+                    schedule.job_type, schedule.input, name=f"{schedule.name} {run_at:%Y-%m-%d %H:%M}",
+                    priority=schedule.priority, submitter=f"schedule:{schedule.name}", force=True,
+                )
+            except Exception as e:
+                schedule_runs.inc(result="failed")
+                print(f"Scheduler: {schedule.name} failed to launch its {run_at:%Y-%m-%d %H:%M} UTC run: {e!r}")
+                continue
+            schedule_runs.inc(result="launched")
+            print(f"Scheduler: {schedule.name} launched job {job.id} for {run_at:%Y-%m-%d %H:%M} UTC")
+            job_id = job.id
+
+        if job_id is not None:
+            async def set_last_job() -> None:
+                async with database.get_session_manager("worker") as last_session:
+                    await ScheduleRepository(last_session).set_last_job(schedule_id, job_id)
+
+            await database.write(set_last_job)
+
+
+scheduler = Scheduler()
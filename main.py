@@ -1,22 +1,52 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse
 
 import api.job
-from database import database
+import api.job.tasks
+import api.notifications
+import api.schedule
+from database import database, instrumentation
+from database.config import settings
+from database.notifications import notifications
+from domain.services.execution_host import execution_host
+from domain.services import job_runner
+from domain.services.job_dependencies import dependency_gate
+from domain.services.scheduler import scheduler
+from shared.loop_monitor import LoopMonitor
+from shared.metrics import registry
+from shared.tracing import tracer
+
+api_loop = LoopMonitor("api")
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     print(f"Starting app {_app.__dict__}",)
-    engine = await database.init()
+    await database.init()
+    await notifications.start()
+    execution_host.start()
+    api_loop.start()
+    dependency_gate.start(job_runner.queue_run)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
     yield
-    await engine.dispose()
+    await scheduler.stop()
+    await dependency_gate.stop()
+    api_loop.stop()
+    await execution_host.stop()
+    await notifications.stop()
+    tracer.shutdown()
+    await database.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(api.job.router)
+app.include_router(api.job.tasks.router)
+app.include_router(api.schedule.router)
+app.include_router(api.notifications.router)
 
 
 app.add_middleware(
@@ -28,6 +58,31 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def count_statements(request: Request, call_next):
+    with instrumentation.collect() as stats:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    repeated = instrumentation.report(stats, "request", f"{request.method} {getattr(route, 'path', request.url.path)}")
+    response.headers["X-DB-Statements"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.3f}"
+    response.headers["X-DB-N-Plus-One"] = str(len(repeated))
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return registry.expose()
+
+
+@app.get("/ready")
+async def ready():
+    """Lag of the API loop and of every execution loop; 503 when one is stopped or lags too much."""
+    loops = [api_loop.status(), *execution_host.status()]
+    is_ready = all(loop["ready"] for loop in loops)
+    return JSONResponse({"ready": is_ready, "loops": loops}, status_code=200 if is_ready else 503)
+
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from database.config import settings
+
+
+@dataclass
+class ArtifactStore:
+    """Files stored next to a job, under ``<root>/<job_id>/<name>``."""
+    root: str
+
+    def path(self, job_id: uuid.UUID, name: str) -> str:
+        return os.path.join(self.root, str(job_id), name)
+
+    def exists(self, job_id: uuid.UUID, name: str) -> bool:
+        return os.path.exists(self.path(job_id, name))
+
+    def write_bytes(self, job_id: uuid.UUID, name: str, data: bytes) -> str:
+        path = self.path(job_id, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path
+
+    def write_json(self, job_id: uuid.UUID, name: str, data: Any) -> str:
+        return self.write_bytes(job_id, name, json.dumps(data, indent=2, default=str).encode())
+
+    def read_json(self, job_id: uuid.UUID, name: str) -> Any:
+        with open(self.path(job_id, name), "rb") as f:
+            return json.load(f)
+
+
+artifacts = ArtifactStore(settings.ARTIFACTS_DIR)
@@ -0,0 +1,172 @@
+"""
+Cron expressions and business calendars, for the scheduler (domain.services.scheduler).
+
+Five fields, ``minute hour day-of-month month day-of-week``, each ``*``, a value, a range ``a-b``, a step ``*/n``
+or ``a-b/n``, or a comma-separated list of those; months and days accept names (JAN, MON), Sunday is 0 or 7.
+As in cron, when both day fields are restricted a day matching either one matches. Macros: @yearly, @monthly,
+@weekly, @daily, @hourly.
+"""
+from __future__ import annotations
+
+import bisect
+import dataclasses
+from datetime import date, datetime, timedelta, timezone
+from functools import cache
+from typing import Callable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from database.config import settings
+
+
+class CronError(ValueError):
+    pass
+
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+_MONTHS = {name: index for index, name in enumerate(
+    ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"), start=1)}
+_DAYS = {name: index for index, name in enumerate(("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"))}
+# (name, lowest, highest, names) of the five fields.
+_FIELDS = (
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day of month", 1, 31, {}),
+    ("month", 1, 12, _MONTHS),
+    ("day of week", 0, 7, _DAYS),
+)
+# A cron that cannot fire within this many days (e.g. "0 0 30 2 *") is rejected.
+_HORIZON_DAYS = 5 * 366
+
+
+def _parse_field(text: str, name: str, low: int, high: int, names: dict[str, int]) -> tuple[int, ...]:
+    def value(token: str) -> int:
+        number = names.get(token.upper()) if not token.isdigit() else int(token)
+        if number is None or not low <= number <= high:
+            raise CronError(f"Invalid {name} {token!r} (expected {low}-{high})")
+        return number
+
+    values: set[int] = set()
+    for part in text.split(","):
+        span, _, step_text = part.partition("/")
+        if step_text and (not step_text.isdigit() or int(step_text) == 0):
+            raise CronError(f"Invalid {name} step {step_text!r}")
+        step = int(step_text) if step_text else 1
+        if span == "*":
+            start, end = low, high
+        else:
+            first, dash, last = span.partition("-")
+            start = value(first)
+            end = value(last) if dash else (high if step_text else start)
+            if end < start:
+                raise CronError(f"Invalid {name} range {span!r}")
+        values.update(range(start, end + 1, step))
+    return tuple(sorted(values))
+
+
+@dataclasses.dataclass(frozen=True)
+class CronExpression:
+    expression: str
+    minutes: tuple[int, ...]
+    hours: tuple[int, ...]
+    days: tuple[int, ...]
+    months: tuple[int, ...]
+    weekdays: frozenset[int]  # Sunday = 0
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    @cache
+    def parse(cls, expression: str) -> CronExpression:
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise CronError(f"Cron expression {expression!r} must have 5 fields")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)
+        )
+        cron = cls(
+            expression, minutes, hours, days, months, frozenset(day % 7 for day in weekdays),
+            any_day=fields[2] == "*", any_weekday=fields[4] == "*",
+        )
+        cron.next_after(datetime(2000, 1, 1))  # fires at all
+        return cron
+
+    def matches_day(self, day: date) -> bool:
+        in_month = day.day in self.days
+        in_week = day.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, after: datetime, is_open: Callable[[date], bool] | None = None) -> datetime:
+        """First matching minute strictly after ``after`` (naive wall-clock time), on a day ``is_open`` accepts."""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=_HORIZON_DAYS)
+        while t < limit:
+            if t.month not in self.months:
+                t = datetime(t.year + t.month // 12, t.month % 12 + 1, 1)
+                continue
+            if not self.matches_day(t.date()) or (is_open is not None and not is_open(t.date())):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                index = bisect.bisect_right(self.hours, t.hour)
+                if index == len(self.hours):
+                    t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                else:
+                    t = t.replace(hour=self.hours[index], minute=0)
+                continue
+            if t.minute not in self.minutes:
+                index = bisect.bisect_right(self.minutes, t.minute)
+                if index == len(self.minutes):
+                    t = t.replace(minute=0) + timedelta(hours=1)
+                else:
+                    t = t.replace(minute=self.minutes[index])
+                continue
+            return t
+        raise CronError(f"Cron expression {self.expression!r} never fires")
+
+    def next_fire(self, after: datetime, tz: ZoneInfo, calendar: BusinessCalendar | None = None) -> datetime:
+        """
+        Next fire time (aware, UTC) strictly after the instant ``after``, the expression being read in ``tz``.
+        A wall-clock time skipped by a DST change fires just after it; a repeated one fires once.
+        """
+        local = after.astimezone(tz).replace(tzinfo=None)
+        while True:
+            local = self.next_after(local, calendar.is_business_day if calendar else None)
+            fire = local.replace(tzinfo=tz).astimezone(timezone.utc)
+            if fire > after:
+                return fire
+
+
+@dataclasses.dataclass(frozen=True)
+class BusinessCalendar:
+    """Open days: ``weekdays`` (Monday = 0, unlike cron) except ``holidays``."""
+    name: str
+    weekdays: frozenset[int]
+    holidays: frozenset[date]
+
+    def is_business_day(self, day: date) -> bool:
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+
+def business_calendar(name: str) -> BusinessCalendar:
+    """Calendar ``name`` of settings.BUSINESS_CALENDARS."""
+    config = settings.BUSINESS_CALENDARS.get(name)
+    if config is None:
+        raise CronError(f"Unknown business calendar {name!r}")
+    return BusinessCalendar(name, frozenset(config.weekdays), frozenset(config.holidays))
+
+
+def time_zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise CronError(f"Unknown time zone {name!r}") from None
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+from dataclasses import dataclass, field
+
+from database.config import settings
+from shared.metrics import registry
+
+loop_lag = registry.gauge("event_loop_lag_seconds", "Delay of the last timer wake-up of each event loop")
+
+
+@dataclass
+class LoopMonitor:
+    """
+    Measures how late an event loop wakes up a timer: the time a ready callback waits behind the running ones.
+    ``status()`` can be read from any thread; a loop blocked since its last tick shows the time it has been blocked.
+    """
+    name: str
+    interval: float = field(default_factory=lambda: settings.LOOP_LAG_INTERVAL)
+    samples: collections.deque[float] = field(default_factory=lambda: collections.deque(maxlen=20), init=False)
+    _last_tick: float | None = field(default=None, init=False)
+    _task: asyncio.Task | None = field(default=None, init=False)
+
+    def start(self) -> None:
+        self._last_tick = time.monotonic()
+        self._task = asyncio.create_task(self._run(), name=f"loop-monitor-{self.name}")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._last_tick = time.monotonic()
+            lag = max(0.0, self._last_tick - expected)
+            self.samples.append(lag)
+            loop_lag.set(lag, loop=self.name)
+
+    @property
+    def lag(self) -> float:
+        if self._last_tick is None:
+            return 0.0
+        blocked = time.monotonic() - self._last_tick - self.interval
+        return max(self.samples[-1] if self.samples else 0.0, blocked, 0.0)
+
+    def status(self) -> dict:
+        lag = self.lag
+        return {
+            "loop": self.name,
+            "running": self._task is not None,
+            "lag_ms": round(lag * 1000, 1),
+            "max_lag_ms": round(max((lag, *self.samples)) * 1000, 1),
+            "ready": self._task is not None and lag <= settings.READY_MAX_LOOP_LAG,
+        }
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from dataclasses import dataclass, field
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, str]) -> LabelValues:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelValues, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+@dataclass
+class Metric:
+    name: str
+    help: str
+    type: str = "untyped"
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+
+@dataclass
+class Counter(Metric):
+    type: str = "counter"
+    values: dict[LabelValues, float] = field(default_factory=dict)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def expose(self) -> list[str]:
+        return [f"{self.name}{_format_labels(k)} {v}" for k, v in self.values.items()]
+
+
+@dataclass
+class Gauge(Metric):
+    type: str = "gauge"
+    values: dict[LabelValues, float] = field(default_factory=dict)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self.values[_labels(labels)] = value
+
+    def get(self, **labels: str) -> float | None:
+        return self.values.get(_labels(labels))
+
+    def remove(self, **labels: str) -> None:
+        with self._lock:
+            self.values.pop(_labels(labels), None)
+
+    def expose(self) -> list[str]:
+        return [f"{self.name}{_format_labels(k)} {v}" for k, v in self.values.items()]
+
+
+@dataclass
+class Histogram(Metric):
+    type: str = "histogram"
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    # labels -> (bucket counts, sum, count)
+    values: dict[LabelValues, list] = field(default_factory=dict)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            entry = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def expose(self) -> list[str]:
+        lines = []
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name=name, help=help, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def expose(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, AsyncIterator
+
+from database import instrumentation
+from database.config import settings
+
+# Marks the asyncio tasks that belong to the profiled run: tasks copy the context they are created in.
+_profiled: contextvars.ContextVar[bool] = contextvars.ContextVar("profiled", default=False)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({code.co_filename}:{frame.f_lineno})"
+
+
+def _await_chain(task: asyncio.Task) -> list[FrameType]:
+    """Logical stack of a suspended task: the coroutine it runs and everything it is awaiting."""
+    frames = []
+    coro: Any = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+def _thread_stack(frame: FrameType | None) -> list[FrameType]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return list(reversed(frames))
+
+
+@dataclass
+class WallClockSampler:
+    """
+    Samples the event loop from a background thread.
+    Every tick records the loop thread's stack (what is on CPU) and the await chain of every
+    profiled task (what each task is waiting on), so time spent in ``await`` is visible too.
+    """
+    loop: asyncio.AbstractEventLoop
+    interval: float
+    samples: int = 0
+    loop_stacks: Counter = field(default_factory=Counter)
+    task_stacks: Counter = field(default_factory=Counter)
+    _thread_id: int = field(default_factory=threading.get_ident)
+    _stop: threading.Event = field(default_factory=threading.Event)
+    _thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="wall-clock-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        self.samples += 1
+        frame = sys._current_frames().get(self._thread_id)
+        stack = _thread_stack(frame)
+        if stack:
+            self.loop_stacks[tuple(_frame_label(f) for f in stack)] += 1
+        try:
+            tasks = list(asyncio.all_tasks(self.loop))
+        except RuntimeError:
+            return
+        for task in tasks:
+            if task.done() or not task.get_context().get(_profiled, False):
+                continue
+            chain = _await_chain(task)
+            if chain:
+                self.task_stacks[tuple(_frame_label(f) for f in chain)] += 1
+
+    @staticmethod
+    def _summary(stacks: Counter, total: int, limit: int) -> dict:
+        leaf = Counter()
+        for stack, count in stacks.items():
+            leaf[stack[-1]] += count
+        return {
+            "top_functions": [
+                {"function": label, "samples": count, "pct": round(100 * count / total, 2) if total else 0.0}
+                for label, count in leaf.most_common(limit)
+            ],
+            # Collapsed stacks, loadable by flamegraph tools.
+            "stacks": [f"{';'.join(stack)} {count}" for stack, count in stacks.most_common(limit)],
+        }
+
+    def report(self, limit: int = 30) -> dict:
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "loop_thread": self._summary(self.loop_stacks, self.samples, limit),
+            "tasks": self._summary(self.task_stacks, sum(self.task_stacks.values()), limit),
+        }
+
+
+def _allocation_report(snapshot: tracemalloc.Snapshot, limit: int) -> dict:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top_lines": [
+            {"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ],
+    }
+
+
+# tracemalloc is process-wide: started by the first profiled run (unless something else already traces),
+# stopped when the last one ends, so overlapping runs (other jobs, other execution threads) share it.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+@dataclass
+class Profile:
+    report: dict = field(default_factory=dict)
+
+
+@asynccontextmanager
+async def profile(limit: int = 30) -> AsyncIterator[Profile]:
+    """
+    Profile everything run inside the block: wall clock, SQL statements and allocations.
+    Allocation figures are process-wide: they include what the rest of the process (other jobs, the API)
+    allocated meanwhile, and the peak is the one since tracing started, possibly by an overlapping run.
+    """
+    result = Profile()
+    sampler = WallClockSampler(asyncio.get_running_loop(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    _acquire_tracemalloc()
+    token = _profiled.set(True)
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        with instrumentation.collect() as sql:
+            yield result
+    finally:
+        sampler.stop()
+        _profiled.reset(token)
+        try:
+            result.report = {
+                "duration_s": round(time.perf_counter() - started, 3),
+                "wall_clock": sampler.report(limit),
+                "sql": {
+                    "count": sql.count,
+                    "total_ms": round(sql.total_time * 1000, 3),
+                    "top_by_time": sql.top(limit, by="time"),
+                    "top_by_count": sql.top(limit, by="count"),
+                },
+                "allocations": _allocation_report(tracemalloc.take_snapshot(), limit),
+            }
+        finally:
+            _release_tracemalloc()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Protocol
+
+from database.config import settings
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    """
+    A timed operation, OpenTelemetry data model (trace_id / span_id / parent_span_id).
+    Unsampled spans are still handed out so callers never branch, but they are never exported.
+    """
+    tracer: "Tracer"
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    sampled: bool
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    status_code: int = STATUS_UNSET
+    status_message: str | None = None
+
+    @property
+    def ended(self) -> bool:
+        return self.end_ns is not None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+
+    def end(self) -> None:
+        if self.ended:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            self.tracer.export(self)
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span], service_name: str) -> dict:
+    """Encode spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "night-batch"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_span_id or "",
+                        "name": span.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                        "status": {"code": span.status_code, **({"message": span.status_message} if span.status_message else {})},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+class ConsoleSpanExporter:
+    def export(self, spans: list[Span]) -> None:
+        for span in spans:
+            duration_ms = (span.end_ns - span.start_ns) / 1e6
+            print(f"[trace {span.trace_id[:8]}] {span.name} {duration_ms:.2f}ms "
+                  f"span={span.span_id} parent={span.parent_span_id} {span.attributes}")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OtlpFileSpanExporter:
+    """
+    Appends one OTLP/JSON document per batch, the format read by the collector's ``otlpjsonfile`` receiver.
+    Batches are encoded and written by a single thread of its own, in order, never on the engine's event loop.
+    """
+
+    def __init__(self, path: str, service_name: str = "night-batch") -> None:
+        self.path = path
+        self.service_name = service_name
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="otlp-file-export")
+
+    def export(self, spans: list[Span]) -> None:
+        self._executor.submit(self._write, spans)
+
+    def _write(self, spans: list[Span]) -> None:
+        try:
+            line = json.dumps(to_otlp(spans, self.service_name), separators=(",", ":"))
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            print(f"Tracing: {len(spans)} spans not exported to {self.path}: {e!r}")
+
+    def shutdown(self) -> None:
+        """Waits for the batches already handed over."""
+        self._executor.shutdown(wait=True)
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter | None = None, sample_ratio: float = 1.0, batch_size: int = 512) -> None:
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.batch_size = batch_size
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_ratio > 0
+
+    def _should_sample(self, trace_id: str) -> bool:
+        # Trace-id ratio sampling: the decision is taken once per trace and inherited by every child span.
+        if not self.enabled:
+            return False
+        return int(trace_id[:16], 16) < self.sample_ratio * (1 << 64)
+
+    def start_span(self, name: str, parent: Span | None = None, attributes: dict[str, Any] | None = None) -> Span:
+        if parent is None:
+            trace_id = secrets.token_hex(16)
+            sampled = self._should_sample(trace_id)
+        else:
+            trace_id = parent.trace_id
+            sampled = parent.sampled
+        return Span(
+            tracer=self,
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            sampled=sampled,
+            attributes=dict(attributes or {}) if sampled else {},
+        )
+
+    @contextmanager
+    def span(self, name: str, parent: Span | None = None, **attributes: Any) -> Iterator[Span]:
+        """Child of ``parent`` (or of the current span); becomes the current span for the block."""
+        span = self.start_span(name, parent or _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(str(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            # Flush on batch size or when a trace completes, so a finished job is always on disk.
+            if len(self._buffer) < self.batch_size and span.parent_span_id is not None:
+                return
+            batch, self._buffer = self._buffer, []
+        self.exporter.export(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch and self.exporter:
+            self.exporter.export(batch)
+
+    def shutdown(self) -> None:
+        self.flush()
+        if self.exporter:
+            self.exporter.shutdown()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def create_tracer() -> Tracer:
+    exporters = {
+        "console": lambda: ConsoleSpanExporter(),
+        "otlp_file": lambda: OtlpFileSpanExporter(settings.TRACING_FILE, settings.TRACING_SERVICE_NAME),
+    }
+    factory = exporters.get(settings.TRACING_EXPORTER)
+    return Tracer(factory() if factory else None, settings.TRACING_SAMPLE_RATIO)
+
+
+tracer = create_tracer()
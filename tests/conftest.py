@@ -0,0 +1,65 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from database import database
+from database.config import settings
+from database.instrumentation import query_budget as _query_budget
+
+# Statement budgets for a night batch (3 levels deep, 11 tasks).
+# selectin loading costs 4 statements per tree level, independent of the number of tasks per level.
+QUERY_BUDGETS = {
+    "JobRepository.get": 13,
+    "JobRepository.get_all": 13,
+    # Changes made while a write runs are grouped into the next one (see StateWriter): one executemany UPDATE per
+    # set of changed columns, plus one UPDATE bumping the enclosing jobs' versions, per write.
+    "ReactiveEngine.run": 80,
+}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Usage::
+
+        with query_budget(QUERY_BUDGETS["JobRepository.get"]):
+            await repository.get(job_id)
+    """
+    return _query_budget
+
+
+@pytest.fixture(scope="session")
+def migrated_database(tmp_path_factory) -> Path:
+    """A SQLite file at the migration head, copied by each test instead of migrating again."""
+    from alembic import command
+    from alembic.config import Config
+
+    path = tmp_path_factory.mktemp("schema") / "head.db"
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+        command.upgrade(Config(str(Path(__file__).parents[1] / "alembic.ini")), "head")
+    return path
+
+
+@pytest.fixture
+async def db(migrated_database, tmp_path, monkeypatch):
+    """A fresh database for the test's event loop, files (artifacts, archives) under the test's tmp_path."""
+    path = tmp_path / "app.db"
+    shutil.copy(migrated_database, path)
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+    monkeypatch.chdir(tmp_path)
+    engine = await database.init()
+    yield engine
+    await database.shutdown()
+
+
+@pytest.fixture
+async def client(db):
+    """HTTP client of the app, on the test's database. The lifespan (scheduler, execution threads) is not run."""
+    import httpx
+
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
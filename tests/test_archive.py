@@ -0,0 +1,64 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from database import database
+from domain.models.archive import archived_jobs
+from domain.models.task import Task
+from domain.models.task_dependency import TaskDependency
+from domain.services import job_runner
+from domain.services.archive import Archiver, _month_starts
+from domain.services.job_registry import job_registry
+
+
+async def _count(statement) -> int:
+    async with database.get_session_manager() as session:
+        return (await session.execute(statement)).scalar_one()
+
+
+async def test_file_mode_writes_the_job_tree_and_indexes_its_location(db, tmp_path):
+    job = await job_registry.create("night_batch")
+    await job_runner.run(job.id)
+    task_count = await _count(select(func.count()).select_from(Task).where(Task.root_job_id == job.id))
+    dependency_count = await _count(
+        select(func.count()).select_from(TaskDependency).join(Task, TaskDependency.task_id == Task.id)
+        .where(Task.root_job_id == job.id)
+    )
+
+    archived = await Archiver(database.get_engine("worker"), mode="file", directory=str(tmp_path / "archive")).run(timedelta(0))
+
+    assert archived == 1
+    async with database.get_session_manager() as session:
+        row = (await session.execute(select(archived_jobs).where(archived_jobs.c.id == job.id))).one()
+    assert row.status == "SUCCESS" and row.task_count == task_count == 12
+    assert row.location == str(tmp_path / "archive" / f"{row.created_at:%Y}" / f"{row.created_at:%m}" / f"{job.id}.jsonl.gz")
+
+    with gzip.open(row.location, "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    archived_tasks = [line for line in lines if line["table"] == "tasks"]
+    assert str(job.id) in {line["id"] for line in archived_tasks}
+    assert len(archived_tasks) == task_count
+    assert all(line["root_job_id"] == str(job.id) for line in archived_tasks)
+    assert sum(line["table"] == "task_dependencies" for line in lines) == dependency_count > 0
+
+    # Moved, not copied.
+    assert await _count(select(func.count()).select_from(Task).where(Task.root_job_id == job.id)) == 0
+    assert not list((tmp_path / "archive").rglob("*.tmp"))
+
+
+def test_month_partitions_cover_a_month_and_year_boundary():
+    bounds = list(_month_starts(datetime(2026, 11, 30, 23, 59), datetime(2027, 1, 1, 0, 0, 1)))
+
+    assert bounds == [
+        (datetime(2026, 11, 1), datetime(2026, 12, 1)),
+        (datetime(2026, 12, 1), datetime(2027, 1, 1)),
+        (datetime(2027, 1, 1), datetime(2027, 2, 1)),
+    ]
+
+
+def test_month_partitions_of_rows_within_one_month():
+    assert list(_month_starts(datetime(2026, 1, 31, 8), datetime(2026, 1, 31, 9))) == [
+        (datetime(2026, 1, 1), datetime(2026, 2, 1)),
+    ]
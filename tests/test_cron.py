@@ -0,0 +1,69 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from shared.cron import BusinessCalendar, CronError, CronExpression
+
+PARIS = ZoneInfo("Europe/Paris")
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("30 2 * * *", datetime(2026, 1, 5, 2, 30), datetime(2026, 1, 6, 2, 30)),
+    ("*/15 * * * *", datetime(2026, 1, 5, 10, 7, 42), datetime(2026, 1, 5, 10, 15)),
+    ("0 0 29 2 *", datetime(2026, 3, 1), datetime(2028, 2, 29)),
+    ("0 6 * * MON-FRI", datetime(2026, 1, 9, 7), datetime(2026, 1, 12, 6)),  # Friday -> Monday
+    ("0 0 13 * 5", datetime(2026, 1, 1), datetime(2026, 1, 2)),  # the 13th or a Friday
+    ("@monthly", datetime(2026, 12, 15), datetime(2027, 1, 1)),
+])
+def test_next_after(expression, after, expected):
+    assert CronExpression.parse(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "0 0 30 2 *", "0 0 * * FOO", "*/0 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronError):
+        CronExpression.parse(expression)
+
+
+def test_skipped_wall_clock_time_fires_once_just_after():
+    # 2026-03-29: Paris clocks jump from 02:00 to 03:00 (01:00 UTC).
+    cron = CronExpression.parse("30 2 * * *")
+
+    fire = cron.next_fire(utc(2026, 3, 28, 12), PARIS)
+    assert fire == utc(2026, 3, 29, 1, 30)  # 03:30 CEST
+    assert cron.next_fire(fire, PARIS) == utc(2026, 3, 30, 0, 30)  # 02:30 CEST
+
+
+def test_repeated_wall_clock_time_fires_once():
+    # 2026-10-25: Paris clocks go back from 03:00 to 02:00 (01:00 UTC), 02:30 happens twice.
+    cron = CronExpression.parse("30 2 * * *")
+
+    fire = cron.next_fire(utc(2026, 10, 24, 12), PARIS)
+    assert fire == utc(2026, 10, 25, 0, 30)  # the first 02:30 (CEST)
+    assert cron.next_fire(fire, PARIS) == utc(2026, 10, 26, 1, 30)
+    # From within the repeated hour too.
+    assert cron.next_fire(utc(2026, 10, 25, 1, 10), PARIS) == utc(2026, 10, 26, 1, 30)
+
+
+def test_hourly_across_fall_back_skips_the_repeated_hour():
+    cron = CronExpression.parse("0 * * * *")
+    fires, fire = [], utc(2026, 10, 24, 23, 30)
+    for _ in range(4):
+        fire = cron.next_fire(fire, PARIS)
+        fires.append(fire)
+
+    assert fires == [utc(2026, 10, 25, 0), utc(2026, 10, 25, 2), utc(2026, 10, 25, 3), utc(2026, 10, 25, 4)]
+
+
+def test_business_calendar_skips_weekends_and_holidays():
+    calendar = BusinessCalendar("fr", frozenset(range(5)), frozenset({date(2026, 12, 25)}))
+    cron = CronExpression.parse("0 22 * * *")
+
+    # Thursday 24th -> Christmas (Friday) and the weekend are skipped.
+    fire = cron.next_fire(utc(2026, 12, 24, 22), PARIS, calendar)
+    assert fire == utc(2026, 12, 28, 21)
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+
+import main
+from database import database
+from database.config import settings
+from database.pool import pool_checked_out, pool_size
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.services import job_runner
+from domain.services.execution_host import ExecutionHost
+from shared.loop_monitor import LoopMonitor
+
+
+async def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+async def _until(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def host(db, monkeypatch):
+    monkeypatch.setattr(settings, "LOOP_LAG_INTERVAL", 0.01)
+    host = ExecutionHost(threads=2)
+    host.start()
+    yield host
+    await host.stop()
+
+
+async def test_a_job_always_runs_on_the_same_thread(host):
+    job_id = uuid.UUID(int=3)
+
+    names = {await host.run(job_id, _thread_name) for _ in range(5)}
+
+    assert names == {"execution-1"}
+    assert await host.run(uuid.UUID(int=4), _thread_name) == "execution-0"
+
+
+async def test_cancelling_run_cancels_the_coroutine_on_its_thread(host):
+    started, cancelled = threading.Event(), threading.Event()
+
+    async def wait_forever():
+        started.set()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    run = asyncio.create_task(host.run(uuid.UUID(int=0), wait_forever))
+    await asyncio.to_thread(started.wait, 5)
+    run.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    assert await asyncio.to_thread(cancelled.wait, 5)
+    await _until(lambda: host._threads[0].running == 0)
+
+
+async def test_pool_gauges_are_kept_per_loop(host):
+    assert {labels for labels in pool_size.values if ("role", "sqlite") in labels} >= {
+        (("loop", "MainThread"), ("role", "sqlite")),
+        (("loop", "execution-0"), ("role", "sqlite")),
+        (("loop", "execution-1"), ("role", "sqlite")),
+    }
+
+    await host.stop()
+    assert pool_size.get(role="sqlite", loop="execution-0") is None
+    assert pool_checked_out.get(role="sqlite", loop="execution-1") is None
+
+
+async def test_job_submitted_runs_through_the_started_host(host, monkeypatch):
+    monkeypatch.setattr(job_runner, "execution_host", host)
+
+    job = await job_runner.submit("night_batch")
+
+    async def status():
+        async with database.get_session_manager() as session:
+            return (await JobRepository(session).get_version(job.id))[1]
+
+    for _ in range(1000):
+        if (await status()).is_final():
+            break
+        await asyncio.sleep(0.01)
+    assert await status() == Status.SUCCESS
+    await _until(lambda: job_runner.job_queue.info(job.id) is None)
+
+
+async def test_monitor_reports_a_blocked_loop():
+    monitor = LoopMonitor("test", interval=0.01)
+    assert monitor.status()["running"] is False
+
+    monitor.start()
+    await asyncio.sleep(0.05)
+    assert monitor.status()["ready"] is True
+    time.sleep(0.1)  # blocks the loop: no tick while it lasts
+
+    assert monitor.lag >= 0.09
+    await asyncio.sleep(0.05)
+    assert len(monitor.samples) > 1
+    assert monitor.status()["max_lag_ms"] >= 90
+    monitor.stop()
+    assert monitor.status()["ready"] is False
+
+
+async def test_ready_is_503_when_a_loop_is_stopped_or_lagging(client, host, monkeypatch):
+    monkeypatch.setattr(main, "execution_host", host)
+    monkeypatch.setattr(settings, "READY_MAX_LOOP_LAG", 0.05)
+
+    stopped = await client.get("/ready")
+    assert stopped.status_code == 503
+    api_loop = stopped.json()["loops"][0]
+    assert api_loop["loop"] == "api" and api_loop["running"] is False and api_loop["ready"] is False
+
+    monkeypatch.setattr(main.api_loop, "interval", 0.01)
+    main.api_loop.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert (await client.get("/ready")).status_code == 200
+
+        blocked, release = threading.Event(), threading.Event()
+
+        async def block():
+            blocked.set()
+            release.wait(5)  # holds execution-0's loop
+
+        run = asyncio.create_task(host.run(uuid.UUID(int=0), block))
+        await asyncio.to_thread(blocked.wait, 5)
+        await asyncio.sleep(0.1)
+        lagging = await client.get("/ready")
+        release.set()
+        await run
+    finally:
+        main.api_loop.stop()
+
+    assert lagging.status_code == 503
+    loops = {loop["loop"]: loop for loop in lagging.json()["loops"]}
+    assert loops["execution-0"]["ready"] is False and loops["execution-0"]["lag_ms"] >= 50
+    assert loops["execution-1"]["ready"] is True
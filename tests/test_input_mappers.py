@@ -0,0 +1,79 @@
+import pytest
+
+from database import database
+from domain.job_repository import JobRepository
+from domain.models.enums.input_strategy import (
+    InputMapper, MergeStrategy, prepare_task_input, register_mapper, resolve_mapper,
+)
+from domain.models.job import Job
+from domain.models.task import Task
+
+
+class Echo(Task):
+    async def action(self):
+        return self.input
+
+
+@register_mapper
+def first(outputs):
+    return outputs[0]
+
+
+def unregistered(outputs):
+    return outputs[-1]
+
+
+def test_register_mapper_rejects_lambdas_and_nested_functions():
+    def nested(outputs):
+        return outputs
+
+    with pytest.raises(ValueError):
+        register_mapper(lambda outputs: outputs)
+    with pytest.raises(ValueError):
+        register_mapper(nested)
+
+
+def test_add_upstream_validates_the_mapper():
+    def nested(outputs):
+        return outputs
+
+    task, upstream = Echo(name="task"), Echo(name="upstream")
+    with pytest.raises(ValueError, match="requires a mapper"):
+        task.add_upstream(upstream, merge_strategy=MergeStrategy.CUSTOM)
+    with pytest.raises(ValueError, match="only be used with merge_strategy='custom'"):
+        task.add_upstream(upstream, merge_strategy=MergeStrategy.MERGE_DICT, mapper=first)
+    with pytest.raises(ValueError, match="module-level"):
+        task.add_upstream(upstream, merge_strategy=MergeStrategy.CUSTOM, mapper=nested)
+
+
+def test_resolve_mapper_is_cached():
+    assert resolve_mapper(__name__, "first") is first
+    assert resolve_mapper(__name__, "unregistered") is unregistered
+
+    hits = resolve_mapper.cache_info().hits
+    assert resolve_mapper(__name__, "unregistered") is unregistered
+    assert resolve_mapper.cache_info().hits == hits + 1
+
+
+def test_combine_merges_dicts_and_concatenates_anything_else():
+    assert InputMapper.combine([{"a": 1}, {"b": 2}]) == {"a": 1, "b": 2}
+    assert InputMapper.combine([{"a": 1}, [2, 3]]) == [{"a": 1}, 2, 3]
+
+
+async def test_each_link_is_merged_with_its_own_strategy(db):
+    job = Job(name="Mixed strategies")
+    a, b, c = (Echo(parent=job, name=name) for name in "abc")
+    a.output, b.output, c.output = {"x": 1}, {"y": 2, "x": 0}, {"z": 3}
+    task = Echo(parent=job, name="task")
+    task.add_upstream(a, b, merge_strategy=MergeStrategy.MERGE_DICT)
+    task.add_upstream(c, merge_strategy=MergeStrategy.CUSTOM, mapper=first)
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+
+    async with database.get_session_manager("worker") as session:
+        loaded = await JobRepository(session).get(job.id, load_graph=True)
+        task = next(child for child in loaded.children if child.name == "task")
+        await prepare_task_input(task)
+
+    assert task.input == {"x": 0, "y": 2, "z": 3}
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from database import database
+from domain.models.job import Job
+from domain.models.task import Task
+from domain.services import job_runner
+from domain.services.archive import Archiver
+from domain.services.job_registry import job_registry
+
+
+class FailsOnce(Task[None, str]):
+    attempts = 0
+
+    async def action(self):
+        FailsOnce.attempts += 1
+        if FailsOnce.attempts == 1:
+            raise ValueError("first attempt")
+        return "done"
+
+
+PRIVATE_FIELDS = {"_input_data", "_output_data", "_input_bin", "_output_bin", "input_hash"}
+
+
+def _fields(task: dict) -> set[str]:
+    return set(task).union(*(_fields(child) for child in task["children"]))
+
+
+@pytest.fixture
+async def job(db):
+    return await job_registry.create("night_batch")
+
+
+async def test_listing_encodes_jobs_through_the_response_model(client, job):
+    await job_runner.run(job.id)
+    await Archiver(database.get_engine("worker"), mode="table").run(timedelta(0))
+    live = await job_registry.create("night_batch")
+
+    listed = [item for item in (await client.get("/api/jobs/")).json() if item["parent_id"] is None]
+    with_archived = (await client.get("/api/jobs/", params={"include_archived": True})).json()
+
+    assert [item["id"] for item in listed] == [str(live.id)]
+    assert not _fields(listed[0]) & PRIVATE_FIELDS
+    assert {"id", "kind", "status", "children", "dependencies", "version"} <= set(listed[0])
+    assert len(listed[0]["children"]) == 5
+    archived = next(item for item in with_archived if item["id"] == str(job.id))
+    assert archived["archived"] and archived["task_count"] == 12 and archived["children"] == []
+
+
+async def test_detail_has_no_private_fields(client, job):
+    detail = (await client.get(f"/api/jobs/{job.id}")).json()
+
+    assert detail["status"] == "SCHEDULED"
+    assert detail["depends_on"] == []
+    assert not _fields(detail) & PRIVATE_FIELDS
+
+
+@pytest.mark.parametrize("if_none_match, status_code", [
+    ("{etag}", 304),
+    ("W/{etag}", 304),
+    ('"other", {etag}', 304),
+    ("*", 304),
+    ('"other"', 200),
+    ("{stale}", 200),
+    ('"{job_id}"', 200),
+    ('x{etag}x', 200),
+])
+async def test_if_none_match(client, job, if_none_match, status_code):
+    response = await client.get(f"/api/jobs/{job.id}")
+    etag = response.headers["etag"]
+    header = if_none_match.format(etag=etag, stale=etag.replace("-detail", "0-detail"), job_id=job.id)
+
+    conditional = await client.get(f"/api/jobs/{job.id}", headers={"If-None-Match": header})
+
+    assert conditional.status_code == status_code
+    assert conditional.headers["etag"] == etag
+    if status_code == 200:
+        assert conditional.json() == response.json()
+
+
+async def test_etag_follows_the_version(client, job):
+    scheduled = await client.get(f"/api/jobs/{job.id}")
+    assert scheduled.headers["cache-control"] == "no-cache"
+
+    await job_runner.run(job.id)
+    finished = await client.get(f"/api/jobs/{job.id}", headers={"If-None-Match": scheduled.headers["etag"]})
+
+    assert finished.status_code == 200
+    assert finished.headers["etag"] != scheduled.headers["etag"]
+    assert finished.headers["cache-control"] == "no-cache"
+    assert finished.json()["status"] == "SUCCESS"
+
+
+async def test_collapsed_graph_etag_holds_commas(client, job):
+    detail = (await client.get(f"/api/jobs/{job.id}")).json()
+    collapse = [child["id"] for child in detail["children"] if child["task_type"] == "JOB"][:2]
+    url = f"/api/jobs/{job.id}/graph"
+
+    graph = await client.get(url, params={"collapse": collapse})
+    assert "," in graph.headers["etag"]
+    conditional = await client.get(url, params={"collapse": collapse}, headers={"If-None-Match": graph.headers["etag"]})
+
+    assert conditional.status_code == 304
+
+
+async def test_retried_failed_job_is_not_served_from_cache(client, db, monkeypatch):
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay, *args, **kwargs: sleep(min(delay, 0.01), *args, **kwargs))
+    FailsOnce.attempts = 0
+    job = Job(name="Retried")
+    task = FailsOnce(parent=job, name="fails once")
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+    await job_runner.run(job.id)
+
+    failed = await client.get(f"/api/jobs/{job.id}")
+    assert failed.json()["status"] == "FAILED"
+    # No max-age: the browser revalidates instead of keeping the FAILED view after a retry.
+    assert failed.headers["cache-control"] == "no-cache"
+
+    assert (await client.post(f"/api/jobs/{job.id}/retries", json={"task_id": str(task.id)})).status_code == 202
+    retried = await client.get(f"/api/jobs/{job.id}", headers={"If-None-Match": failed.headers["etag"]})
+
+    assert retried.status_code == 200
+    assert retried.headers["etag"] != failed.headers["etag"]
+    assert retried.json()["status"] == "SUCCESS"
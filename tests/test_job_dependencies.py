@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from sqlalchemy import update
+
+from database import database
+from database.notifications import JOB_FINISHED, notifications
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.task import Task
+from domain.services.job_dependencies import DependencyGate
+from domain.services.job_registry import job_registry
+
+
+async def _set_status(job_id, status):
+    async with database.get_session_manager("worker") as session:
+        await session.execute(update(Task).where(Task.id == job_id).values(status=status))
+        await session.commit()
+
+
+async def _status(job_id):
+    async with database.get_session_manager() as session:
+        return (await JobRepository(session).get_version(job_id))[1]
+
+
+async def _until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.fixture
+async def jobs(db):
+    upstream = await job_registry.create("night_batch")
+    downstream = await job_registry.create("night_batch", depends_on=[upstream.id])
+    return upstream, downstream
+
+
+@pytest.fixture
+async def gates():
+    started = []
+
+    def start(enqueue):
+        gate = DependencyGate(recheck_interval=3600)
+        gate.start(enqueue)
+        started.append(gate)
+        return gate
+
+    yield start
+    for gate in started:
+        await gate.stop()
+
+
+async def test_added_job_is_queued_once_its_upstream_succeeded(jobs, gates):
+    upstream, downstream = jobs
+    queued = []
+    gate = gates(queued.append)
+
+    await gate.add(downstream.id, [upstream.id], lambda: queued.append(downstream.id))
+    assert gate.waiting_for(downstream.id) == [upstream.id]
+
+    await _set_status(upstream.id, Status.SUCCESS)
+    await notifications.publish(JOB_FINISHED, {"job_id": str(upstream.id), "status": Status.SUCCESS})
+
+    await _until(lambda: queued)
+    assert queued == [downstream.id]
+    assert gate.waiting_for(downstream.id) is None
+
+
+async def test_waiting_jobs_are_reloaded_at_start(jobs, gates):
+    upstream, downstream = jobs
+    queued = []
+
+    gate = gates(queued.append)
+    await _until(lambda: gate.waiting_for(downstream.id))
+    assert gate.waiting_for(downstream.id) == [upstream.id]
+    assert queued == []
+
+    await _set_status(upstream.id, Status.SUCCESS)
+    await notifications.publish(JOB_FINISHED, {"job_id": str(upstream.id), "status": Status.SUCCESS})
+    await _until(lambda: queued)
+    assert queued == [downstream.id]
+
+
+async def test_reloaded_job_with_succeeded_upstream_is_released_by_one_process(jobs, gates):
+    upstream, downstream = jobs
+    await _set_status(upstream.id, Status.SUCCESS)
+    queued = []
+
+    first, second = gates(queued.append), gates(queued.append)
+    await _until(lambda: queued)
+    await asyncio.sleep(0.05)
+
+    assert queued == [downstream.id]
+    assert first.waiting_for(downstream.id) is None and second.waiting_for(downstream.id) is None
+
+
+async def test_reloaded_job_with_failed_upstream_fails(jobs, gates):
+    upstream, downstream = jobs
+    await _set_status(upstream.id, Status.FAILED)
+    queued = []
+
+    gates(queued.append)
+
+    for _ in range(200):
+        if await _status(downstream.id) == Status.FAILED:
+            break
+        await asyncio.sleep(0.01)
+    assert await _status(downstream.id) == Status.FAILED
+    assert queued == []
@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+
+import pytest
+
+from domain.services import job_queue as job_queue_module
+from domain.services.job_queue import JobQueue, QueueFull
+
+
+def _blocked_runs():
+    """run callables that wait until released, and the order they started in."""
+    started, release = [], asyncio.Event()
+
+    def run_for(name):
+        async def run():
+            started.append(name)
+            await release.wait()
+        return run
+
+    return run_for, started, release
+
+
+async def test_admission_order_and_queue_full():
+    queue = JobQueue(max_concurrent=1, max_size=3)
+    run_for, started, release = _blocked_runs()
+    ids = {name: uuid.uuid4() for name in ("first", "low", "high", "other")}
+
+    assert queue.submit(ids["first"], run_for("first"), submitter="a").state == "running"
+    queue.submit(ids["low"], run_for("low"), submitter="a")
+    queue.submit(ids["other"], run_for("other"), submitter="b")
+    queue.submit(ids["high"], run_for("high"), priority=5, submitter="a")
+    with pytest.raises(QueueFull) as full:
+        queue.submit(uuid.uuid4(), run_for("refused"))
+
+    assert full.value.retry_after == 1
+    # Priority first, then the submitter without a running job.
+    assert [queue.info(ids[name]).position for name in ("high", "other", "low")] == [0, 1, 2]
+    release.set()
+    while len(started) < 4:
+        await asyncio.sleep(0.01)
+    assert started == ["first", "high", "other", "low"]
+
+
+async def test_reserved_places_count_until_submitted_or_released():
+    queue = JobQueue(max_concurrent=0, max_size=2)
+    run_for, _, _ = _blocked_runs()
+
+    queue.reserve()
+    queue.submit(uuid.uuid4(), run_for("unreserved"))
+    with pytest.raises(QueueFull):
+        queue.reserve()
+    with pytest.raises(QueueFull):
+        queue.submit(uuid.uuid4(), run_for("refused"))
+
+    # The reserved submission is never refused.
+    queue.submit(uuid.uuid4(), run_for("reserved"), reserved=True)
+    assert len(queue._queued) == 2 and queue._reserved == 0
+
+    queue = JobQueue(max_concurrent=0, max_size=1)
+    queue.reserve()
+    queue.release()
+    queue.reserve()
+
+
+@pytest.fixture
+def full_queue(monkeypatch):
+    """A queue holding a single waiting job, nothing running (not the process's queue)."""
+    import api.job
+    import domain.services.job_runner
+
+    queue = JobQueue(max_concurrent=0, max_size=1)
+    for module in (job_queue_module, api.job, domain.services.job_runner):
+        monkeypatch.setattr(module, "job_queue", queue)
+    return queue
+
+
+async def test_full_queue_answers_429_without_creating_the_job(client, full_queue):
+    responses = await asyncio.gather(*(client.post("/api/jobs/") for _ in range(3)))
+
+    assert sorted(response.status_code for response in responses) == [202, 429, 429]
+    refused = next(response for response in responses if response.status_code == 429)
+    assert refused.headers["retry-after"] == "1"
+    accepted = next(response for response in responses if response.status_code == 202).json()
+    assert accepted["queue_position"] == 0
+    jobs = [job for job in (await client.get("/api/jobs/")).json() if job["parent_id"] is None]
+    assert [job["id"] for job in jobs] == [accepted["job_id"]]
+    assert full_queue._reserved == 0
@@ -0,0 +1,105 @@
+import asyncio
+
+from database import database
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.models.map_job import MapJob
+from domain.models.task import Task
+from domain.services import job_runner
+
+
+class ListItems(Task[None, list[int]]):
+    async def action(self):
+        return list(range(1, 8))
+
+
+class Square(Task[int, int]):
+    running = 0
+    max_running = 0
+
+    async def action(self):
+        if self.input == 13:
+            raise ValueError("unlucky")
+        Square.running += 1
+        Square.max_running = max(Square.max_running, Square.running)
+        await asyncio.sleep(0.01)
+        Square.running -= 1
+        return self.input ** 2
+
+
+class SquareAll(MapJob[list[int], list[int]]):
+    item_task = Square
+    max_concurrency = 2
+
+
+class SumChunk(Task[list[int], int]):
+    async def action(self):
+        return sum(self.input)
+
+
+class SumChunks(MapJob[list[int], list[int]]):
+    item_task = SumChunk
+    chunk_size = 3
+
+
+class SpreadChunks(MapJob[list[int], list[int]]):
+    item_task = SumChunk
+    max_children = 3
+
+
+class SquaresJob(Job):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        items = ListItems(parent=self, name="items")
+        SquareAll(parent=self, name="squares").add_upstream(items)
+
+
+async def _run(job: Job) -> Job:
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+    await job_runner.run(job.id)
+    async with database.get_session_manager() as session:
+        return await JobRepository(session).get(job.id, load_graph=True)
+
+
+def test_split():
+    items = list(range(7))
+    assert SumChunks().split(items) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert SpreadChunks().split(items) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert SpreadChunks().split(items[:2]) == [[0], [1]]
+    assert SquareAll().split(items) == items
+
+
+async def test_map_job_fans_out_at_run_time_and_reduces_in_order(db):
+    Square.max_running = 0
+    job = await _run(SquaresJob(name="Squares"))
+
+    squares = next(child for child in job.children if child.name == "squares")
+    assert job.status == Status.SUCCESS
+    assert squares.output == [1, 4, 9, 16, 25, 36, 49]
+    assert [child.name for child in squares.ordered_children()] == [f"squares[{i}]" for i in range(7)]
+    assert all(child.status == Status.SUCCESS for child in squares.children)
+    assert Square.max_running == 2
+
+
+async def test_chunks_are_typed_lists(db):
+    job = Job(name="Sums")
+    SumChunks(parent=job, name="sums", input=list(range(7)))
+    job = await _run(job)
+
+    sums = job.children[0]
+    assert sums.output == [3, 12, 6]
+    assert [child.input for child in sums.ordered_children()] == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+async def test_failed_children_fail_the_map_job(db):
+    job = Job(name="Squares")
+    SquareAll(parent=job, name="squares", input=[2, 13, 3])
+    job = await _run(job)
+
+    squares = job.children[0]
+    assert squares.status == Status.FAILED
+    assert squares.error == "1/3 mapped tasks failed, first error: unlucky"
+    assert [child.status for child in squares.ordered_children()] == [Status.SUCCESS, Status.FAILED, Status.SUCCESS]
@@ -0,0 +1,94 @@
+from array import array
+
+import pytest
+from pydantic import BaseModel
+
+from database import database, payload
+from database.payload import Compression, PayloadEncoding, PayloadFormat, decode_payload, encode_payload
+from domain.job_repository import JobRepository
+from domain.models.job import Job
+from domain.models.task import Task
+
+
+class Quote(BaseModel):
+    id: int
+    price: float
+
+
+class Vector(Task[list[float], list[float]]):
+    input_encoding = "array"
+    output_encoding = "array+zlib"
+
+
+def test_parse():
+    assert PayloadEncoding.parse("msgpack+zstd") == PayloadEncoding(PayloadFormat.MSGPACK, Compression.ZSTD)
+    assert str(PayloadEncoding.parse("ARRAY")) == "array"
+    with pytest.raises(ValueError, match="Unknown payload encoding"):
+        PayloadEncoding.parse("pickle")
+
+
+@pytest.mark.parametrize("spec", ["array", "array+zlib"])
+@pytest.mark.parametrize("values", [[1, 2, 3], [0.5, -1.25, 3.0]])
+def test_array_round_trip(spec, values):
+    data = encode_payload(values, PayloadEncoding.parse(spec))
+
+    assert payload.payload_encoding_of(data) == PayloadEncoding.parse(spec)
+    assert list(decode_payload(data)) == values
+    assert payload.describe_payload(data) == {"encoding": spec, "size": len(data)}
+
+
+def test_array_rejects_what_is_not_a_vector():
+    with pytest.raises(ValueError, match="numeric vectors"):
+        encode_payload([{"id": 1}], PayloadEncoding(PayloadFormat.ARRAY))
+
+
+def test_zstd_falls_back_to_zlib_without_zstandard(monkeypatch):
+    monkeypatch.setattr(payload, "_zstandard", lambda: None)
+    data = encode_payload([1.0] * 100, PayloadEncoding.parse("array+zstd"))
+
+    assert payload.payload_encoding_of(data).compression == Compression.ZLIB
+    assert list(decode_payload(data)) == [1.0] * 100
+
+
+def test_decode_rejects_what_is_not_a_payload():
+    with pytest.raises(ValueError, match="Not a task payload"):
+        decode_payload(b"{\"json\": true}")
+
+
+@pytest.mark.parametrize("spec", ["msgpack", "msgpack+zstd"])
+def test_msgpack_round_trip(spec):
+    pytest.importorskip("msgpack")
+    if spec.endswith("zstd"):
+        pytest.importorskip("zstandard")
+    value = {"quotes": [Quote(id=1, price=2.5)], "name": "é", "raw": b"\x00\x01"}
+
+    assert decode_payload(encode_payload(value, PayloadEncoding.parse(spec))) == {
+        "quotes": [{"id": 1, "price": 2.5}], "name": "é", "raw": b"\x00\x01",
+    }
+
+
+def test_arrow_round_trip():
+    pytest.importorskip("pyarrow")
+    records = [Quote(id=1, price=2.5), Quote(id=2, price=3.0)]
+
+    data = encode_payload(records, PayloadEncoding.parse("arrow"))
+
+    assert decode_payload(data) == [{"id": 1, "price": 2.5}, {"id": 2, "price": 3.0}]
+    assert list(decode_payload(encode_payload([1.5, 2.5], PayloadEncoding.parse("arrow")))) == [1.5, 2.5]
+
+
+async def test_task_payloads_are_stored_binary_and_read_back_typed(db):
+    job = Job(name="Vectors")
+    vector = Vector(parent=job, name="vector", input=[1.0, 2.0])
+    vector.output = [0.5, 1.5]
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+
+    async with database.get_session_manager() as session:
+        loaded = await JobRepository(session).get_task(vector.id)
+        assert loaded._input_data is None and loaded._output_data is None
+        assert payload.payload_encoding_of(loaded._output_bin) == PayloadEncoding.parse("array+zlib")
+        assert loaded.input == [1.0, 2.0]
+        assert loaded.output == [0.5, 1.5]
+        assert isinstance(loaded.output, list)
@@ -0,0 +1,158 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from api import streaming
+from api.job.tasks import payload_artifact
+from api.streaming import negotiate_encoding, parse_range
+from database import database
+from database.config import settings
+from domain.models.job import Job
+from domain.models.task import Task
+from shared.artifacts import artifacts
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+class Describe(Task[dict, dict]):
+    pass
+
+
+class Scale(Task[list[float], list[float]]):
+    input_encoding = "array"
+    output_encoding = "array+zlib"
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("bytes=0-4", (0, 4)),
+    ("bytes=5-", (5, 9)),
+    ("bytes=-3", (7, 9)),
+    ("bytes=-100", (0, 9)),
+    ("bytes=2-100", (2, 9)),
+    ("bytes=9-9", (9, 9)),
+    ("bytes=-", None),
+    ("bytes=0-1,4-5", None),  # several ranges: the whole body
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 10) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=5-2", "bytes=-0"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(HTTPException) as error:
+        parse_range(header, 10)
+
+    assert error.value.status_code == 416
+    assert error.value.headers == {"Content-Range": "bytes */10"}
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setitem(streaming.ENCODINGS, "zstd", lambda: None)  # zstandard not installed
+    assert negotiate_encoding("zstd, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("zstd") is None
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("br, deflate") is None
+
+    monkeypatch.setitem(streaming.ENCODINGS, "zstd", lambda: object())
+    assert negotiate_encoding("gzip, ZSTD") == "zstd"
+
+
+@pytest.fixture
+async def tasks(db, monkeypatch):
+    # Several round trips per payload: the substr offsets are exercised.
+    monkeypatch.setattr(settings, "PAYLOAD_CHUNK_SIZE", 4)
+    job = Job(name="Payloads")
+    describe = Describe(parent=job, name="describe", input={"label": "café crème", "values": list(range(20))})
+    scale = Scale(parent=job, name="scale", input=[1.0, 2.0])
+    scale.output = [0.5, 1.5, 2.5]
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+    return job, describe, scale
+
+
+def _url(job, task, side):
+    return f"/api/jobs/{job.id}/tasks/{task.id}/{side}"
+
+
+async def test_json_payload_size_and_ranges_count_bytes(client, tasks):
+    job, describe, _ = tasks
+    detail = (await client.get(f"/api/jobs/{job.id}/tasks/{describe.id}")).json()
+    full = await client.get(_url(job, describe, "input"), headers=IDENTITY)
+
+    assert full.status_code == 200
+    assert json.loads(full.content) == {"label": "café crème", "values": list(range(20))}
+    size = len(full.content)
+    assert detail["input"] == {"source": "json", "size": size, "content_type": "application/json", "encoding": None}
+    assert full.headers["content-length"] == str(size)
+    assert "content-encoding" not in full.headers
+
+    # Starts inside "é" (two bytes in UTF-8): the slice is in bytes, not characters.
+    start = full.content.index("é".encode()) + 1
+    partial = await client.get(_url(job, describe, "input"), headers={**IDENTITY, "Range": f"bytes={start}-{start + 6}"})
+    assert partial.status_code == 206
+    assert partial.content == full.content[start:start + 7]
+    assert partial.headers["content-range"] == f"bytes {start}-{start + 6}/{size}"
+    assert partial.headers["content-length"] == "7"
+
+    suffix = await client.get(_url(job, describe, "input"), headers={**IDENTITY, "Range": "bytes=-5"})
+    assert suffix.content == full.content[-5:]
+
+    unsatisfiable = await client.get(_url(job, describe, "input"), headers={"Range": f"bytes={size}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{size}"
+
+
+async def test_whole_json_payload_is_gzipped_on_request(client, tasks):
+    job, describe, _ = tasks
+    plain = await client.get(_url(job, describe, "input"), headers=IDENTITY)
+
+    gzipped = await client.get(_url(job, describe, "input"), headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert gzipped.content == plain.content  # decoded by httpx
+
+    # Ranges address the stored bytes: never compressed.
+    ranged = await client.get(_url(job, describe, "input"), headers={"Accept-Encoding": "gzip", "Range": "bytes=0-3"})
+    assert "content-encoding" not in ranged.headers
+    assert ranged.content == plain.content[:4]
+
+
+async def test_compressed_binary_payload_is_sent_as_stored(client, tasks):
+    job, _, scale = tasks
+    async with database.get_session_manager() as session:
+        stored = (await session.get(Task, scale.id))._output_bin
+
+    response = await client.get(_url(job, scale, "output"), headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["x-payload-encoding"] == "array+zlib"
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.content == stored
+
+    # Not compressed: gzip on request.
+    uncompressed = await client.get(_url(job, scale, "input"), headers={"Accept-Encoding": "gzip"})
+    assert uncompressed.headers["x-payload-encoding"] == "array"
+    assert uncompressed.headers["content-encoding"] == "gzip"
+
+
+async def test_artifact_payload_is_streamed_from_its_file(client, tasks):
+    job, describe, _ = tasks
+    data = bytes(range(256)) * 3
+    artifacts.write_bytes(job.id, payload_artifact(describe.id, "output"), data)
+
+    detail = (await client.get(f"/api/jobs/{job.id}/tasks/{describe.id}")).json()
+    assert detail["output"] == {"source": "artifact", "size": len(data), "content_type": "application/octet-stream",
+                                "encoding": None}
+
+    full = await client.get(_url(job, describe, "output"), headers=IDENTITY)
+    assert full.content == data
+    partial = await client.get(_url(job, describe, "output"), headers={"Range": "bytes=250-261"})
+    assert partial.status_code == 206
+    assert partial.content == data[250:262]
+    assert partial.headers["content-range"] == f"bytes 250-261/{len(data)}"
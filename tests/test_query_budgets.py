@@ -0,0 +1,56 @@
+import pytest
+from conftest import QUERY_BUDGETS
+
+from database import database
+from database.instrumentation import QueryBudgetExceeded
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.services import job_runner
+from domain.services.job_registry import job_registry
+
+
+@pytest.fixture
+async def night_batch(db):
+    return await job_registry.create("night_batch")
+
+
+def _tree(task):
+    return [task, *(descendant for child in task.children for descendant in _tree(child))]
+
+
+async def test_get_loads_the_whole_tree_within_budget(night_batch, query_budget):
+    async with database.get_session_manager() as session:
+        with query_budget(QUERY_BUDGETS["JobRepository.get"]):
+            job = await JobRepository(session).get(night_batch.id, load_graph=True)
+            tasks = _tree(job)
+            links = [link for task in tasks for link in (*task.upstream_links, *task.downstream_links)]
+
+    assert len(tasks) == 12  # the job and its 11 tasks
+    assert links
+
+
+async def test_get_all_within_budget(night_batch, query_budget):
+    await job_registry.create("night_batch")
+    async with database.get_session_manager() as session:
+        with query_budget(QUERY_BUDGETS["JobRepository.get_all"]):
+            jobs = [job for job in await JobRepository(session).get_all() if job.parent_id is None]
+            tasks = [task for job in jobs for task in _tree(job)]
+
+    assert len(jobs) == 2
+    assert len(tasks) == 24
+
+
+async def test_engine_run_within_budget(night_batch, query_budget):
+    with query_budget(QUERY_BUDGETS["ReactiveEngine.run"]) as stats:
+        await job_runner.run(night_batch.id)
+
+    assert stats.repeated() == {}
+    async with database.get_session_manager() as session:
+        assert (await JobRepository(session).get_version(night_batch.id))[1] == Status.SUCCESS
+
+
+async def test_exceeded_budget_lists_the_statements(night_batch, query_budget):
+    async with database.get_session_manager() as session:
+        with pytest.raises(QueryBudgetExceeded, match="budget is 1"):
+            with query_budget(1):
+                await JobRepository(session).get(night_batch.id, load_graph=True)
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from database import database
+from database.config import settings
+from database.revisions import script_heads
+
+ALEMBIC_INI = Path(__file__).parents[1] / "alembic.ini"
+
+
+def test_script_heads_are_alembic_heads():
+    assert script_heads() == frozenset(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+async def test_schema_at_head_is_accepted_without_migrating(db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_MIGRATE_ON_STARTUP", False)
+
+    await database.ensure_schema(database.get_engine("worker"))
+
+
+async def test_schema_behind_is_refused_when_migrations_are_off(db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_MIGRATE_ON_STARTUP", False)
+    (head,) = script_heads()
+    previous = ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_revision(head).down_revision
+    async with database.get_engine("worker").begin() as connection:
+        await connection.execute(text("UPDATE alembic_version SET version_num = :previous"), {"previous": previous})
+
+    with pytest.raises(RuntimeError, match="python cli.py migrate"):
+        await database.ensure_schema(database.get_engine("worker"))
@@ -0,0 +1,77 @@
+import sqlite3
+import uuid
+from pathlib import Path
+
+from database import database
+from database.config import settings
+from domain.job_repository import JobRepository
+from domain.services.job_registry import job_registry
+
+ALEMBIC_INI = str(Path(__file__).parents[1] / "alembic.ini")
+
+
+def _upgrade(revision: str) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(ALEMBIC_INI), revision)
+
+
+def test_migration_backfills_root_job_id_and_depth(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+    _upgrade("b942b3745a91")
+    root, job, task, other_root = (uuid.uuid4() for _ in range(4))
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO tasks (id, task_type, kind, status, parent_id) VALUES (?, ?, 'kind', 'SUCCESS', ?)",
+            [
+                (root.hex, "JOB", None), (job.hex, "JOB", root.hex), (task.hex, "TASK", job.hex),
+                (other_root.hex, "JOB", None),
+            ],
+        )
+        connection.execute(
+            "INSERT INTO task_dependencies (id, task_id, upstream_task_id, job_id, merge_strategy) "
+            "VALUES (?, ?, ?, ?, 'replace')",
+            (uuid.uuid4().hex, task.hex, job.hex, job.hex),
+        )
+
+    _upgrade("3e01108759a9")
+
+    with sqlite3.connect(path) as connection:
+        tasks = dict(((row[0], (row[1], row[2])) for row in connection.execute("SELECT id, root_job_id, depth FROM tasks")))
+        links = connection.execute("SELECT root_job_id, depth FROM task_dependencies").fetchall()
+    assert tasks == {
+        root.hex: (root.hex, 0), job.hex: (root.hex, 1), task.hex: (root.hex, 2), other_root.hex: (other_root.hex, 0),
+    }
+    assert links == [(root.hex, 2)]
+
+
+async def test_new_trees_get_root_job_id_and_depth(db):
+    job = await job_registry.create("night_batch")
+
+    async with database.get_session_manager() as session:
+        repository = JobRepository(session)
+        tasks = await repository.get_batch_tasks(job.id)
+        loaded = await repository.load_batch(job.id)
+
+    assert len(tasks) == 12
+    assert {task.root_job_id for task in tasks} == {job.id}
+    assert [task.depth for task in tasks] == sorted(task.depth for task in tasks)
+    assert {task.depth for task in tasks} == {0, 1, 2}
+    assert len(loaded.children) == 5
+
+
+async def test_get_tasks_by_status(client):
+    job = await job_registry.create("night_batch")
+    url = f"/api/jobs/{job.id}/tasks"
+
+    scheduled = (await client.get(url, params={"status": "SCHEDULED"})).json()
+    failed = (await client.get(url, params={"status": ["FAILED", "SUCCESS"]})).json()
+    nested = scheduled[1]["id"]
+
+    assert len(scheduled) == 12 and scheduled[0]["id"] == str(job.id)
+    assert failed == []
+    assert (await client.get(f"/api/jobs/{uuid.uuid4()}/tasks")).status_code == 404
+    assert (await client.get(f"/api/jobs/{nested}/tasks")).status_code == 404
+    assert (await client.get(url, params={"status": "BOGUS"})).status_code == 422
@@ -0,0 +1,100 @@
+import types
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import database
+from database.config import settings
+from domain.models.enums.misfire_policy import MisfirePolicy
+from domain.models.schedule import Schedule, as_utc
+from domain.schedule_repository import ScheduleRepository
+from domain.services import job_runner
+from domain.services.job_queue import JobQueue, QueueFull
+from domain.services.scheduler import Scheduler
+
+DUE = datetime(2026, 1, 5, 22, tzinfo=timezone.utc)  # a Monday
+
+
+def _schedule(**kwargs) -> Schedule:
+    return Schedule(**{"name": "nightly", "job_type": "night_batch", "cron": "0 22 * * *", "timezone": "UTC", **kwargs})
+
+
+def test_skip_launches_within_the_grace_only():
+    schedule = _schedule(misfire_policy=MisfirePolicy.SKIP)
+
+    assert schedule.plan(DUE, DUE + timedelta(seconds=10)) == ([DUE], DUE + timedelta(days=1))
+    late = DUE + timedelta(seconds=settings.SCHEDULER_MISFIRE_GRACE + 1)
+    assert schedule.plan(DUE, late) == ([], DUE + timedelta(days=1))
+
+
+def test_catch_up_launches_the_oldest_missed_runs(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_CATCH_UP", 3)
+    schedule = _schedule(misfire_policy=MisfirePolicy.CATCH_UP)
+
+    runs, next_run_at = schedule.plan(DUE, DUE + timedelta(days=5, hours=1))
+
+    assert runs == [DUE, DUE + timedelta(days=1), DUE + timedelta(days=2)]
+    assert next_run_at == DUE + timedelta(days=6)
+
+
+def test_stale_heap_entries_are_skipped():
+    scheduler = Scheduler(lease=None)
+    moved, removed = uuid.uuid4(), uuid.uuid4()
+    scheduler._set(moved, DUE)
+    scheduler._set(removed, DUE)
+    scheduler._set(moved, DUE + timedelta(hours=1))
+    scheduler._set(removed, None)
+
+    assert scheduler._pop_due(DUE) == []
+    assert scheduler._pop_due(DUE + timedelta(hours=1)) == [(moved, DUE + timedelta(hours=1))]
+
+
+@pytest.fixture
+def due():
+    return datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+
+@pytest.fixture
+async def schedule(db, due):
+    schedule = _schedule(cron="* * * * *", next_run_at=due)
+    async with database.get_session_manager("worker") as session:
+        await ScheduleRepository(session).add(schedule)
+        await database.commit(session)
+    return schedule
+
+
+async def test_a_run_is_launched_once_by_concurrent_leaders(schedule, due, monkeypatch):
+    launched = []
+
+    async def submit(job_type, input, **kwargs):
+        launched.append(kwargs["name"])
+        return types.SimpleNamespace(id=uuid.uuid4())
+
+    monkeypatch.setattr(job_runner, "submit", submit)
+    first, second = Scheduler(lease=None), Scheduler(lease=None)
+
+    # Both popped the same due run from their heap: only the compare-and-set winner launches it.
+    await first._fire(schedule.id, due)
+    await second._fire(schedule.id, due)
+
+    assert launched == [f"nightly {due:%Y-%m-%d %H:%M}"]
+    async with database.get_session_manager() as session:
+        stored = await ScheduleRepository(session).get(schedule.id)
+    assert as_utc(stored.next_run_at) > due
+    assert as_utc(stored.last_run_at) == due
+
+
+async def test_a_due_run_is_launched_past_a_full_queue(schedule, due, monkeypatch):
+    queue = JobQueue(max_concurrent=0, max_size=0)
+    monkeypatch.setattr(job_runner, "job_queue", queue)
+    with pytest.raises(QueueFull):
+        queue.reserve()
+
+    await Scheduler(lease=None)._fire(schedule.id, due)
+
+    async with database.get_session_manager() as session:
+        stored = await ScheduleRepository(session).get(schedule.id)
+    assert stored.last_job_id is not None
+    assert queue.info(stored.last_job_id).state == "queued"
+    assert queue._reserved == 0
@@ -0,0 +1,150 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from database import database
+from database.config import settings
+from database.notifications import FILE_CREATED, JOB_FINISHED, notifications
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.models.sensor import FileSensor, JobStatusSensor, Sensor
+from domain.models.task import Task
+from domain.services import job_runner
+from domain.services.job_registry import job_registry
+
+
+def _counting(results):
+    """check callable returning ``results`` one after the other (then None), and its calls."""
+    calls = []
+
+    async def check():
+        calls.append(None)
+        return results[len(calls) - 1] if len(calls) <= len(results) else None
+
+    return check, calls
+
+
+async def _set_status(job_id, status):
+    async with database.get_session_manager("worker") as session:
+        await session.execute(update(Task).where(Task.id == job_id).values(status=status))
+        await session.commit()
+
+
+async def _until_waiting(check_calls, count: int = 1):
+    for _ in range(500):
+        if len(check_calls) >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("never checked")
+
+
+async def _run_waiting(sensor: Sensor):
+    job = Job(name="Waits")
+    sensor.parent = job
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+    return job, asyncio.create_task(job_runner.run(job.id))
+
+
+async def _task(task_id):
+    async with database.get_session_manager() as session:
+        return await session.get(Task, task_id, populate_existing=True)
+
+
+def test_a_sensor_must_implement_poke():
+    with pytest.raises(TypeError, match="poke"):
+        Sensor(name="incomplete")
+
+
+async def test_wait_for_times_out():
+    check, calls = _counting([])
+
+    with pytest.raises(TimeoutError, match="0.05s"):
+        await notifications.wait_for(check, (FILE_CREATED,), recheck_interval=0.01, timeout=0.05)
+
+    assert len(calls) > 2  # rechecked without notifications
+
+
+async def test_wait_for_rechecks_without_notifications():
+    check, calls = _counting([None, None, "ready"])
+
+    assert await notifications.wait_for(check, (FILE_CREATED,), recheck_interval=0.01, timeout=5) == "ready"
+    assert len(calls) == 3
+
+
+async def test_a_burst_of_notifications_is_checked_once():
+    check, calls = _counting([])
+    waiting = asyncio.create_task(notifications.wait_for(check, (FILE_CREATED,), recheck_interval=3600, timeout=0.3))
+    await _until_waiting(calls)
+
+    for index in range(5):
+        notifications.deliver(FILE_CREATED, {"path": f"/data/{index}.csv"})
+    notifications.deliver(JOB_FINISHED, {"job_id": str(uuid.uuid4())})  # not listened to
+
+    with pytest.raises(TimeoutError):
+        await waiting
+    # The first check, one for the burst, the last one at the deadline.
+    assert len(calls) == 3
+
+
+async def test_job_status_sensor_pokes(db):
+    upstream = await job_registry.create("night_batch")
+    sensor = JobStatusSensor(name="upstream", input={"job_id": upstream.id, "statuses": ["SUCCESS", "SKIPPED"]})
+
+    assert await sensor.poke() is None
+    await _set_status(upstream.id, Status.SKIPPED)
+    assert await sensor.poke() == Status.SKIPPED
+    await _set_status(upstream.id, Status.FAILED)
+    with pytest.raises(ValueError, match="ended"):
+        await sensor.poke()
+
+    missing = JobStatusSensor(name="missing", input={"job_id": uuid.uuid4()})
+    with pytest.raises(ValueError, match="not found"):
+        await missing.poke()
+
+
+async def test_job_status_sensor_is_woken_by_job_finished(db, monkeypatch):
+    monkeypatch.setattr(settings, "SENSOR_RECHECK_INTERVAL", 3600)
+    upstream = await job_registry.create("night_batch")
+    sensor = JobStatusSensor(name="upstream", input={"job_id": upstream.id})
+    pokes = []
+    original = JobStatusSensor.poke
+
+    async def poke(self):
+        pokes.append(None)
+        return await original(self)
+
+    monkeypatch.setattr(JobStatusSensor, "poke", poke)
+    job, run = await _run_waiting(sensor)
+    await _until_waiting(pokes)
+
+    await _set_status(upstream.id, Status.SUCCESS)
+    await notifications.publish(JOB_FINISHED, {"job_id": str(upstream.id), "status": Status.SUCCESS})
+    await asyncio.wait_for(run, 10)
+
+    assert (await _task(sensor.id)).output == Status.SUCCESS
+    async with database.get_session_manager() as session:
+        assert (await JobRepository(session).get_version(job.id))[1] == Status.SUCCESS
+
+
+async def test_file_sensor_is_woken_by_an_announced_file(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SENSOR_RECHECK_INTERVAL", 3600)
+    path = tmp_path / "prices.csv"
+    sensor = FileSensor(name="prices", input={"path": str(path)})
+    job, run = await _run_waiting(sensor)
+    for _ in range(500):
+        if any(subscription.channels == {FILE_CREATED} for subscription in notifications._subscriptions):
+            break
+        await asyncio.sleep(0.01)
+    assert not run.done()
+
+    path.write_text("isin;price\n")
+    response = await client.post("/api/notifications/files", json={"path": str(path)})
+    await asyncio.wait_for(run, 10)
+
+    assert response.status_code == 202 and response.json() == {"path": str(path)}
+    assert (await _task(sensor.id)).output == str(path)
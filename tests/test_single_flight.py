@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from sqlalchemy import update
+
+from database import database
+from database.config import settings
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.models.task import Task
+from domain.services import job_runner
+from domain.services.engine.reactive import single_flight
+
+
+class Fetch(Task[dict, int]):
+    single_flight = True
+    calls = 0
+
+    async def action(self):
+        Fetch.calls += 1
+        await asyncio.sleep(0.2)
+        if self.input["value"] < 0:
+            raise ValueError("negative")
+        return self.input["value"] * 2
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    Fetch.calls = 0
+
+
+async def _create(*values: int) -> list[Job]:
+    jobs = []
+    async with database.get_session_manager("worker") as session:
+        for value in values:
+            job = Job(name=f"fetch {value}")
+            Fetch(parent=job, name="fetch", input={"value": value, "unit": "eur"})
+            session.add(job)
+            jobs.append(job)
+        await database.commit(session)
+    return jobs
+
+
+async def _fetch(job: Job) -> Fetch:
+    async with database.get_session_manager() as session:
+        return (await JobRepository(session).get(job.id, load_graph=True)).children[0]
+
+
+def test_input_hash_ignores_key_order():
+    assert (single_flight.input_hash(Fetch(input={"value": 1, "unit": "eur"}))
+            == single_flight.input_hash(Fetch(input={"unit": "eur", "value": 1})))
+    assert single_flight.input_hash(Fetch(input={"value": 1})) != single_flight.input_hash(Fetch(input={"value": 2}))
+
+
+async def test_identical_tasks_attach_to_the_running_one(db):
+    jobs = await _create(21, 21, 5)
+
+    await asyncio.gather(*(job_runner.run(job.id) for job in jobs))
+
+    fetches = [await _fetch(job) for job in jobs]
+    assert Fetch.calls == 2
+    assert [(fetch.status, fetch.output) for fetch in fetches] == [(Status.SUCCESS, 42), (Status.SUCCESS, 42), (Status.SUCCESS, 10)]
+    assert fetches[0].input_hash == fetches[1].input_hash != fetches[2].input_hash
+
+
+async def test_attached_tasks_fail_with_the_leader(db):
+    jobs = await _create(-1, -1)
+
+    await asyncio.gather(*(job_runner.run(job.id) for job in jobs))
+
+    leader, follower = [await _fetch(job) for job in jobs]
+    assert Fetch.calls == 1
+    assert (leader.status, leader.error) == (Status.FAILED, "negative")
+    assert follower.status == Status.FAILED
+    assert follower.error == f"Single-flight task {leader.id} failed: negative"
+
+
+async def _running_elsewhere(value: int) -> Fetch:
+    """A task of the same key stored as RUNNING by another worker."""
+    other = Fetch(name="other worker", input={"value": value, "unit": "eur"})
+    other.input_hash = single_flight.input_hash(other)
+    other.status = Status.RUNNING
+    other.start()
+    async with database.get_session_manager("worker") as session:
+        session.add(other)
+        await database.commit(session)
+    return other
+
+
+async def _finish_later(task_id, **values) -> None:
+    await asyncio.sleep(0.3)
+    async with database.get_session_manager("worker") as session:
+        await session.execute(update(Task).where(Task.id == task_id).values(**values))
+        await session.commit()
+
+
+async def test_follows_a_task_running_in_another_worker(db, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_POLL_INTERVAL", 0.05)
+    other = await _running_elsewhere(21)
+    (job,) = await _create(21)
+
+    await asyncio.gather(job_runner.run(job.id), _finish_later(other.id, status=Status.SUCCESS, _output_data=99))
+
+    fetch = await _fetch(job)
+    assert Fetch.calls == 0
+    assert (fetch.status, fetch.output) == (Status.SUCCESS, 99)
+
+
+async def test_runs_itself_when_the_other_worker_lets_go(db, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLE_FLIGHT_POLL_INTERVAL", 0.05)
+    other = await _running_elsewhere(21)
+    (job,) = await _create(21)
+
+    await asyncio.gather(job_runner.run(job.id), _finish_later(other.id, status=Status.SCHEDULED))
+
+    fetch = await _fetch(job)
+    assert Fetch.calls == 1
+    assert (fetch.status, fetch.output) == (Status.SUCCESS, 42)
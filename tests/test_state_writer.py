@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from database import database
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.models.task import Task
+from domain.services.engine.reactive.state_writer import StateWriter
+
+
+class Noop(Task[None, None]):
+    async def action(self):
+        return None
+
+
+@pytest.fixture
+async def loaded(db):
+    job = Job(name="Writes")
+    Noop(parent=job, name="first")
+    Noop(parent=job, name="second")
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+
+    async with database.get_session_manager("worker") as session:
+        job = await JobRepository(session).load_batch(job.id)
+        yield session, job
+
+
+async def _stored(job_id):
+    async with database.get_session_manager() as session:
+        tasks = await JobRepository(session).get_batch_tasks(job_id)
+        return {task.name: task.status for task in tasks}, (await JobRepository(session).get_version(job_id))[0]
+
+
+async def test_failed_write_stays_pending(loaded, monkeypatch):
+    session, job = loaded
+    first, second = sorted(job.children, key=lambda task: task.name)
+    version = job.version
+    writer = StateWriter(session)
+    execute = session.execute
+
+    async def failing(*args, **kwargs):
+        monkeypatch.setattr(session, "execute", execute)
+        raise OperationalError("UPDATE tasks", {}, Exception("disk I/O error"))
+
+    first.status = Status.RUNNING
+    monkeypatch.setattr(session, "execute", failing)
+    with pytest.raises(OperationalError):
+        await writer.flush()
+
+    # Rolled back, the objects still loaded and the change still to write.
+    assert first.status == Status.RUNNING and second.name == "second"
+    assert job.version == version
+    assert (await _stored(job.id))[0]["first"] == Status.SCHEDULED
+
+    second.status = Status.RUNNING
+    await writer.flush()
+
+    statuses, stored_version = await _stored(job.id)
+    assert statuses == {"Writes": Status.SCHEDULED, "first": Status.RUNNING, "second": Status.RUNNING}
+    assert stored_version == job.version == version + 1
+
+
+async def test_change_made_during_a_write_is_written_next(loaded, monkeypatch):
+    session, job = loaded
+    first, second = sorted(job.children, key=lambda task: task.name)
+    writer = StateWriter(session)
+    execute = session.execute
+
+    async def interleaved(*args, **kwargs):
+        monkeypatch.setattr(session, "execute", execute)
+        first.status = Status.SUCCESS  # a node running while the statement is in flight
+        return await execute(*args, **kwargs)
+
+    first.status = Status.RUNNING
+    monkeypatch.setattr(session, "execute", interleaved)
+    await writer.flush()
+    await writer.flush()
+
+    statuses, _ = await _stored(job.id)
+    assert statuses["first"] == Status.SUCCESS
+    assert not session.dirty
@@ -0,0 +1,64 @@
+from pydantic import BaseModel
+
+from database import database
+from database.config import settings
+from domain.job_repository import JobRepository
+from domain.models.enums.input_strategy import MergeStrategy
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.models.task import Task
+from domain.services import job_runner
+
+
+class Price(BaseModel):
+    id: int
+    value: float
+
+
+class Produce(Task[int, list[Price]]):
+    async def action(self):
+        return [Price(id=self.input * 10 + i, value=i) for i in range(3)]
+
+
+class Collate(Task[None, dict]):
+    async def action(self):
+        chunks = [[price.id for price in chunk] async for chunk in self.stream_input_chunks(chunk_size=4)]
+        assert self.input is None  # stream links are not materialized
+        return {"chunks": chunks}
+
+
+class Producers(Job):
+    def __init__(self, first: int = 0, count: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        for i in range(first, first + count):
+            Produce(parent=self, name=f"produce {i}", input=i)
+
+
+class FanInJob(Job):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        producers = [Produce(parent=self, name=f"produce {i}", input=i) for i in range(5)]
+        sub_job = Producers(parent=self, name="producers", first=5, count=3)
+        collate = Collate(parent=self, name="collate")
+        collate.add_upstream(*producers, sub_job, merge_strategy=MergeStrategy.STREAM)
+
+
+async def test_stream_input_reads_upstream_outputs_in_link_order(db, monkeypatch):
+    # Fewer upstream tasks per round trip than links: several reads, one job expanded into its children.
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 2)
+    job = FanInJob(name="Fan in")
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+
+    await job_runner.run(job.id)
+
+    async with database.get_session_manager() as session:
+        loaded = await JobRepository(session).get(job.id, load_graph=True)
+        collate = next(child for child in loaded.children if child.name == "collate")
+        assert loaded.status == Status.SUCCESS
+        chunks = collate.output["chunks"]
+
+    ids = [i * 10 + item for i in range(8) for item in range(3)]
+    assert [price_id for chunk in chunks for price_id in chunk] == ids
+    assert [len(chunk) for chunk in chunks] == [4] * 6
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from database import database
+from domain.job_repository import JobRepository
+from domain.models.batch_task import BatchTask
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.services import job_runner
+from domain.services.engine.reactive.task_batcher import TaskBatcher
+
+
+class Double(BatchTask[int, int]):
+    batch_size = 3
+    batch_window_ms = 10
+    batches: list[list[int]] = []
+
+    @classmethod
+    async def action_batch(cls, inputs):
+        cls.batches.append(inputs)
+        if 13 in inputs:
+            raise ValueError("unlucky batch")
+        if 7 in inputs:
+            return inputs[:-1]
+        return [value * 2 for value in inputs]
+
+
+@pytest.fixture
+def changes():
+    calls = []
+
+    async def on_change():
+        calls.append(1)
+
+    return calls, on_change
+
+
+async def test_batches_flush_on_size_and_window(changes):
+    Double.batches = []
+    calls, on_change = changes
+    batcher = TaskBatcher(Double, on_change)
+    tasks = [Double(name=f"double {i}", input=i) for i in range(4)]
+
+    await asyncio.gather(*(batcher.submit(task) for task in tasks))
+
+    assert Double.batches == [[0, 1, 2], [3]]
+    assert [task.output for task in tasks] == [0, 2, 4, 6]
+    assert all(task.status == Status.SUCCESS for task in tasks)
+    assert len(calls) == 4  # running, then done, per batch
+
+
+@pytest.mark.parametrize("inputs, error", [
+    ([1, 13], "unlucky batch"),
+    ([1, 7], "Double.action_batch returned 1 outputs for 2 inputs"),
+])
+async def test_failed_batch_fails_each_of_its_tasks(changes, inputs, error):
+    calls, on_change = changes
+    batcher = TaskBatcher(Double, on_change)
+    tasks = [Double(name=f"double {i}", input=i) for i in inputs]
+
+    results = await asyncio.gather(*(batcher.submit(task) for task in tasks), return_exceptions=True)
+
+    assert [str(result) for result in results] == [error] * len(tasks)
+    assert all(task.status == Status.FAILED and task.error == error for task in tasks)
+    assert all(task.finished_at is not None for task in tasks)
+    assert len(calls) == 2
+
+
+async def test_failed_batch_fails_the_job(db):
+    job = Job(name="Doubles")
+    for i in (1, 13, 2):
+        Double(parent=job, name=f"double {i}", input=i)
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+
+    await job_runner.run(job.id)
+
+    async with database.get_session_manager() as session:
+        job = await JobRepository(session).get(job.id, load_graph=True)
+    assert job.status == Status.FAILED
+    assert {(child.status, child.error) for child in job.children} == {(Status.FAILED, "unlucky batch")}
+
+
+def test_a_batch_task_must_implement_action_batch():
+    with pytest.raises(TypeError, match="action_batch"):
+        BatchTask(name="incomplete")
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, update
+
+from database import database
+from domain.job_repository import JobRepository
+from domain.models.enums.status import Status
+from domain.models.enums.task_type import TaskType
+from domain.models.task import Task
+from domain.services.job_registry import job_registry
+
+
+async def _set_status(job_id, status: Status) -> None:
+    async with database.get_session_manager("worker") as session:
+        await session.execute(update(Task).where(Task.id == job_id).values(status=status))
+        await session.commit()
+
+
+async def test_get_by_status_reads_the_status_index(db):
+    job = await job_registry.create("night_batch")
+    await _set_status(job.id, Status.FAILED)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = database.get_engine()
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with database.get_session_manager() as session:
+            today = datetime.now() - timedelta(days=1)
+            failed = await JobRepository(session).get_by_status(Status.FAILED, since=today)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert [task.id for task in failed] == [job.id]
+    assert failed[0].children == []
+    statement, parameters = statements[-1]
+    async with engine.connect() as connection:
+        plan = " ".join(row[-1] for row in await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_tasks_status_created_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+async def test_listing_by_status(client):
+    failed, running = await job_registry.create("night_batch"), await job_registry.create("night_batch")
+    await _set_status(failed.id, Status.FAILED)
+    await _set_status(running.id, Status.RUNNING)
+
+    by_status = (await client.get("/api/jobs/", params={"status": ["FAILED", "RUNNING"]})).json()
+    later = (await client.get("/api/jobs/", params={"status": "FAILED", "since": (datetime.now() + timedelta(hours=1)).isoformat()})).json()
+    limited = (await client.get("/api/jobs/", params={"status": "SCHEDULED", "limit": 2})).json()
+
+    assert {job["id"] for job in by_status} == {str(running.id), str(failed.id)}
+    assert all(job["children"] == [] for job in by_status)
+    assert later == []
+    assert len(limited) == 2 and all(job["task_type"] == TaskType.JOB for job in limited)
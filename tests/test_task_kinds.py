@@ -0,0 +1,39 @@
+import sys
+
+import pytest
+
+from domain.models.task import Task
+from domain.services.job_registry import job_registry
+
+JOB_MODULE = '''
+from domain.models.job import Job
+from domain.models.task import Task
+
+
+class DeclaredStep(Task[None, None]):
+    async def action(self):
+        return None
+
+
+class DeclaredJob(Job):
+    pass
+'''
+
+
+def test_kind_of_a_declared_job_type_is_loaded(tmp_path, monkeypatch):
+    (tmp_path / "declared_kinds_jobs.py").write_text(JOB_MODULE)
+    monkeypatch.syspath_prepend(tmp_path)
+    monkeypatch.setitem(job_registry.job_types, "declared_kinds", "declared_kinds_jobs:DeclaredJob")
+
+    mapper = Task.__mapper__.polymorphic_map["declared_kinds_jobs.DeclaredStep"]
+
+    assert mapper.class_.__name__ == "DeclaredStep"
+
+
+def test_undeclared_kind_imports_nothing(monkeypatch):
+    monkeypatch.delitem(sys.modules, "json.tool", raising=False)
+
+    with pytest.raises(KeyError, match="none of the declared job types"):
+        Task.__mapper__.polymorphic_map["json.tool.Whatever"]
+
+    assert "json.tool" not in sys.modules
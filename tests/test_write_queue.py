@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+
+from database import database
+from database.config import settings
+from domain.models.archive import archived_jobs
+from domain.models.enums.status import Status
+from domain.models.job import Job
+from domain.models.task import Task
+from domain.services.archive import Archiver
+
+
+class Step(Task[None, None]):
+    async def action(self):
+        return None
+
+
+async def _reinit(monkeypatch, write_queue: bool):
+    # No busy timeout: a second writer fails at once with "database is locked" instead of waiting for the first.
+    await database.shutdown()
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT", 0)
+    monkeypatch.setattr(settings, "SQLITE_WRITE_QUEUE", write_queue)
+    await database.init(migrate=False)
+
+
+async def _add_job(name: str, **values) -> Job:
+    job = Job(name=name, **values)
+    Step(parent=job, name="step")
+    async with database.get_session_manager("worker") as session:
+        session.add(job)
+        await database.commit(session)
+    return job
+
+
+async def _rename(job_id, name: str) -> None:
+    async def work():
+        async with database.get_session_manager("worker") as session:
+            await session.execute(update(Task).where(Task.id == job_id).values(name=f"{name} (1/2)"))
+            await asyncio.sleep(0.01)  # the write transaction stays open meanwhile
+            await session.execute(update(Task).where(Task.id == job_id).values(name=name))
+            await session.commit()
+
+    await database.write(work)
+
+
+async def _concurrent_writes() -> list:
+    jobs = [await _add_job(f"job {index}") for index in range(5)]
+    return await asyncio.gather(
+        *(_add_job(f"new {index}") for index in range(10)),
+        *(_rename(job.id, f"renamed {job.name}") for job in jobs),
+        Archiver(database.get_engine("worker"), mode="table").run(timedelta(days=1)),
+        return_exceptions=True,
+    )
+
+
+async def test_concurrent_sessions_write_through_the_queue(db, monkeypatch):
+    await _reinit(monkeypatch, write_queue=True)
+    await _add_job("old", status=Status.SUCCESS, finished_at=datetime.now() - timedelta(days=2))
+
+    results = await _concurrent_writes()
+
+    assert [result for result in results if isinstance(result, BaseException)] == []
+    async with database.get_session_manager() as session:
+        names = set((await session.execute(select(Task.name).where(Task.parent_id.is_(None)))).scalars())
+        archived = (await session.execute(select(func.count()).select_from(archived_jobs))).scalar_one()
+    assert {f"new {index}" for index in range(10)} | {f"renamed job {index}" for index in range(5)} == names
+    assert archived == 1 and results[-1] == 1
+
+
+async def test_without_the_queue_concurrent_writers_are_refused(db, monkeypatch):
+    await _reinit(monkeypatch, write_queue=False)
+
+    results = await _concurrent_writes()
+
+    assert any(isinstance(result, OperationalError) and "database is locked" in str(result) for result in results)
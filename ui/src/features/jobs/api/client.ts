@@ -1,5 +1,12 @@
 import {apiClient} from "@/lib/api/client";
-import {type Job, jobGraphResponseSchema, jobListResponseSchema, type Jobs} from "@/lib/schemas";
+import {
+    type Job,
+    type JobFlatGraph,
+    jobFlatGraphResponseSchema,
+    jobGraphResponseSchema,
+    jobListResponseSchema,
+    type Jobs,
+} from "@/lib/schemas";
 import {z} from "zod";
 
 const BASE_PATH = "/api/jobs";
@@ -14,6 +21,14 @@ export const nightBatchJobApi = {
         return apiClient.get(`${BASE_PATH}/${jobId}`, jobGraphResponseSchema);
     },
 
+    getJobGraph: async (jobId: string, params?: { depth?: number; collapse?: string[] }): Promise<JobFlatGraph> => {
+        const search = new URLSearchParams();
+        if (params?.depth !== undefined) search.set("depth", String(params.depth));
+        params?.collapse?.forEach((id) => search.append("collapse", id));
+        const query = search.toString();
+        return apiClient.get(`${BASE_PATH}/${jobId}/graph${query ? `?${query}` : ""}`, jobFlatGraphResponseSchema);
+    },
+
     retryTask: async (jobId: string, taskId: string): Promise<void> => {
         await apiClient.post<{task_id: string}>(`${BASE_PATH}/${jobId}/retries`, z.any(), { task_id: taskId });
     },
@@ -2,7 +2,7 @@
 import type {ApiError} from "@/lib/api";
 import {useMutation, useQuery, useQueryClient, type UseMutationOptions, type UseQueryOptions} from "@tanstack/react-query";
 import {nightBatchJobApi} from "./client";
-import type {Job, Jobs} from "@/lib/schemas";
+import type {Job, JobFlatGraph, Jobs} from "@/lib/schemas";
 
 export const nightBatchJobKeys = {
     all: ['night-batch'] as const,
@@ -10,6 +10,8 @@ export const nightBatchJobKeys = {
     jobList: (filters?: { limit?: number; offset?: number }) =>
         [...nightBatchJobKeys.runs(), 'list', filters] as const,
     job: (id: string) => [...nightBatchJobKeys.runs(), 'detail', id] as const,
+    graph: (id: string, params?: { depth?: number; collapse?: string[] }) =>
+        [...nightBatchJobKeys.job(id), 'graph', params] as const,
 };
 
 
@@ -33,6 +35,19 @@ export const useGetJob = (
     });
 }
 
+export const useGetJobGraph = (
+    jobId: string,
+    params?: { depth?: number; collapse?: string[] },
+    options?: Omit<UseQueryOptions<JobFlatGraph, ApiError>, 'queryKey' | 'queryFn'>
+) => {
+    return useQuery<JobFlatGraph, ApiError>({
+        queryKey: nightBatchJobKeys.graph(jobId, params),
+        queryFn: () => nightBatchJobApi.getJobGraph(jobId, params),
+        enabled: !!jobId,
+        ...options,
+    });
+}
+
 export const useRetryTask = (
     options?: UseMutationOptions<void, ApiError, { jobId: string; taskId: string }>
 ) => {
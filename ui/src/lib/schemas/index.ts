@@ -60,10 +60,48 @@ export const jobGraphResponseSchema = z.object({
 
 export type JobGraph = z.infer<typeof jobGraphResponseSchema>;
 
+// Flat graph view (GET /api/jobs/{id}/graph)
+export const graphNodeSchema = z.object({
+    id: z.string(),
+    parent_id: z.string().nullable(),
+    name: z.string().nullable(),
+    kind: z.string(),
+    task_type: z.string(),
+    status: z.string(),
+    error: z.string().nullable(),
+    started_at: z.string().nullable(),
+    finished_at: z.string().nullable(),
+    depth: z.number(),
+    child_count: z.number(),
+    collapsed: z.boolean(),
+});
+
+export type GraphNode = z.infer<typeof graphNodeSchema>;
+
+export const graphEdgeSchema = z.object({
+    id: z.string(),
+    source: z.string(),
+    target: z.string(),
+    merge_strategy: z.string(),
+});
+
+export type GraphEdge = z.infer<typeof graphEdgeSchema>;
+
+export const jobFlatGraphResponseSchema = z.object({
+    job_id: z.string(),
+    version: z.number(),
+    nodes: z.array(graphNodeSchema),
+    edges: z.array(graphEdgeSchema),
+});
+
+export type JobFlatGraph = z.infer<typeof jobFlatGraphResponseSchema>;
+
 // Job Summary (for list)
 export const jobSummarySchema = z.object({
     job_id: z.string(),
     status: z.string(),
+    queue_position: z.number().nullish(),
+    eta_seconds: z.number().nullish(),
 });
 
 export type JobSummary = z.infer<typeof jobSummarySchema>;